@@ -0,0 +1,177 @@
+"""
+AccessWorld Audio Store
+Holds the spoken answer of recent /analyze calls behind short opaque handles,
+so the JSON response carries a URL instead of a base64 WAV.
+
+Clips are synthesized at most once: either in the background right after the
+analysis, or lazily on the first GET /audio/{id}. Entries expire after a TTL
+and the store is bounded by entry count and rendered bytes (oldest first).
+
+With AUDIO_STORE_DIR set, clips are also written there (sentences as JSON,
+then the rendered WAV), so a handle resolves in any process sharing the
+directory — e.g. every gunicorn worker, whichever one answered /analyze.
+"""
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from models import metrics
+
+
+AUDIO_TTL_SEC     = float(os.getenv("AUDIO_TTL_SEC", "300"))
+AUDIO_MAX_CLIPS   = int(os.getenv("AUDIO_MAX_CLIPS", "256"))
+AUDIO_MAX_MB      = float(os.getenv("AUDIO_STORE_MB", "64"))
+AUDIO_STORE_DIR   = os.getenv("AUDIO_STORE_DIR", "")
+
+SWEEP_EVERY = 64   # Clips added between scans of the disk tier for expired files
+
+
+class AudioClip:
+    def __init__(self, sentences: List[str], path: str = "", created: Optional[float] = None):
+        self.sentences = sentences            # English sentences, speaking order
+        self.path = path                      # Disk tier file stem, "" if memory only
+        self.created = time.monotonic() if created is None else created
+        self.wav: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def render(self, tts) -> bytes:
+        """Synthesize the clip once (blocking); later calls return the cached WAV."""
+        with self._lock:
+            if self.wav is None:
+                try:
+                    with metrics.STAGE_SECONDS.time(stage="tts"):
+                        self.wav = tts.synthesize_wav(" ".join(self.sentences))
+                except Exception:
+                    metrics.stage_error("tts")
+                    raise
+                if self.path:
+                    try:
+                        # Write then rename: other processes never see half a WAV
+                        with open(f"{self.path}.wav.tmp", "wb") as f:
+                            f.write(self.wav)
+                        os.replace(f"{self.path}.wav.tmp", f"{self.path}.wav")
+                    except OSError as e:
+                        print(f"  ⚠️  Audio store write failed: {e}")
+            return self.wav
+
+    @property
+    def size(self) -> int:
+        return len(self.wav) if self.wav is not None else 0
+
+
+class AudioStore:
+    def __init__(
+        self,
+        ttl: float = AUDIO_TTL_SEC,
+        max_clips: int = AUDIO_MAX_CLIPS,
+        max_bytes: int = int(AUDIO_MAX_MB * 1024 * 1024),
+        directory: str = AUDIO_STORE_DIR,
+    ):
+        self.ttl = ttl
+        self.max_clips = max_clips
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._clips: "OrderedDict[str, AudioClip]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._evicted = 0
+        self._expired = 0
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def add(self, sentences: List[str]) -> str:
+        """Register a clip to be spoken and return its handle."""
+        audio_id = secrets.token_urlsafe(12)
+        clip = AudioClip(sentences, self._path(audio_id))
+        self._save(clip)
+        with self._lock:
+            self._clips[audio_id] = clip
+            self._created += 1
+            self._evict()
+            sweep = self.directory and self._created % SWEEP_EVERY == 0
+        if sweep:
+            self._sweep()
+        return audio_id
+
+    def get(self, audio_id: str) -> Optional[AudioClip]:
+        with self._lock:
+            self._evict()
+            clip = self._clips.get(audio_id)
+            if clip is None:
+                clip = self._load(audio_id)
+                if clip is not None:
+                    self._clips[audio_id] = clip
+            return clip
+
+    def _evict(self) -> None:
+        """Drop expired clips, then the oldest ones beyond the count/byte bounds."""
+        now = time.monotonic()
+        for audio_id in [a for a, c in self._clips.items() if now - c.created > self.ttl]:
+            del self._clips[audio_id]
+            self._expired += 1
+
+        total = sum(c.size for c in self._clips.values())
+        while self._clips and (len(self._clips) > self.max_clips or total > self.max_bytes):
+            _, clip = self._clips.popitem(last=False)
+            total -= clip.size
+            self._evicted += 1
+
+    # ── Disk tier ────────────────────────────────────────────────────────────
+    def _path(self, audio_id: str) -> str:
+        return os.path.join(self.directory, audio_id) if self.directory else ""
+
+    def _save(self, clip: AudioClip) -> None:
+        if not clip.path:
+            return
+        try:
+            with open(f"{clip.path}.json", "w", encoding="utf-8") as f:
+                json.dump(clip.sentences, f)
+        except OSError as e:
+            print(f"  ⚠️  Audio store write failed: {e}")
+
+    def _load(self, audio_id: str) -> Optional[AudioClip]:
+        """A clip another process added, if it has not expired."""
+        path = self._path(audio_id)
+        # Handles are URL-safe tokens; anything else never names one of our files
+        if not path or not audio_id.replace("-", "").replace("_", "").isalnum():
+            return None
+        try:
+            age = time.time() - os.path.getmtime(f"{path}.json")
+            if age > self.ttl:
+                for ext in (".json", ".wav"):
+                    if os.path.exists(path + ext):
+                        os.remove(path + ext)
+                return None
+            with open(f"{path}.json", encoding="utf-8") as f:
+                clip = AudioClip(json.load(f), path, created=time.monotonic() - age)
+            if os.path.exists(f"{path}.wav"):
+                with open(f"{path}.wav", "rb") as f:
+                    clip.wav = f.read()
+            return clip
+        except (OSError, ValueError):
+            return None
+
+    def _sweep(self) -> None:
+        """Delete expired clip files (any process may have written them)."""
+        cutoff = time.time() - self.ttl
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+        except OSError:
+            pass   # Raced with another worker's sweep
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "clips":    len(self._clips),
+                "rendered": sum(1 for c in self._clips.values() if c.wav is not None),
+                "bytes":    sum(c.size for c in self._clips.values()),
+                "created":  self._created,
+                "expired":  self._expired,
+                "evicted":  self._evicted,
+            }
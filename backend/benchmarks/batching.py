@@ -0,0 +1,85 @@
+"""
+Micro-Batching Throughput Benchmark
+Drives a MicroBatcher from N concurrent client threads and reports images/s
+with batching off (window 0) and on, for increasing concurrency.
+
+The stand-in model is a small conv net with the same shape of work as the
+vision encoders (3×384×384 in, one forward per batch), so the benchmark runs
+without downloading any checkpoint.
+
+Usage:
+    python -m benchmarks.batching [--requests 64] [--window-ms 10] [--max-batch 8]
+"""
+import argparse
+import json
+import threading
+import time
+from typing import Dict, List
+
+import torch
+import torch.nn as nn
+
+from models.batching import MicroBatcher
+
+
+def _stand_in_model() -> nn.Module:
+    model = nn.Sequential(
+        nn.Conv2d(3, 32, 7, stride=4, padding=3), nn.ReLU(),
+        nn.Conv2d(32, 64, 3, stride=2, padding=1), nn.ReLU(),
+        nn.Conv2d(64, 128, 3, stride=2, padding=1), nn.ReLU(),
+        nn.AdaptiveAvgPool2d(1), nn.Flatten(), nn.Linear(128, 10),
+    )
+    return model.eval()
+
+
+def _run(batcher: MicroBatcher, concurrency: int, requests: int) -> float:
+    """Return throughput (items/s) for `requests` items over `concurrency` threads."""
+    image = torch.randn(1, 3, 384, 384)
+    per_thread = max(1, requests // concurrency)
+
+    def client():
+        for _ in range(per_thread):
+            batcher.submit(image)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return per_thread * concurrency / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--window-ms", type=float, default=10)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    model = _stand_in_model()
+
+    def forward(items: List[torch.Tensor]) -> List[torch.Tensor]:
+        with torch.no_grad():
+            return list(model(torch.cat(items)))
+
+    unbatched = MicroBatcher("unbatched", forward, max_batch=1, window_ms=0)
+    batched   = MicroBatcher("batched", forward, max_batch=args.max_batch, window_ms=args.window_ms)
+    _run(unbatched, 1, 4)   # warm-up
+
+    report: Dict[str, Dict] = {}
+    for concurrency in args.concurrency:
+        off = _run(unbatched, concurrency, args.requests)
+        on  = _run(batched, concurrency, args.requests)
+        report[str(concurrency)] = {
+            "unbatched_ips": round(off, 2),
+            "batched_ips":   round(on, 2),
+            "speedup":       round(on / off, 2),
+        }
+    report["batcher"] = batched.stats()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
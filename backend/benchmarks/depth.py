@@ -0,0 +1,143 @@
+"""
+Depth Resolution Benchmark
+Runs DPT at each input side (384 = DPT-Large's native resolution, smaller =
+the low-resolution mode, see models/depth.py) over a fixed image set and
+reports, per side:
+
+  • model latency (preprocessing + forward) and speedup over 384 px
+  • zone reduction time: the vectorized zone / band / grid pass against the
+    previous three np.percentile calls
+  • agreement with the current three-zone labels (384 px, previous
+    reduction): zone label and safe-to-walk agreement, mean |Δ percent|
+
+Without --images, synthetic photos are used (agreement on them is only
+indicative); --tiny-dir swaps DPT for the random stand-in of benchmarks/tiny.py
+to exercise the harness offline.
+
+Usage:
+    python -m benchmarks.depth [--images eval/*.jpg] [--sides 384 320 256 192]
+        [--grid 3x3] [--json report.json] [--tiny-dir /tmp/accessworld-tiny]
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from benchmarks import suite, tiny
+
+REFERENCE_SIDE = 384
+ZONES = ("left", "center", "right")
+
+
+def _timed(fn: Callable, inputs: Sequence) -> Dict:
+    fn(inputs[0])                                     # Warm-up
+    outputs, latencies = [], []
+    for item in inputs:
+        start = time.perf_counter()
+        outputs.append(fn(item))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "outputs": outputs,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies), 2),
+            "p50":  round(statistics.median(latencies), 2),
+        },
+    }
+
+
+def _reference_zones(predicted_depth: np.ndarray) -> Dict:
+    """The three-zone reduction the grid replaced: normalise, then np.percentile per zone."""
+    from models.zones import _proximity_label
+    dmin, dmax = predicted_depth.min(), predicted_depth.max()
+    if dmax - dmin < 1e-6:
+        norm = np.zeros_like(predicted_depth)
+    else:
+        norm = ((predicted_depth - dmin) / (dmax - dmin)) * 100
+    third = norm.shape[1] // 3
+    slices = (norm[:, :third], norm[:, third:2 * third], norm[:, 2 * third:])
+    zones = {name: _proximity_label(float(np.percentile(z, 90))) for name, z in zip(ZONES, slices)}
+    overall = _proximity_label(max(z["percent"] for z in zones.values()))
+    return {"zones": zones, "safe_to_walk": overall["label"] in ("Clear", "Medium")}
+
+
+def _agreement(ref: List[Dict], out: List[Dict]) -> Dict:
+    labels = [r["zones"][z]["label"] == o["zones"][z]["label"] for r, o in zip(ref, out) for z in ZONES]
+    deltas = [abs(r["zones"][z]["percent"] - o["zones"][z]["percent"]) for r, o in zip(ref, out) for z in ZONES]
+    verdicts = [r["safe_to_walk"] == o["safe_to_walk"] for r, o in zip(ref, out)]
+    return {
+        "zone_label_agreement":   round(float(np.mean(labels)), 3),
+        "safe_to_walk_agreement": round(float(np.mean(verdicts)), 3),
+        "mean_abs_percent_delta": round(float(np.mean(deltas)), 2),
+    }
+
+
+def run(images: List[bytes], sides: Sequence[int], grid: str) -> Dict:
+    from models.depth import DepthModel
+    from models.frame import PreparedFrame
+
+    model = DepthModel(input_side=REFERENCE_SIDE, grid=grid)
+    frames = [PreparedFrame.from_bytes(b, min_side=max(sides)) for b in images]
+    report: Dict = {"images": len(images), "grid": grid, "sides": {}}
+
+    reference = None
+    for side in sorted(set(sides) | {REFERENCE_SIDE}, reverse=True):
+        print(f"── {side} px ──")
+        model.input_side = side                      # Same weights; preprocessing is cached per side
+        maps = _timed(lambda f: model.depth_maps([f])[0], frames)
+        zones = _timed(model._zones, maps["outputs"])
+        if side == REFERENCE_SIDE:
+            previous = _timed(_reference_zones, maps["outputs"])
+            reference = {"model": maps, "zones": previous}
+            report["reduction_ms"] = {
+                "np_percentile_per_zone": previous["latency_ms"],
+                "vectorized_grid":        zones["latency_ms"],
+                "speedup": round(previous["latency_ms"]["mean"] / zones["latency_ms"]["mean"], 2),
+            }
+        report["sides"][side] = {
+            "model_ms": maps["latency_ms"],
+            "speedup": round(reference["model"]["latency_ms"]["mean"] / maps["latency_ms"]["mean"], 2),
+            "zones_ms": zones["latency_ms"],
+            "agreement": _agreement(reference["zones"]["outputs"], zones["outputs"]),
+        }
+        print(json.dumps(report["sides"][side]))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--images", nargs="+", help="Image files or glob patterns (default: synthetic)")
+    parser.add_argument("--count", type=int, default=24, help="Synthetic images when --images is not given")
+    parser.add_argument("--sides", type=int, nargs="+", default=[384, 320, 256, 192])
+    parser.add_argument("--grid", default="3x3", help="Zone grid, rows x columns")
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--tiny-dir", help="Use the random DPT stand-in written here (offline smoke run)")
+    args = parser.parse_args()
+
+    if any(side % 32 for side in args.sides):
+        parser.error("--sides must be multiples of 32")
+    if args.tiny_dir:
+        os.environ.update(tiny.environment(args.tiny_dir))
+        tiny.build(args.tiny_dir)
+
+    if args.images:
+        paths = sorted({p for pattern in args.images for p in glob.glob(pattern)})
+        if not paths:
+            parser.error("No images matched --images")
+        images = [open(p, "rb").read() for p in paths]
+    else:
+        images = suite._images(args.count)
+
+    report = run(images, args.sides, args.grid)
+    print(json.dumps({"reduction_ms": report["reduction_ms"]}, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Load Generator — saturation curves for one replica
+Drives POST /analyze and POST /voice with closed-loop virtual users, stepping
+the concurrency up a ramp, and reports for every step:
+
+  • throughput of successful requests and latency p50 / p95 / p99
+  • server-side queueing time (inference executor wait, from /health)
+  • 503 rate (executor saturated / models loading) and other error rate
+
+The latency-versus-throughput points of the ramp are the saturation curve;
+the first step that stops adding throughput, breaks the p95 SLO or starts
+failing requests is reported as the saturation point.
+
+Without --url the app is started in this process on a free localhost port,
+serving the tiny stand-in models (benchmarks/tiny.py) with the result,
+translation and waveform caches off — no network needed. With --url it
+targets an already running server (e.g. http://localhost:8000); with several
+gunicorn workers the queueing numbers sample whichever worker answers /health.
+
+Usage:
+    python -m benchmarks.load [--url http://localhost:8000]
+        [--ramp 1 2 4 8 16] [--step-sec 15] [--warmup-sec 5]
+        [--mix analyze=4 voice=1] [--intents full=2 depth=1 objects=1]
+        [--languages en=3 es=1] [--sizes 640x480=2 1280x720=1]
+        [--audio background] [--think-ms 0] [--slo-ms 2000] [--json load.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from benchmarks import suite, tiny
+
+
+# A query per pipeline intent (pipeline.INTENT_PATTERNS); "full" is no query
+INTENT_QUERIES = {
+    "full":      "",
+    "objects":   "Any objects here?",
+    "vehicles":  "Is there traffic on the road?",
+    "depth":     "Is it safe to walk forward?",
+    "translate": "Translate this to French",
+}
+IMAGES_PER_SIZE = 8
+CLIPS = 8
+
+# Saturation: a step that adds less than this over the best throughput so far
+THROUGHPUT_GAIN = 0.05
+ERROR_RATE_LIMIT = 0.01
+
+READY_TIMEOUT_SEC = 600
+
+
+@dataclass
+class Sample:
+    kind:       str      # "analyze" | "voice"
+    status:     int      # HTTP status, 0 when the request itself failed
+    latency_ms: float
+
+
+# ── Request mix ──────────────────────────────────────────────────────────────
+def _weights(pairs: Sequence[str], known: Optional[Sequence[str]] = None) -> Dict[str, float]:
+    """["analyze=4", "voice"] → {"analyze": 4.0, "voice": 1.0}"""
+    weights = {}
+    for pair in pairs:
+        key, _, weight = pair.partition("=")
+        if known is not None and key not in known:
+            raise SystemExit(f"Unknown value {key!r}; expected one of: {', '.join(known)}")
+        weights[key] = float(weight or 1)
+    return weights
+
+
+def _size(text: str) -> Tuple[int, int]:
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h)
+
+
+class Mix:
+    """Picks the next request: endpoint, then intent, language and image size."""
+
+    def __init__(self, args, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.kinds = _weights(args.mix, ("analyze", "voice"))
+        self.intents = _weights(args.intents, tuple(INTENT_QUERIES))
+        self.languages = _weights(args.languages)
+        self.sizes = _weights(args.sizes)
+        self.images = {
+            size: suite._images(IMAGES_PER_SIZE, seed=i, sizes=[_size(size)])
+            for i, size in enumerate(self.sizes)
+        }
+        self.clips = suite._speech(CLIPS) if "voice" in self.kinds else []
+        self.audio = args.audio
+
+    def _pick(self, weights: Dict[str, float]) -> str:
+        return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def request(self) -> Tuple[str, str, dict]:
+        """(kind, path, httpx keyword arguments)"""
+        kind = self._pick(self.kinds)
+        if kind == "voice":
+            clip = self.rng.choice(self.clips)
+            return kind, "/voice", {"files": {"audio": ("speech.wav", clip, "audio/wav")}}
+        image = self.rng.choice(self.images[self._pick(self.sizes)])
+        return kind, "/analyze", {
+            "files": {"image": ("frame.jpg", image, "image/jpeg")},
+            "data": {
+                "query": INTENT_QUERIES[self._pick(self.intents)],
+                "language": self._pick(self.languages),
+                "audio": self.audio,
+            },
+        }
+
+
+# ── Driving one step ─────────────────────────────────────────────────────────
+async def _user(client: httpx.AsyncClient, mix: Mix, deadline: float,
+                think_sec: float, samples: List[Sample]) -> None:
+    while time.perf_counter() < deadline:
+        kind, path, kwargs = mix.request()
+        start = time.perf_counter()
+        try:
+            response = await client.post(path, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        samples.append(Sample(kind, status, (time.perf_counter() - start) * 1000))
+        if think_sec:
+            await asyncio.sleep(think_sec)
+
+
+async def _executor_stats(client: httpx.AsyncClient) -> Optional[Dict]:
+    try:
+        return (await client.get("/health")).json().get("inference")
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+def _queueing(before: Optional[Dict], after: Optional[Dict]) -> Dict:
+    """Executor wait over one step, from the running averages /health reports."""
+    if not before or not after:
+        return {}
+
+    def started(s):
+        return s["completed"] + s["failed"] + s["running"]
+
+    jobs = started(after) - started(before)
+    waited = after["avg_wait_ms"] * started(after) - before["avg_wait_ms"] * started(before)
+    return {
+        "avg_wait_ms": round(waited / jobs, 2) if jobs > 0 else 0.0,
+        "max_wait_ms": after["max_wait_ms"],      # Server lifetime
+        "rejected": after["rejected"] - before["rejected"],
+    }
+
+
+def _summary(samples: List[Sample], wall: float) -> Dict:
+    ok = [s for s in samples if 200 <= s.status < 300]
+    busy = sum(s.status == 503 for s in samples)
+    errors = len(samples) - len(ok) - busy
+    summary = {
+        "requests": len(samples),
+        "throughput_per_s": round(len(ok) / wall, 2),
+        "latency_ms": suite._percentiles([s.latency_ms for s in ok]) if ok else None,
+        "rate_503": round(busy / len(samples), 4) if samples else 0.0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+    }
+    for kind in sorted({s.kind for s in ok}):
+        summary[f"{kind}_latency_ms"] = suite._percentiles([s.latency_ms for s in ok if s.kind == kind])
+    return summary
+
+
+async def _step(client: httpx.AsyncClient, mix: Mix, concurrency: int,
+                seconds: float, think_sec: float) -> Dict:
+    before = await _executor_stats(client)
+    samples: List[Sample] = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(*(_user(client, mix, deadline, think_sec, samples) for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    after = await _executor_stats(client)
+    return {"concurrency": concurrency, **_summary(samples, wall), "queueing": _queueing(before, after)}
+
+
+def _saturation(steps: List[Dict], slo_ms: float) -> Optional[Dict]:
+    """First step that stops scaling: flat throughput, p95 over the SLO, or failures."""
+    best = 0.0
+    for step in steps:
+        reasons = []
+        if best and step["throughput_per_s"] < best * (1 + THROUGHPUT_GAIN):
+            reasons.append("throughput flat")
+        if step["latency_ms"] and step["latency_ms"]["p95"] > slo_ms:
+            reasons.append(f"p95 over {slo_ms:.0f} ms")
+        if step["rate_503"] + step["error_rate"] > ERROR_RATE_LIMIT:
+            reasons.append("requests failing")
+        if reasons:
+            return {"concurrency": step["concurrency"], "reasons": reasons}
+        best = max(best, step["throughput_per_s"])
+    return None
+
+
+async def _wait_ready(client: httpx.AsyncClient) -> None:
+    deadline = time.perf_counter() + READY_TIMEOUT_SEC
+    while time.perf_counter() < deadline:
+        try:
+            health = (await client.get("/health")).json()
+            if health.get("models_loaded"):
+                return
+            if health.get("load_errors"):
+                raise SystemExit(f"[ERROR] Models failed to load: {health['load_errors']}")
+        except (httpx.HTTPError, ValueError):
+            pass
+        await asyncio.sleep(1)
+    raise SystemExit(f"[ERROR] Server not ready after {READY_TIMEOUT_SEC}s")
+
+
+async def _ramp(url: str, mix: Mix, args) -> Dict:
+    limits = httpx.Limits(max_connections=max(args.ramp) + 2)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        await _wait_ready(client)
+        if args.warmup_sec:
+            print(f"── warm-up ({args.warmup_sec:.0f}s) ──")
+            await _step(client, mix, 1, args.warmup_sec, 0)
+
+        steps = []
+        print(f"{'users':>5} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'queue':>8} {'503':>6} {'err':>6}")
+        for concurrency in args.ramp:
+            step = await _step(client, mix, concurrency, args.step_sec, args.think_ms / 1000)
+            steps.append(step)
+            latency = step["latency_ms"] or {"p50": float("nan"), "p95": float("nan"), "p99": float("nan")}
+            print(f"{concurrency:>5} {step['throughput_per_s']:>7.2f} {latency['p50']:>8.0f} "
+                  f"{latency['p95']:>8.0f} {latency['p99']:>8.0f} "
+                  f"{step['queueing'].get('avg_wait_ms', float('nan')):>8.0f} "
+                  f"{step['rate_503']:>6.1%} {step['error_rate']:>6.1%}")
+    return {"steps": steps}
+
+
+# ── In-process server ────────────────────────────────────────────────────────
+def _serve_in_process(tiny_dir: str):
+    """Start the app on a free localhost port with the tiny stand-ins."""
+    os.environ.update(tiny.environment(tiny_dir))
+    for key, value in suite.BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    tiny.build(tiny_dir)
+
+    import uvicorn
+    from main import app
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="load-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit("[ERROR] In-process server failed to start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server, thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", help="Running server to target (default: start the app in-process)")
+    parser.add_argument("--ramp", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Concurrent users per step")
+    parser.add_argument("--step-sec", type=float, default=15.0)
+    parser.add_argument("--warmup-sec", type=float, default=5.0)
+    parser.add_argument("--mix", nargs="+", default=["analyze=4", "voice=1"], help="Endpoint weights")
+    parser.add_argument("--intents", nargs="+", default=["full=2", "depth=1", "objects=1"],
+                        help=f"Query intent weights: {', '.join(INTENT_QUERIES)}")
+    parser.add_argument("--languages", nargs="+", default=["en=3", "es=1"], help="Target language weights")
+    parser.add_argument("--sizes", nargs="+", default=["640x480=2", "1280x720=1"], help="Image size weights")
+    parser.add_argument("--audio", default="background", help="/analyze audio mode")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between a user's requests")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout per request")
+    parser.add_argument("--slo-ms", type=float, default=2000.0, help="p95 latency target")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--tiny-dir", default=os.path.join(tempfile.gettempdir(), "accessworld-tiny"))
+    args = parser.parse_args()
+
+    server = thread = None
+    url = args.url
+    if url is None:
+        url, server, thread = _serve_in_process(args.tiny_dir)
+    mix = Mix(args)
+    print(f"Target: {url}" + (" (in-process, tiny stand-ins)" if server else ""))
+
+    try:
+        report = asyncio.run(_ramp(url, mix, args))
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+    report["saturation"] = _saturation(report["steps"], args.slo_ms)
+    report["peak_throughput_per_s"] = max((s["throughput_per_s"] for s in report["steps"]), default=0.0)
+    report["meta"] = {
+        "target": "in-process" if server else url,
+        "cpus": os.cpu_count(),
+        "mix": mix.kinds, "intents": mix.intents, "languages": mix.languages, "sizes": mix.sizes,
+        "step_sec": args.step_sec, "think_ms": args.think_ms, "slo_ms": args.slo_ms,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    saturation = report["saturation"]
+    if saturation:
+        print(f"  ⚠️  Saturates at {saturation['concurrency']} users ({', '.join(saturation['reasons'])}); "
+              f"peak {report['peak_throughput_per_s']:.2f} req/s")
+    else:
+        print(f"  ✅ Still scaling at {args.ramp[-1]} users; peak {report['peak_throughput_per_s']:.2f} req/s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
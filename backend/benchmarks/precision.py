@@ -0,0 +1,217 @@
+"""
+Precision Regression Harness
+Runs BLIP / DETR / DPT / MarianMT / SpeechT5 at each precision profile on a
+fixed image set and compares every output against fp32:
+
+  • captioner   exact-match rate and token overlap (Jaccard) of captions
+  • detector    label F1, hazard recall and mean IoU of matched boxes
+  • depth       agreement of zone labels and of the safe-to-walk verdict
+  • translator  exact-match rate and token overlap of translations
+  • tts         relative length of the synthesized waveforms
+
+plus per-item latency (mean / p50) and serialized weight size, with the
+savings relative to fp32. Caches and micro-batching are bypassed so every
+item reaches the model.
+
+Usage:
+    python -m benchmarks.precision --images eval/*.jpg
+        [--models captioner detector depth translator tts]
+        [--profiles bf16 int8] [--language es] [--json report.json]
+"""
+import argparse
+import glob
+import io
+import json
+import statistics
+import time
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+import torch
+from scipy.optimize import linear_sum_assignment
+
+from models.frame import PreparedFrame
+from models.phrasebook import TEMPLATE_PHRASES
+from models.precision import PRECISION_MODELS, PRECISIONS
+from models.tracker import iou
+
+
+# Free-text sentences for the translator, beside the fixed answer templates
+SENTENCES = [
+    "a busy street with people walking",
+    "a man riding a bicycle down a city street",
+    "a kitchen with a table and chairs",
+    "a staircase leading up to a building",
+    "Warning: car, person detected nearby.",
+]
+
+
+# ── Running one profile ──────────────────────────────────────────────────────
+def _timed(fn: Callable, inputs: Sequence) -> Dict:
+    fn(inputs[0])                                     # Warm-up
+    outputs, latencies = [], []
+    for item in inputs:
+        start = time.perf_counter()
+        outputs.append(fn(item))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "outputs": outputs,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies), 1),
+            "p50":  round(statistics.median(latencies), 1),
+        },
+    }
+
+
+def _weights_bytes(*modules: torch.nn.Module) -> int:
+    """Serialized state-dict size; counts packed int8 weights, unlike parameters()."""
+    total = 0
+    for module in modules:
+        buffer = io.BytesIO()
+        torch.save(module.state_dict(), buffer)
+        total += buffer.tell()
+    return total
+
+
+def _run(name: str, precision: str, images: List[bytes], language: str) -> Dict:
+    """Load `name` at `precision`, run it over the inputs, and unload it."""
+    frames = lambda min_side: [PreparedFrame.from_bytes(b, min_side=min_side) for b in images]
+
+    if name == "captioner":
+        from models.captioner import CaptionerModel
+        model = CaptionerModel(precision=precision)
+        run = _timed(lambda f: model.caption_batch([f])[0], frames(model.INPUT_MIN_SIDE))
+        run["weights_bytes"] = _weights_bytes(model.model)
+    elif name == "detector":
+        from models.detector import DetectorModel
+        model = DetectorModel(precision=precision)
+        run = _timed(lambda f: model.detect_batch([f])[0], frames(model.INPUT_MIN_SIDE))
+        run["hazards"] = [model.hazardous_objects(d) for d in run["outputs"]]
+        run["weights_bytes"] = _weights_bytes(model.model)
+    elif name == "depth":
+        from models.depth import DepthModel
+        model = DepthModel(precision=precision)
+        run = _timed(lambda f: model.analyze_batch([f])[0], frames(model.INPUT_MIN_SIDE))
+        run["weights_bytes"] = _weights_bytes(model.model)
+    elif name == "translator":
+        from models.translator import TranslatorModel
+        model = TranslatorModel(cache_size=0, precision=precision)
+        run = _timed(lambda s: model._generate([s], language)[0], [*TEMPLATE_PHRASES, *SENTENCES])
+        run["weights_bytes"] = _weights_bytes(model._load(language)[1])
+    elif name == "tts":
+        from models.speech import WaveformCache
+        from models.tts import TTSModel
+        model = TTSModel(precision=precision)
+        model.cache = WaveformCache(0)                # Never reuse a waveform
+        run = _timed(model.waveform, SENTENCES)
+        run["outputs"] = [len(w) for w in run["outputs"]]
+        run["weights_bytes"] = _weights_bytes(model.model, model.vocoder)
+    else:
+        raise ValueError(f"Unknown model '{name}'")
+
+    del model
+    return run
+
+
+# ── Comparing against fp32 ───────────────────────────────────────────────────
+def _jaccard(a: str, b: str) -> float:
+    ta, tb = set(a.lower().split()), set(b.lower().split())
+    return len(ta & tb) / len(ta | tb) if ta | tb else 1.0
+
+
+def _text_agreement(ref: List[str], out: List[str]) -> Dict:
+    return {
+        "exact_match": round(float(np.mean([r == o for r, o in zip(ref, out)])), 3),
+        "token_jaccard": round(float(np.mean([_jaccard(r, o) for r, o in zip(ref, out)])), 3),
+    }
+
+
+def _detection_agreement(ref: Dict, out: Dict) -> Dict:
+    tp = fp = fn = 0
+    ious = []
+    for r, o in zip(ref["outputs"], out["outputs"]):
+        matched = 0
+        if r and o:
+            scores = iou(np.array([d["box"] for d in r]), np.array([d["box"] for d in o]))
+            same = np.array([[a["label"] == b["label"] for b in o] for a in r])
+            scores = np.where(same, scores, 0.0)
+            rows, cols = linear_sum_assignment(-scores)
+            hits = [scores[i, j] for i, j in zip(rows, cols) if scores[i, j] >= 0.5]
+            matched = len(hits)
+            ious.extend(hits)
+        tp += matched
+        fn += len(r) - matched
+        fp += len(o) - matched
+
+    ref_hazards = sum(len(h) for h in ref["hazards"])
+    kept = sum(
+        sum(min(h.count(label), o.count(label)) for label in set(h))
+        for h, o in zip(ref["hazards"], out["hazards"])
+    )
+    return {
+        "label_f1":       round(2 * tp / (2 * tp + fp + fn), 3) if tp + fp + fn else 1.0,
+        "hazard_recall":  round(kept / ref_hazards, 3) if ref_hazards else 1.0,
+        "mean_iou":       round(float(np.mean(ious)), 3) if ious else None,
+    }
+
+
+def _depth_agreement(ref: List[Dict], out: List[Dict]) -> Dict:
+    zones = [
+        r["zones"][z]["label"] == o["zones"][z]["label"]
+        for r, o in zip(ref, out)
+        for z in ("left", "center", "right")
+    ]
+    verdicts = [r["safe_to_walk"] == o["safe_to_walk"] for r, o in zip(ref, out)]
+    return {
+        "zone_label_agreement": round(float(np.mean(zones)), 3),
+        "safe_to_walk_agreement": round(float(np.mean(verdicts)), 3),
+    }
+
+
+def _compare(name: str, ref: Dict, out: Dict) -> Dict:
+    if name in ("captioner", "translator"):
+        return _text_agreement(ref["outputs"], out["outputs"])
+    if name == "detector":
+        return _detection_agreement(ref, out)
+    if name == "depth":
+        return _depth_agreement(ref["outputs"], out["outputs"])
+    return {"length_ratio": round(sum(out["outputs"]) / max(1, sum(ref["outputs"])), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--images", nargs="+", required=True, help="Image files or glob patterns")
+    parser.add_argument("--models", nargs="+", default=list(PRECISION_MODELS), choices=PRECISION_MODELS)
+    parser.add_argument("--profiles", nargs="+", default=["bf16", "int8"], choices=PRECISIONS[1:])
+    parser.add_argument("--language", default="es", help="Target language for the translator")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.images for p in glob.glob(pattern)})
+    if not paths:
+        parser.error("No images matched --images")
+    images = [open(p, "rb").read() for p in paths]
+
+    report: Dict[str, Dict] = {"images": len(images)}
+    for name in args.models:
+        print(f"── {name} ──")
+        ref = _run(name, "fp32", images, args.language)
+        report[name] = {"fp32": {"latency_ms": ref["latency_ms"], "weights_bytes": ref["weights_bytes"]}}
+        for precision in args.profiles:
+            out = _run(name, precision, images, args.language)
+            report[name][precision] = {
+                "latency_ms":    out["latency_ms"],
+                "speedup":       round(ref["latency_ms"]["mean"] / out["latency_ms"]["mean"], 2),
+                "weights_bytes": out["weights_bytes"],
+                "weights_saved": round(1 - out["weights_bytes"] / ref["weights_bytes"], 3),
+                "accuracy":      _compare(name, ref, out),
+            }
+        print(json.dumps(report[name], indent=2))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
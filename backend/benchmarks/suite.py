@@ -0,0 +1,323 @@
+"""
+Offline Benchmark Suite
+Measures every model wrapper and the full run_pipeline on tiny, randomly
+initialised stand-ins of the production architectures (benchmarks/tiny.py),
+over synthetic images and speech, so no checkpoint has to be downloaded.
+
+Reports, as JSON:
+  • models     per wrapper: load time, latency p50 / p95 / p99, throughput, peak RSS
+  • pipeline   per stage and end to end: p50 / p95 / p99, throughput, peak RSS
+
+With --compare, every metric is checked against a stored baseline report and
+the run exits with status 1 if any got worse by more than --tolerance (changes
+smaller than the noise floor of the metric are ignored).
+
+The result, sentence and waveform caches are switched off so every item
+reaches a model; any other setting (precision, batching window, backend...)
+comes from the environment as usual.
+
+Usage:
+    python -m benchmarks.suite [--iterations 30] [--concurrency 1]
+        [--models detector depth captioner translator tts whisper]
+        [--language es] [--json report.json]
+        [--compare baseline.json] [--tolerance 0.15]
+        [--tiny-dir /tmp/accessworld-tiny]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+from PIL import Image
+
+from benchmarks import tiny
+
+
+WRAPPERS = ("detector", "depth", "captioner", "translator", "tts", "whisper")
+
+IMAGE_SIZES = [(640, 480), (1280, 720), (1920, 1080)]   # Cycled through
+SPEECH_SEC = 3.0
+SENTENCES = [
+    "a busy street with people walking",
+    "Warning: car, person detected nearby.",
+    "It appears safe to walk forward.",
+    "a staircase leading up to a building",
+]
+# (query, language): one per intent, the last one translated
+QUERIES = [
+    ("", "en"),
+    ("Is it safe to walk forward?", "en"),
+    ("What is in front of me?", None),   # None → --language
+]
+WARMUP = 2
+
+# Smaller absolute changes are noise, whatever the relative change
+NOISE_FLOOR = {"latency_ms": 1.0, "stages": 1.0, "peak_rss_mb": 16.0, "load_sec": 0.25, "throughput_per_s": 0.5}
+
+# Caches off: a benchmark that hits them measures the cache, not the model
+BENCHMARK_ENV = {
+    "RESULT_CACHE_SIZE": "0",
+    "TRANSLATION_CACHE_SIZE": "0",
+    "TTS_CACHE_MB": "0",
+    "MODEL_ISOLATION": "inline",
+    "RESIDENCY_BUDGET_MB": "0",
+    "MEMORY_TRACE": "off",           # Per-stage tracking resets the RSS high-water mark measured here
+}
+
+
+# ── Synthetic inputs ─────────────────────────────────────────────────────────
+def _images(count: int, seed: int = 0, sizes: Sequence = IMAGE_SIZES) -> List[bytes]:
+    """Photo-like JPEGs: gradients, solid shapes and sensor noise, all distinct."""
+    rng = np.random.default_rng(seed)
+    images = []
+    for i in range(count):
+        w, h = sizes[i % len(sizes)]
+        y, x = np.mgrid[0:h, 0:w]
+        pixels = np.stack([x * 255 // w, y * 255 // h, (x + y) * 127 // (w + h)], axis=-1).astype(np.int16)
+        for _ in range(8):
+            x0, y0 = rng.integers(0, w - 40), rng.integers(0, h - 40)
+            pixels[y0:y0 + rng.integers(20, h // 3), x0:x0 + rng.integers(20, w // 3)] = rng.integers(0, 256, 3)
+        pixels += rng.integers(-12, 13, pixels.shape, dtype=np.int16)
+        buffer = io.BytesIO()
+        Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buffer, "JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+
+def _speech(count: int, seed: int = 0) -> List[bytes]:
+    """16 kHz mono WAVs: voiced-like harmonic bursts over background noise."""
+    import soundfile as sf
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(SPEECH_SEC * 16000)) / 16000
+    clips = []
+    for _ in range(count):
+        pitch = rng.uniform(90, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = (np.sin(2 * np.pi * rng.uniform(2, 5) * t) > 0).astype(np.float32)
+        wave = 0.3 * voice * envelope + 0.02 * rng.standard_normal(t.size)
+        buffer = io.BytesIO()
+        sf.write(buffer, wave.astype(np.float32), 16000, format="WAV")
+        clips.append(buffer.getvalue())
+    return clips
+
+
+# ── Measuring ────────────────────────────────────────────────────────────────
+def _reset_peak_rss() -> None:
+    """Restart the kernel's RSS high-water mark (Linux), so peaks are per phase."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass   # Falls back to the process-lifetime peak
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _percentiles(values: Sequence[float]) -> Dict[str, float]:
+    return {
+        "mean": round(statistics.mean(values), 2),
+        "p50":  round(float(np.percentile(values, 50)), 2),
+        "p95":  round(float(np.percentile(values, 95)), 2),
+        "p99":  round(float(np.percentile(values, 99)), 2),
+    }
+
+
+def _measure(fn: Callable[[Any], Any], inputs: Sequence, concurrency: int) -> Dict:
+    """
+    Latency of each call and overall throughput, `concurrency` calls at a
+    time. The first WARMUP inputs only warm up and are not measured.
+    """
+    for item in inputs[:WARMUP]:
+        fn(item)
+    _reset_peak_rss()
+
+    def timed(item):
+        start = time.perf_counter()
+        result = fn(item)
+        return (time.perf_counter() - start) * 1000, result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        runs = list(pool.map(timed, inputs[WARMUP:]))
+    wall = time.perf_counter() - start
+    return {
+        "latency_ms": _percentiles([ms for ms, _ in runs]),
+        "throughput_per_s": round(len(runs) / wall, 2),
+        "peak_rss_mb": _peak_rss_mb(),
+        "results": [result for _, result in runs],
+    }
+
+
+def _wrapper_calls(store, language: str) -> Dict[str, Callable[[Any], Any]]:
+    return {
+        "detector":   lambda frame: store.detector.detect(frame, use_cache=False),
+        "depth":      lambda frame: store.depth.analyze(frame, use_cache=False),
+        "captioner":  lambda frame: store.captioner.caption(frame, use_cache=False),
+        "translator": lambda sentence: store.translator.translate(sentence, language),
+        "tts":        lambda sentence: store.tts.synthesize_wav(sentence),
+        "whisper":    lambda wav: store.whisper.transcribe(wav),
+    }
+
+
+def run(models: Sequence[str], iterations: int, concurrency: int, language: str) -> Dict:
+    from main import MODEL_CLASSES, ModelStore
+    from models.frame import PreparedFrame
+    from pipeline import run_pipeline
+
+    images = _images(iterations + WARMUP)
+    inputs = {
+        "sentences": [SENTENCES[i % len(SENTENCES)] for i in range(iterations + WARMUP)],
+        "speech": _speech(iterations + WARMUP),
+    }
+    store = ModelStore()
+    calls = _wrapper_calls(store, language)
+    report: Dict[str, Any] = {"models": {}, "pipeline": {}}
+
+    for name in models:
+        print(f"── {name} ──")
+        _reset_peak_rss()
+        store.load_all(workers=1, names=[name])
+        if not store.ready(name):
+            raise RuntimeError(f"{name} failed to load: {store.load_errors.get(name)}")
+        if name in ("detector", "depth", "captioner"):
+            min_side = MODEL_CLASSES[name].INPUT_MIN_SIDE
+            items = [PreparedFrame.from_bytes(b, min_side=min_side) for b in images]
+        else:
+            items = inputs["speech"] if name == "whisper" else inputs["sentences"]
+        result = _measure(calls[name], items, concurrency)
+        del result["results"]
+        report["models"][name] = {"load_sec": store.load_times[name], **result}
+        print(json.dumps(report["models"][name]))
+
+    missing = store.missing(WRAPPERS[:5])   # The pipeline never runs Whisper
+    if missing:
+        print(f"── pipeline skipped: needs {', '.join(missing)} ──")
+        return report
+
+    print("── pipeline ──")
+    queries = [(q, lang or language) for q, lang in QUERIES]
+    work = [(image, *queries[i % len(queries)]) for i, image in enumerate(images)]
+    result = _measure(lambda job: run_pipeline(job[0], store, language=job[2], query=job[1]), work, concurrency)
+    stages: Dict[str, List[float]] = {}
+    for pipeline_result in result.pop("results"):
+        for stage, t in pipeline_result.timings.items():
+            stages.setdefault(stage, []).append(t["end_ms"] - t["start_ms"])
+    result["stages"] = {stage: _percentiles(ms) for stage, ms in sorted(stages.items())}
+    report["pipeline"] = result
+    print(json.dumps(report["pipeline"]["latency_ms"]))
+    return report
+
+
+# ── Comparing with a baseline ────────────────────────────────────────────────
+def _metrics(report: Dict) -> Dict[str, float]:
+    """Flatten the models / pipeline sections to dotted metric paths."""
+    flat: Dict[str, float] = {}
+
+    def walk(prefix: str, value: Any) -> None:
+        if isinstance(value, dict):
+            for key, child in value.items():
+                walk(f"{prefix}.{key}", child)
+        elif isinstance(value, (int, float)) and not prefix.endswith(".mean"):
+            flat[prefix] = float(value)
+
+    for section in ("models", "pipeline"):
+        walk(section, report.get(section, {}))
+    return flat
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> Dict:
+    """Metrics that moved by more than `tolerance` (relative) and the noise floor (absolute)."""
+    now = _metrics(current)
+    regressions, improvements = [], []
+    for metric, before in _metrics(baseline).items():
+        after = now.get(metric)
+        if after is None or before == 0:
+            continue
+        kind = next((k for k in NOISE_FLOOR if f".{k}" in metric), None)
+        if kind is None or abs(after - before) < NOISE_FLOOR[kind]:
+            continue
+        change = (after - before) / before
+        worse = change < -tolerance if kind == "throughput_per_s" else change > tolerance
+        better = change > tolerance if kind == "throughput_per_s" else change < -tolerance
+        row = {"metric": metric, "baseline": before, "current": after, "change": round(change, 3)}
+        if worse:
+            regressions.append(row)
+        elif better:
+            improvements.append(row)
+    return {"tolerance": tolerance, "regressions": regressions, "improvements": improvements}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--iterations", type=int, default=30, help="Measured items per wrapper and for the pipeline")
+    parser.add_argument("--concurrency", type=int, default=1, help="Calls in flight at once")
+    parser.add_argument("--models", nargs="+", default=list(WRAPPERS), choices=WRAPPERS)
+    parser.add_argument("--language", default="es", help="Target language for translation")
+    parser.add_argument("--json", help="Write the report to this file (e.g. to keep as a baseline)")
+    parser.add_argument("--compare", help="Baseline report to check this run against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown / growth")
+    parser.add_argument("--tiny-dir", default=os.path.join(tempfile.gettempdir(), "accessworld-tiny"))
+    args = parser.parse_args()
+
+    # Before anything under models/ is imported: they read these at import time
+    os.environ.update(tiny.environment(args.tiny_dir))
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    tiny.build(args.tiny_dir)
+
+    import torch
+    import transformers
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "transformers": transformers.__version__,
+            "cpus": os.cpu_count(),
+            "torch_threads": torch.get_num_threads(),
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "language": args.language,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        **run(args.models, args.iterations, max(1, args.concurrency), args.language),
+    }
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = {"baseline": args.compare, **compare(report, json.load(f), args.tolerance)}
+        for row in report["comparison"]["regressions"]:
+            print(f"  ⚠️  REGRESSION {row['metric']}: {row['baseline']} → {row['current']} ({row['change']:+.0%})")
+        for row in report["comparison"]["improvements"]:
+            print(f"  ⚡ improved {row['metric']}: {row['baseline']} → {row['current']} ({row['change']:+.0%})")
+        status = 1 if report["comparison"]["regressions"] else 0
+        if not status:
+            print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
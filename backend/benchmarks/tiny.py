@@ -0,0 +1,224 @@
+"""
+Tiny Stand-In Models
+Writes randomly initialised, very small checkpoints of the architectures the
+server runs — BLIP, DETR, DPT, MarianMT, SpeechT5 + HiFiGAN and Whisper — as
+local snapshots (models/snapshots.py), so the real wrappers and the whole
+pipeline can be exercised without downloading ~4 GB of weights.
+
+Processors keep their production settings (input resolution, normalisation,
+tokenisation), so pre- and post-processing costs are real; only the networks
+shrink. Outputs are meaningless and the absolute model times are far below
+production — compare runs against each other, not against the real models.
+
+Usage (from a benchmark, before anything under models/ is imported — their
+settings are read from the environment at import time):
+    os.environ.update(tiny.environment(directory))
+    tiny.build(directory)
+"""
+import json
+import os
+import string
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+import torch
+
+SEED = 0
+
+# Text the tokenizers are trained on (with the answer template phrases)
+CORPUS: List[str] = [
+    "a busy street with people walking",
+    "a man riding a bicycle down a city street",
+    "a kitchen with a table and chairs",
+    "a staircase leading up to a building",
+    "Warning: car, person detected nearby.",
+    "Path ahead is clear.",
+    "Obstacle very close on the left.",
+    string.ascii_letters + string.digits + string.punctuation,
+]
+
+# Extra DETR classes beside the hazard labels, so detections exercise both paths
+DETR_EXTRA_LABELS = ["chair", "bench", "cup"]
+DETR_BIASED_LABEL = "car"   # Most queries clear the confidence threshold with this label
+
+
+def _corpus() -> List[str]:
+    from models.phrasebook import TEMPLATE_PHRASES
+    return [*TEMPLATE_PHRASES, *CORPUS]
+
+
+def _sentencepiece(path: str, model_type: str, vocab_size: int, **ids) -> None:
+    import sentencepiece as spm
+    spm.SentencePieceTrainer.train(
+        sentence_iterator=iter(_corpus() * 4),
+        model_prefix=path,
+        model_type=model_type,
+        vocab_size=vocab_size,
+        hard_vocab_limit=False,
+        character_coverage=1.0,
+        minloglevel=2,
+        **ids,
+    )
+
+
+def _blip(directory: str):
+    from transformers import (
+        BertTokenizer, BlipConfig, BlipForConditionalGeneration, BlipImageProcessor, BlipProcessor,
+    )
+    words = sorted({w.strip(string.punctuation).lower() for s in _corpus() for w in s.split()} - {""})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "[DEC]", "[ENC]", *string.ascii_lowercase, *words]
+    vocab_file = os.path.join(directory, "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(vocab))
+    tokenizer = BertTokenizer(vocab_file, bos_token="[DEC]", additional_special_tokens=["[ENC]"])
+
+    config = BlipConfig(
+        vision_config=dict(hidden_size=32, intermediate_size=64, num_hidden_layers=2,
+                           num_attention_heads=2, image_size=384, patch_size=16),
+        text_config=dict(vocab_size=len(vocab), hidden_size=32, encoder_hidden_size=32, intermediate_size=64,
+                         num_hidden_layers=2, num_attention_heads=2, pad_token_id=0,
+                         bos_token_id=vocab.index("[DEC]"), sep_token_id=vocab.index("[SEP]")),
+    )
+    processor = BlipProcessor(BlipImageProcessor(size={"height": 384, "width": 384}), tokenizer)
+    return processor, BlipForConditionalGeneration(config)
+
+
+def _detr(directory: str):
+    from transformers import DetrConfig, DetrForObjectDetection, DetrImageProcessor, ResNetConfig
+    from models.detector import DetectorModel
+    labels = ["N/A", *sorted(DetectorModel.HAZARDS), *DETR_EXTRA_LABELS]
+    config = DetrConfig(
+        use_timm_backbone=False,
+        use_pretrained_backbone=False,
+        backbone=None,
+        backbone_config=ResNetConfig(embedding_size=8, hidden_sizes=[8, 16, 16, 32], depths=[1, 1, 1, 1],
+                                     layer_type="basic", out_features=["stage4"]),
+        d_model=32, encoder_layers=1, decoder_layers=1, encoder_attention_heads=2, decoder_attention_heads=2,
+        encoder_ffn_dim=64, decoder_ffn_dim=64, num_queries=20,
+        id2label=dict(enumerate(labels)), label2id={label: i for i, label in enumerate(labels)},
+    )
+    model = DetrForObjectDetection(config)
+    with torch.no_grad():
+        model.class_labels_classifier.bias[labels.index(DETR_BIASED_LABEL)] = 8.0
+    return DetrImageProcessor(), model
+
+
+def _dpt(directory: str):
+    from transformers import DPTConfig, DPTForDepthEstimation, DPTImageProcessor
+    config = DPTConfig(
+        hidden_size=32, num_hidden_layers=4, num_attention_heads=2, intermediate_size=64,
+        image_size=384, patch_size=16, is_hybrid=False, backbone_out_indices=[0, 1, 2, 3],
+        neck_hidden_sizes=[8, 16, 32, 32], fusion_hidden_size=16,
+    )
+    return DPTImageProcessor(), DPTForDepthEstimation(config)
+
+
+def _marian(directory: str):
+    from transformers import MarianConfig, MarianMTModel, MarianTokenizer
+    import sentencepiece as spm
+    prefix = os.path.join(directory, "spm")
+    _sentencepiece(prefix, "unigram", 256)
+    sp = spm.SentencePieceProcessor(model_file=f"{prefix}.model")
+    pieces = [sp.id_to_piece(i) for i in range(sp.get_piece_size())]
+    vocab = {"</s>": 0, "<unk>": 1}
+    for piece in pieces:
+        vocab.setdefault(piece, len(vocab))
+    vocab["<pad>"] = len(vocab)
+    vocab_file = os.path.join(directory, "vocab.json")
+    with open(vocab_file, "w") as f:
+        json.dump(vocab, f)
+    tokenizer = MarianTokenizer(f"{prefix}.model", f"{prefix}.model", vocab_file)
+
+    config = MarianConfig(
+        vocab_size=len(vocab), d_model=16, encoder_layers=1, decoder_layers=1,
+        encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=32, decoder_ffn_dim=32,
+        max_position_embeddings=512, pad_token_id=vocab["<pad>"], decoder_start_token_id=vocab["<pad>"],
+        eos_token_id=0, forced_eos_token_id=0, max_length=32,
+    )
+    return tokenizer, MarianMTModel(config)
+
+
+def _speecht5(directory: str):
+    from transformers import (
+        SpeechT5Config, SpeechT5FeatureExtractor, SpeechT5ForTextToSpeech, SpeechT5HifiGan,
+        SpeechT5HifiGanConfig, SpeechT5Processor, SpeechT5Tokenizer,
+    )
+    prefix = os.path.join(directory, "spm_char")
+    _sentencepiece(prefix, "char", 128, bos_id=0, pad_id=1, eos_id=2, unk_id=3)
+    tokenizer = SpeechT5Tokenizer(f"{prefix}.model")
+
+    config = SpeechT5Config(
+        vocab_size=tokenizer.vocab_size, hidden_size=32, encoder_layers=1, decoder_layers=1,
+        encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=64, decoder_ffn_dim=64,
+        speech_decoder_prenet_units=32, speech_decoder_postnet_units=32, speech_decoder_postnet_layers=2,
+        speaker_embedding_dim=16, max_text_positions=600,
+    )
+    vocoder = SpeechT5HifiGan(SpeechT5HifiGanConfig(
+        upsample_initial_channel=32, resblock_kernel_sizes=[3], resblock_dilation_sizes=[[1, 3]],
+    ))
+    speaker = np.random.default_rng(SEED).standard_normal(config.speaker_embedding_dim).astype(np.float32)
+    return SpeechT5Processor(SpeechT5FeatureExtractor(), tokenizer), SpeechT5ForTextToSpeech(config), vocoder, speaker
+
+
+def _whisper(path: str) -> None:
+    from whisper.model import ModelDimensions, Whisper
+    dims = ModelDimensions(
+        n_mels=80, n_audio_ctx=1500, n_audio_state=32, n_audio_head=2, n_audio_layer=1,
+        n_vocab=51865, n_text_ctx=64, n_text_state=32, n_text_head=2, n_text_layer=1,
+    )
+    torch.save({"dims": dims.__dict__, "model_state_dict": Whisper(dims).state_dict()}, path)
+
+
+def environment(directory: str) -> Dict[str, str]:
+    """What the server needs to load the stand-ins instead of the real checkpoints."""
+    return {
+        "MODEL_SNAPSHOT_DIR": directory,
+        "WHISPER_MODEL": os.path.join(directory, "whisper-tiny-random.pt"),
+        "PHRASE_TABLE_PATH": os.path.join(directory, "no-phrase-table.json.gz"),  # Every phrase via MarianMT
+        "HF_HUB_OFFLINE": "1",
+        "TRANSFORMERS_OFFLINE": "1",
+    }
+
+
+def build(directory: str) -> None:
+    """Write every stand-in under `directory`, unless a previous build finished there."""
+    from models.captioner import CaptionerModel
+    from models.depth import DepthModel
+    from models.detector import DetectorModel
+    from models.translator import SUPPORTED_LANGUAGES
+    from models.tts import TTSModel
+
+    marker = os.path.join(directory, ".complete")
+    if os.path.exists(marker):
+        return
+    torch.manual_seed(SEED)
+    print(f"  📥 Writing tiny stand-in models to {directory}...")
+    with tempfile.TemporaryDirectory() as scratch:
+        for model_id, objects in (
+            (DetectorModel.MODEL_ID, _detr(scratch)),
+            (DepthModel.MODEL_ID, _dpt(scratch)),
+            (CaptionerModel.MODEL_ID, _blip(scratch)),
+        ):
+            for obj in objects:
+                obj.save_pretrained(_path(directory, model_id))
+
+        tokenizer, marian = _marian(scratch)
+        for model_id in SUPPORTED_LANGUAGES.values():
+            tokenizer.save_pretrained(_path(directory, model_id))
+            marian.save_pretrained(_path(directory, model_id))
+
+        processor, tts, vocoder, speaker = _speecht5(scratch)
+        processor.save_pretrained(_path(directory, TTSModel.TTS_MODEL))
+        tts.save_pretrained(_path(directory, TTSModel.TTS_MODEL))
+        vocoder.save_pretrained(_path(directory, TTSModel.VOCODER_ID))
+        np.save(os.path.join(_path(directory, TTSModel.TTS_MODEL), TTSModel.SPEAKER_FILE), speaker)
+
+    _whisper(environment(directory)["WHISPER_MODEL"])
+    open(marker, "w").close()
+    print("  ✅ Tiny stand-in models ready.")
+
+
+def _path(directory: str, model_id: str) -> str:
+    from models.snapshots import snapshot_path
+    return os.path.join(directory, os.path.basename(snapshot_path(model_id)))
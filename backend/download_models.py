@@ -1,6 +1,9 @@
 """
 Pre-download all HuggingFace models at Docker build time.
 Ensures near-instant startup in HuggingFace Spaces production.
+
+Each model is also saved as a local safetensors snapshot (models/snapshots.py),
+which the server loads at startup without going through the hub cache.
 """
 from transformers import (
     BlipProcessor, BlipForConditionalGeneration,
@@ -10,44 +13,65 @@ from transformers import (
     MarianTokenizer, MarianMTModel,
 )
 from datasets import load_dataset
+import os
+import numpy as np
 import whisper
 
+from models.snapshots import save_snapshot, snapshot_path
+
 MARIAN_LANGS = ["hi", "fr", "es", "de", "zh"]
 
 def download_all():
     print("=== AccessWorld Model Pre-Downloader ===")
 
-    print("\n[1/8] Whisper-base (ASR)...")
+    print("\n[1/10] Whisper-base (ASR)...")
     whisper.load_model("base")
 
-    print("\n[2/8] BLIP-Large (Captioning)...")
-    BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-large")
-    BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-large")
+    print("\n[2/10] BLIP-Large (Captioning)...")
+    model_id = "Salesforce/blip-image-captioning-large"
+    save_snapshot(model_id, BlipProcessor.from_pretrained(model_id),
+                  BlipForConditionalGeneration.from_pretrained(model_id))
 
-    print("\n[3/8] DETR ResNet-50 (Object Detection)...")
-    DetrImageProcessor.from_pretrained("facebook/detr-resnet-50")
-    DetrForObjectDetection.from_pretrained("facebook/detr-resnet-50")
+    print("\n[3/10] DETR ResNet-50 (Object Detection)...")
+    model_id = "facebook/detr-resnet-50"
+    save_snapshot(model_id, DetrImageProcessor.from_pretrained(model_id),
+                  DetrForObjectDetection.from_pretrained(model_id))
 
-    print("\n[4/8] Intel DPT-Large (Depth Estimation)...")
-    DPTImageProcessor.from_pretrained("Intel/dpt-large")
-    DPTForDepthEstimation.from_pretrained("Intel/dpt-large")
+    print("\n[4/10] Intel DPT-Large (Depth Estimation)...")
+    model_id = "Intel/dpt-large"
+    save_snapshot(model_id, DPTImageProcessor.from_pretrained(model_id),
+                  DPTForDepthEstimation.from_pretrained(model_id))
 
-    print("\n[5/8] SpeechT5 TTS...")
-    SpeechT5Processor.from_pretrained("microsoft/speecht5_tts")
-    SpeechT5ForTextToSpeech.from_pretrained("microsoft/speecht5_tts")
+    print("\n[5/10] SpeechT5 TTS...")
+    model_id = "microsoft/speecht5_tts"
+    save_snapshot(model_id, SpeechT5Processor.from_pretrained(model_id),
+                  SpeechT5ForTextToSpeech.from_pretrained(model_id))
 
-    print("\n[6/8] SpeechT5 HiFiGAN Vocoder...")
-    SpeechT5HifiGan.from_pretrained("microsoft/speecht5_hifigan")
+    print("\n[6/10] SpeechT5 HiFiGAN Vocoder...")
+    model_id = "microsoft/speecht5_hifigan"
+    save_snapshot(model_id, SpeechT5HifiGan.from_pretrained(model_id))
 
-    print("\n[7/8] CMU Arctic Xvectors (Speaker Embeddings)...")
+    print("\n[7/10] CMU Arctic Xvectors (Speaker Embeddings)...")
     load_dataset("Matthijs/cmu-arctic-xvectors", split="validation")
+    from models.tts import TTSModel
+    np.save(os.path.join(snapshot_path(TTSModel.TTS_MODEL), TTSModel.SPEAKER_FILE), TTSModel.speaker_embedding())
 
-    print("\n[8/8] MarianMT Translation Models...")
+    print("\n[8/10] MarianMT Translation Models...")
     for lang in MARIAN_LANGS:
         model_id = f"Helsinki-NLP/opus-mt-en-{lang}"
         print(f"  → {model_id}")
-        MarianTokenizer.from_pretrained(model_id)
-        MarianMTModel.from_pretrained(model_id)
+        save_snapshot(model_id, MarianTokenizer.from_pretrained(model_id),
+                      MarianMTModel.from_pretrained(model_id))
+
+    print("\n[9/10] Multilingual phrase table for answer templates...")
+    from models import phrasebook
+    from models.translator import TranslatorModel
+    phrasebook.build(TranslatorModel(), MARIAN_LANGS, phrasebook.vocabulary()).save()
+
+    if os.getenv("EXPORT_ONNX", "1") == "1":
+        print("\n[10/10] ONNX graphs (DETR, DPT, BLIP encoder, HiFiGAN, MarianMT)...")
+        from models.onnx_backend import export_all
+        export_all()
 
     print("\n✅ All models downloaded successfully!")
 
@@ -0,0 +1,37 @@
+"""
+Gunicorn Config — multi-worker serving with shared model weights
+
+    gunicorn -c gunicorn.conf.py main:app
+
+`uvicorn --workers N` starts N fresh interpreters, each loading every model
+(N × ~4 GB). Here the app is imported once in the gunicorn master
+(preload_app), ModelStore.share() loads every model there, and the workers are
+forked afterwards: the weights are inherited as copy-on-write pages that no
+worker writes to, so an extra worker costs its activations and queues, not
+another copy of BLIP / DPT / SpeechT5.
+"""
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '7860')}"
+workers = int(os.getenv("WEB_WORKERS", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Workers boot in a second or two once forked; the master's model load is
+# not subject to the worker timeout.
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+
+# Audio handles from /analyze must resolve in whichever worker gets the GET
+os.environ.setdefault("AUDIO_STORE_DIR", os.path.join(tempfile.gettempdir(), "accessworld-audio"))
+
+
+def on_starting(server):
+    """Master, after the app import: load everything before the first fork."""
+    import main
+    main.store.share()
+
+
+def post_fork(server, worker):
+    """Split the cores between the workers instead of each using all of them."""
+    import torch
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
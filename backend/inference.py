@@ -0,0 +1,129 @@
+"""
+AccessWorld Inference Executor
+Runs blocking model work (run_pipeline, Whisper) on a dedicated thread pool so
+the uvicorn event loop stays free for health checks, uploads and cheap routes.
+
+Admission is bounded: at most `workers` jobs run and at most `max_queue` wait.
+Anything beyond that is rejected immediately with `ExecutorSaturated`, which
+the routers turn into a 503 instead of letting requests pile up.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+DEFAULT_WORKERS    = int(os.getenv("INFERENCE_WORKERS", "2"))
+DEFAULT_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "16"))
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when the inference queue is full and a job cannot be admitted."""
+
+
+class InferenceExecutor:
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_queue: int = DEFAULT_QUEUE_SIZE):
+        self.workers   = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="inference"
+        )
+        self._lock = threading.Lock()
+
+        # Accounting (guarded by _lock)
+        self._admitted   = 0      # queued + running
+        self._running    = 0
+        self._completed  = 0
+        self._failed     = 0
+        self._rejected   = 0
+        self._wait_total = 0.0    # seconds spent queued, summed over started jobs
+        self._wait_max   = 0.0
+        self._run_total  = 0.0    # seconds spent executing, summed over finished jobs
+
+    # ── Submission ───────────────────────────────────────────────────────────
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` on the inference pool and await its result.
+
+        Raises:
+            ExecutorSaturated: if `workers + max_queue` jobs are already admitted.
+        """
+        return await self.submit(fn, *args, **kwargs)
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> "asyncio.Future":
+        """
+        Admit `fn(*args, **kwargs)` now and return an awaitable for its result.
+        Must be called from the event loop. Lets a route reject with 503
+        before it commits to a (streaming) response.
+
+        Raises:
+            ExecutorSaturated: if `workers + max_queue` jobs are already admitted.
+        """
+        with self._lock:
+            if self._admitted >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturated(
+                    f"Inference queue full ({self._admitted} jobs admitted)."
+                )
+            self._admitted += 1
+
+        submitted = time.perf_counter()
+
+        def _job():
+            started = time.perf_counter()
+            with self._lock:
+                waited = started - submitted
+                self._running    += 1
+                self._wait_total += waited
+                self._wait_max    = max(self._wait_max, waited)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._running   -= 1
+                    self._run_total += time.perf_counter() - started
+                    if ok:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+
+        try:
+            future = self._pool.submit(_job)
+        except RuntimeError:
+            self._release(None)
+            raise
+        # Release the admission slot when the job finishes (or is cancelled
+        # before it starts), not when the awaiting coroutine goes away.
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    # ── Introspection ────────────────────────────────────────────────────────
+    def stats(self) -> Dict:
+        """Snapshot of queue depth and wait/run-time accounting."""
+        with self._lock:
+            started = self._completed + self._failed + self._running
+            finished = self._completed + self._failed
+            return {
+                "workers":        self.workers,
+                "max_queue":      self.max_queue,
+                "running":        self._running,
+                "queued":         self._admitted - self._running,
+                "completed":      self._completed,
+                "failed":         self._failed,
+                "rejected":       self._rejected,
+                "avg_wait_ms":    round(1000 * self._wait_total / started, 2) if started else 0.0,
+                "max_wait_ms":    round(1000 * self._wait_max, 2),
+                "avg_run_ms":     round(1000 * self._run_total / finished, 2) if finished else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
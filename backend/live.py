@@ -0,0 +1,159 @@
+"""
+AccessWorld Live Camera Session
+Continuous camera mode: the phone streams frames over a WebSocket and only
+changes are pushed back.
+
+Per frame:
+  • decode once and fingerprint it (dHash) — sub-millisecond
+  • BLIP caption only when the scene actually changed
+  • DETR / DPT every `detect_every` / `depth_every` frames, and on a scene change
+  • between DETR keyframes, boxes are carried forward by a Kalman box tracker,
+    which also flags hazards whose boxes keep growing as approaching; tracks
+    are kept across scene changes and dropped only on a hard cut
+  • an update is sent only when the hazards, zone labels or caption changed
+"""
+import os
+import time
+from typing import Dict, List, Optional
+
+from models.frame import PreparedFrame
+from models.scene import SceneChangeDetector
+from models.tracker import BoxTracker
+from pipeline import compose_segments, localize_answer, stage_pool, classify_intent
+from stage_graph import StageGraph
+
+
+LIVE_DETECT_EVERY = int(os.getenv("LIVE_DETECT_EVERY", "3"))
+LIVE_DEPTH_EVERY  = int(os.getenv("LIVE_DEPTH_EVERY", "3"))
+
+
+class LiveSession:
+    def __init__(self, models, language: str = "en", query: str = ""):
+        self.models = models
+        self.language = language
+        self.query = query
+        self.detect_every = LIVE_DETECT_EVERY
+        self.depth_every = LIVE_DEPTH_EVERY
+        self.caption = True                   # Re-caption on scene change
+        self.scene = SceneChangeDetector()
+        self.tracker = BoxTracker()
+
+        self.frames = 0
+        self.dropped = 0                      # Frames skipped while busy
+        self._since_detect = 0
+        self._since_depth = 0
+
+        # Last known state, pushed to the client only when it changes
+        self.description = ""
+        self.objects: List[Dict] = []
+        self.hazards: List[str] = []
+        self.approaching: List[str] = []
+        self.depth: Dict = {}
+
+    def configure(self, options: Dict) -> None:
+        """Apply client options: language, query, detect_every, depth_every, caption."""
+        if "language" in options:
+            self.language = str(options["language"])
+        if "query" in options:
+            self.query = str(options["query"])
+        if "detect_every" in options:
+            self.detect_every = max(1, int(options["detect_every"]))
+        if "depth_every" in options:
+            self.depth_every = max(1, int(options["depth_every"]))
+        if "caption" in options:
+            self.caption = bool(options["caption"])
+
+    def process(self, image_bytes: bytes) -> Optional[Dict]:
+        """
+        Analyze one camera frame (blocking — run on the inference executor).
+
+        Returns:
+            An update message if anything the user hears changed, else None.
+
+        Raises:
+            FrameDecodeError: if the frame cannot be decoded.
+        """
+        models = self.models
+        now = time.monotonic()
+        first = self.frames == 0
+        self.frames += 1
+        self._since_detect += 1
+        self._since_depth += 1
+
+        # BLIP may still be loading: captions resume once it is ready
+        caption = self.caption and models.ready("captioner")
+        min_side = models.input_min_side(["detector", "depth"] + (["captioner"] if caption else []))
+        frame = PreparedFrame.from_bytes(image_bytes, min_side=min_side)
+        scene_changed = self.scene.changed(frame)
+
+        # Detections and depth bypass the near-duplicate result cache: a slowly
+        # approaching object barely moves the dHash but must still be tracked.
+        graph = StageGraph(stage_pool)
+        if scene_changed or self._since_detect >= self.detect_every:
+            graph.add("detect", lambda: models.detector.detect(frame, use_cache=False))
+            self._since_detect = 0
+        if scene_changed or self._since_depth >= self.depth_every:
+            graph.add("depth", lambda: models.depth.analyze(frame, use_cache=False))
+            self._since_depth = 0
+        if scene_changed and caption:
+            graph.add("caption", lambda: models.captioner.caption(frame))
+        out = graph.run()
+
+        changed = []
+        if "detect" in out:
+            # Tracks survive scene changes: those come with camera motion, just
+            # when the approach history matters, and unmatched tracks age out of
+            # the IoU matching by themselves. Only a hard cut clears them, so a
+            # track from an unrelated image cannot claim a new box.
+            if self.scene.hard_cut:
+                self.tracker.reset()
+            self.objects = self.tracker.update(out["detect"], now)
+        else:
+            self.objects = self.tracker.propagate(now)
+        hazards = models.detector.hazardous_objects(self.objects)
+        if sorted(hazards) != sorted(self.hazards):
+            changed.append("hazards")
+        self.hazards = hazards
+        approaching = models.detector.approaching_hazards(self.objects)
+        if sorted(approaching) != sorted(self.approaching):
+            changed.append("approaching")
+        self.approaching = approaching
+        if "depth" in out:
+            if _zone_labels(out["depth"]) != _zone_labels(self.depth):
+                changed.append("depth")
+            self.depth = out["depth"]
+        if "caption" in out and out["caption"] != self.description:
+            self.description = out["caption"]
+            changed.append("description")
+
+        if not changed and not first:
+            return None
+        return self._update(changed, scene_changed, graph.timings)
+
+    def _update(self, changed: List[str], scene_changed: bool, timings: Dict) -> Dict:
+        safe = self.depth.get("safe_to_walk", True) and len(self.hazards) == 0
+        intent = classify_intent(self.query) if self.query else "full"
+        segments = compose_segments(
+            intent, self.description, self.objects, self.hazards, self.depth, safe,
+        )
+        # MarianMT may still be loading: answers stay in English until it is ready
+        translator = self.models.translator if self.models.ready("translator") else None
+        return {
+            "type":            "update",
+            "frame":           self.frames,
+            "changed":         changed,
+            "scene_changed":   scene_changed,
+            "hazards":         self.hazards,
+            "approaching":     self.approaching,
+            "objects":         self.objects,
+            "depth":           self.depth,
+            "safe_to_walk":    safe,
+            "description":     self.description,
+            "translated_text": localize_answer(segments, self.language, translator),
+            "timings":         timings,
+            "sent_at":         time.time(),
+        }
+
+
+def _zone_labels(depth: Dict) -> Dict[str, str]:
+    return {name: zone.get("label") for name, zone in depth.get("zones", {}).items()}
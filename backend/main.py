@@ -1,8 +1,29 @@
 """
 AccessWorld Backend — FastAPI App Entry Point
+
+Models load in the background, concurrently, as soon as the app starts. Each
+one becomes usable the moment it is ready: routers check the models a request
+needs, so e.g. a depth-only question is served while BLIP is still loading.
+
+Model attributes go through a residency manager that keeps them within a RAM
+budget: idle models can be evicted and are reloaded on their next use.
+
+Under gunicorn (gunicorn.conf.py) the models are instead loaded once in the
+master via ModelStore.share(), and the workers forked from it share them.
+
+With MODEL_ISOLATION=process the models run in per-family worker processes
+(model_workers.py) and the store holds proxies to them.
 """
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from typing import Callable, Dict, Iterable, List, Optional
+import gc
+import os
+import threading
+import time
+import traceback
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from models.whisper import WhisperModel
@@ -11,42 +32,235 @@ from models.detector import DetectorModel
 from models.depth import DepthModel
 from models.tts import TTSModel
 from models.translator import TranslatorModel
-from routers import analyze, voice, health
+from models.precision import precision_profile
+from models.onnx_backend import backend_profile
+from models import memory, metrics
+from inference import InferenceExecutor
+from model_workers import ISOLATION_MODES, MODEL_ISOLATION, ModelSpec, ModelWorkers
+from residency import ResidencyManager
+from audio_store import AudioStore
+from routers import analyze, audio, live, voice, health
+from routers import metrics as metrics_router
+from routers import debug
+
+# Threads loading models concurrently (from_pretrained is mostly I/O and
+# tensor copies, which release the GIL)
+MODEL_LOAD_WORKERS = int(os.getenv("MODEL_LOAD_WORKERS", "6"))
+
+MODEL_NAMES = ("detector", "depth", "captioner", "translator", "tts", "whisper")
+
 
 # ── Global model store ───────────────────────────────────────────────────────
+MODEL_CLASSES = {
+    "whisper":    WhisperModel,
+    "captioner":  CaptionerModel,
+    "detector":   DetectorModel,
+    "depth":      DepthModel,
+    "tts":        TTSModel,
+    "translator": TranslatorModel,
+}
+
+# Never evicted: the hazard path, and the translator wrapper (its MarianMT
+# pairs are residency entries of their own)
+PINNED_MODELS = ("detector", "depth", "translator")
+
+# Loaded at startup; the rest load on first use
+MODEL_PRELOAD = [
+    name.strip() for name in os.getenv("MODEL_PRELOAD", ",".join(MODEL_NAMES)).split(",") if name.strip()
+]
+
+
+def _resident(name: str) -> property:
+    """Model attribute backed by the residency manager: loads on use, may be evicted."""
+    return property(lambda self: self._model(name))
+
+
 class ModelStore:
-    whisper: WhisperModel = None
-    captioner: CaptionerModel = None
-    detector: DetectorModel = None
-    depth: DepthModel = None
-    tts: TTSModel = None
-    translator: TranslatorModel = None
-    loaded: bool = False
+    whisper: WhisperModel = _resident("whisper")
+    captioner: CaptionerModel = _resident("captioner")
+    detector: DetectorModel = _resident("detector")
+    depth: DepthModel = _resident("depth")
+    tts: TTSModel = _resident("tts")
+    translator: TranslatorModel = _resident("translator")
+    executor: InferenceExecutor = None   # Bounded pool all model work runs on
+    loaded: bool = False                 # Every preloaded model is ready
+    shared: bool = False                 # Loaded before forking workers, see share()
+
+    def __init__(
+        self,
+        precision: Optional[Dict[str, str]] = None,
+        backend: Optional[Dict[str, str]] = None,
+        residency: Optional[ResidencyManager] = None,
+        isolation: str = MODEL_ISOLATION,
+    ):
+        # Per-model fp32 / bf16 / int8, see models/precision.py
+        self.precision = precision_profile(precision)
+        # Per-model torch / onnx, see models/onnx_backend.py
+        self.backend = backend_profile(backend)
+        # In this process (inline) or in per-family worker processes, see model_workers.py
+        if isolation not in ISOLATION_MODES:
+            raise ValueError(f"MODEL_ISOLATION must be one of {', '.join(ISOLATION_MODES)}, got {isolation!r}")
+        self.isolation = isolation
+        self.workers = ModelWorkers(self.specs()) if isolation == "process" else None
+        # RAM budget, LRU eviction and reload on use, see residency.py
+        self.residency = residency or ResidencyManager()
+        if self.workers is not None:
+            self.residency.budget_bytes = 0   # Proxies hold no weights; nothing to evict
+        for name, factory in self.factories().items():
+            self.residency.register(name, factory, unload=lambda name=name: self._unload(name),
+                                    pinned=name in PINNED_MODELS)
+        # Models requests may use: preloaded ones once loaded, lazy ones at once
+        self._available = set(MODEL_NAMES) - set(MODEL_PRELOAD)
+        self.load_times: Dict[str, float] = {}    # name → seconds
+        self.load_errors: Dict[str, str] = {}     # name → error message
+
+    def _model(self, name: str):
+        return self.residency.get(name) if name in self._available else None
+
+    def _unload(self, name: str) -> None:
+        """Stop the batcher thread of a model being evicted; it would keep the weights alive."""
+        batcher = getattr(self.residency.peek(name), "batcher", None)
+        if batcher is not None:
+            batcher.close()
+
+    def ready(self, name: str) -> bool:
+        return name in self._available
+
+    def missing(self, names: Iterable[str]) -> List[str]:
+        """The subset of `names` not loaded yet."""
+        return [name for name in names if not self.ready(name)]
+
+    def resident(self, name: str):
+        """The model if it is in memory right now, else None. Never loads."""
+        return self.residency.peek(name)
+
+    def memory_stats(self) -> Dict:
+        """Bytes of each model in memory, MarianMT pairs included, and the translation cache."""
+        models = {
+            name: entry["bytes"]
+            for name, entry in self.residency.stats()["models"].items()
+            if entry["resident"]
+        }
+        translator = self.resident("translator")
+        cache = translator.memory_stats() if translator is not None else {}
+        for lang, nbytes in cache.pop("pairs", {}).items():
+            models[f"translator:{lang}"] = nbytes
+        return {"models_bytes": models, "translator": cache}
+
+    def memory_probe(self) -> Dict:
+        """Flat numbers for the memory history (see models/memory.py)."""
+        stats = self.memory_stats()
+        pairs = [n for name, n in stats["models_bytes"].items() if name.startswith("translator:")]
+        return {
+            "model_bytes":               sum(stats["models_bytes"].values()),
+            "translator_pairs":          len(pairs),
+            "translator_pair_bytes":     sum(pairs),
+            "translation_cache_entries": stats["translator"].get("sentence_entries", 0),
+            "translation_cache_bytes":   stats["translator"].get("sentence_bytes", 0),
+        }
+
+    def input_min_side(self, names: Iterable[str]) -> int:
+        """Largest shortest-edge input the given vision models resize to."""
+        return max(MODEL_CLASSES[name].INPUT_MIN_SIDE for name in names)
+
+    def status(self) -> Dict[str, str]:
+        """name → ready | loading | failed"""
+        return {
+            name: "ready" if self.ready(name) else "failed" if name in self.load_errors else "loading"
+            for name in MODEL_NAMES
+        }
+
+    def specs(self) -> Dict[str, ModelSpec]:
+        """Model class and constructor arguments, hazard path (DETR, DPT) first."""
+        p, b = self.precision, self.backend
+        return {
+            name: (MODEL_CLASSES[name], {"precision": p[name], "backend": b[name]} if name in p else {})
+            for name in MODEL_NAMES
+        }
+
+    def factories(self) -> Dict[str, Callable[[], object]]:
+        """Model constructors (or, isolated, proxy constructors), hazard path first."""
+        if self.workers is not None:
+            return {name: (lambda name=name: self.workers.proxy(name)) for name in MODEL_NAMES}
+        factories = {name: (lambda cls=cls, kwargs=kwargs: cls(**kwargs)) for name, (cls, kwargs) in self.specs().items()}
+        factories["translator"] = lambda: TranslatorModel(residency=self.residency, **self.specs()["translator"][1])
+        return factories
+
+    def load_all(self, workers: int = MODEL_LOAD_WORKERS, names: Iterable[str] = MODEL_PRELOAD) -> None:
+        """Load `names` concurrently; each model is published as soon as it is ready."""
+        names = list(names)
+        print(f"[INFO] Loading {', '.join(names)} ({workers} at a time) - "
+              f"this may take several minutes on first run...")
+        print(f"[INFO] Precision: {', '.join(f'{k}={v}' for k, v in self.precision.items())}")
+        print(f"[INFO] Backend:   {', '.join(f'{k}={v}' for k, v in self.backend.items())}")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="load") as pool:
+            for name in self.factories():
+                if name in names:
+                    pool.submit(self._load, name)
+        self.loaded = not self.missing(MODEL_NAMES)
+        elapsed = time.perf_counter() - start
+        failed = [name for name in names if name in self.load_errors]
+        if failed:
+            print(f"[ERROR] Models failed to load: {', '.join(failed)} ({elapsed:.1f}s)")
+        else:
+            print(f"[SUCCESS] Models loaded in {elapsed:.1f}s "
+                  f"({self.residency.resident_bytes() / 2**20:.0f} MB resident)."
+                  + (" AccessWorld is ready." if self.loaded else ""))
+
+    def share(self) -> None:
+        """
+        Load every model (and every MarianMT pair) in this process, before it
+        forks the workers: they inherit the weights as copy-on-write pages.
+        """
+        if self.workers is not None:
+            raise RuntimeError("MODEL_ISOLATION=process cannot be combined with preloaded gunicorn workers")
+        # Evicting in a worker would free nothing (the parent keeps the pages)
+        # and the reload would be a private copy, so the budget is lifted.
+        self.residency.budget_bytes = 0
+        self.load_all(names=MODEL_NAMES)
+        if self.ready("translator"):
+            self.translator.warm()
+        self.shared = True
+        # Move everything loaded so far out of the collector's reach: scanning
+        # it in the workers would write to the inherited objects' pages.
+        gc.collect()
+        gc.freeze()
+        print(f"[INFO] Models shared with forked workers "
+              f"({self.residency.resident_bytes() / 2**20:.0f} MB, {gc.get_freeze_count()} objects frozen).")
+
+    def _load(self, name: str) -> None:
+        start = time.perf_counter()
+        try:
+            self.residency.get(name)
+        except Exception as e:
+            self.load_errors[name] = str(e)
+            print(f"[ERROR] {name} failed to load: {e}")
+            traceback.print_exc()
+            return
+        self.load_times[name] = round(time.perf_counter() - start, 2)
+        self._available.add(name)
+        print(f"[INFO] {name} ready in {self.load_times[name]:.1f}s.")
 
 store = ModelStore()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load all models once at startup."""
-    import traceback
-    try:
-        print("[INFO] Loading models - this may take several minutes on first run...")
-        store.whisper    = WhisperModel()
-        store.captioner  = CaptionerModel()
-        store.detector   = DetectorModel()
-        store.depth      = DepthModel()
-        store.tts        = TTSModel()
-        store.translator = TranslatorModel()
-        store.loaded     = True
-        print("[SUCCESS] All models loaded. AccessWorld is ready.")
-    except Exception as e:
-        print(f"[ERROR] LIFESPAN ERROR: {e}")
-        traceback.print_exc()
-        raise e
-    
+    """Start serving at once; models load in the background (unless already shared)."""
+    store.executor = InferenceExecutor()
+    print(f"[INFO] Inference executor: {store.executor.workers} workers, "
+          f"queue of {store.executor.max_queue}.")
+    if not store.shared:
+        threading.Thread(target=store.load_all, name="model-loader", daemon=True).start()
+    memory.start_sampling(store.memory_probe)
+
     yield
     print("[INFO] Shutting down AccessWorld.")
+    memory.stop_sampling()
+    store.executor.shutdown(wait=False)
+    if store.workers is not None:
+        store.workers.close()
 
 
 app = FastAPI(
@@ -64,12 +278,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_http_metrics(request: Request, call_next):
+    """Latency and status per route template (/audio/{audio_id}, not per id)."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        label = getattr(route, "path", "unmatched")
+        metrics.HTTP_SECONDS.observe(time.perf_counter() - start, route=label)
+        metrics.HTTP_REQUESTS.inc(route=label, status=str(status))
+
+
 # Attach the model store to app state so routers can access it
 app.state.models = store
+app.state.audio  = AudioStore()   # Spoken answers behind /audio/{id} handles
 
 app.include_router(health.router, tags=["Health"])
 app.include_router(analyze.router, prefix="/analyze", tags=["Analyze"])
 app.include_router(voice.router, prefix="/voice", tags=["Voice"])
+app.include_router(audio.router, prefix="/audio", tags=["Audio"])
+app.include_router(live.router, tags=["Live"])
+app.include_router(metrics_router.router, tags=["Health"])
+if debug.DEBUG_ENDPOINTS:
+    app.include_router(debug.router, prefix="/debug", tags=["Debug"])
 
 
 @app.get("/", tags=["Root"])
@@ -0,0 +1,633 @@
+"""
+AccessWorld Model Worker Processes
+Optional out-of-process model hosting (MODEL_ISOLATION=process).
+
+Each model family — vision (BLIP, DETR, DPT), ASR (Whisper), TTS (SpeechT5)
+and translation (MarianMT) — runs in its own pool of worker processes, each
+with a torch thread pool sized so the families don't oversubscribe the cores.
+The API process holds a `ModelProxy` per model with the wrapper's API, so
+pipeline stages become IPC calls without touching the call sites.
+
+Transport: requests and small values are pickled over a pipe. Decoded frame
+pixels, audio bytes and arrays of SHM_MIN_BYTES or more travel through shared
+memory instead — a reusable segment pool on the API side for arguments, one
+segment per value on the worker side for results.
+
+A frame is written once per request: its segment is keyed by the frame's
+digest and size and held until the last frame object with that content is
+gone, so DETR, DPT and BLIP calls on one upload share a single copy. A worker
+process likewise hands concurrent calls on the same segment one PreparedFrame,
+so they share its `cached()` preprocessing (the dHash, resized inputs).
+
+A worker that dies fails its in-flight calls with WorkerCrashed and is
+restarted; a call that takes longer than MODEL_CALL_TIMEOUT_SEC raises
+WorkerTimeout, so a wedged model cannot hold API threads forever. Its
+segments are retired, not reused: the worker may still be reading them.
+"""
+import importlib
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from models.frame import PreparedFrame
+
+
+MODEL_ISOLATION           = os.getenv("MODEL_ISOLATION", "inline")             # inline | process
+MODEL_CALL_TIMEOUT_SEC    = float(os.getenv("MODEL_CALL_TIMEOUT_SEC", "60"))
+MODEL_PROCESS_CONCURRENCY = int(os.getenv("MODEL_PROCESS_CONCURRENCY", "4"))   # Calls in flight per process
+
+ISOLATION_MODES = ("inline", "process")
+
+# family → the models its processes host
+FAMILIES: Dict[str, Tuple[str, ...]] = {
+    "vision":      ("captioner", "detector", "depth"),
+    "asr":         ("whisper",),
+    "tts":         ("tts",),
+    "translation": ("translator",),
+}
+
+SHM_MIN_BYTES = 64 * 1024   # Below this, pickling through the pipe is cheaper
+RESTART_DELAY_SEC = 1.0
+MAX_BOOT_FAILURES = 3       # Consecutive exits before ready, then the process is given up
+
+# Cheap introspection / lookups: answered on the worker's receive thread so
+# they never queue behind inference (e.g. /health while BLIP is generating)
+_INLINE = {"stats", "cache_stats", "memory_stats", "phrase", "join", "hazardous_objects", "approaching_hazards"}
+
+# (model class, constructor kwargs); the class must be importable by module path
+ModelSpec = Tuple[type, Dict[str, Any]]
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process serving a call exited before answering."""
+
+
+class WorkerTimeout(TimeoutError):
+    """A worker did not answer within MODEL_CALL_TIMEOUT_SEC."""
+
+
+def family_processes(family: str) -> int:
+    return max(1, int(os.getenv(f"MODEL_PROCESSES_{family.upper()}", "1")))
+
+
+def family_threads(family: str, total_processes: int) -> int:
+    """torch intra-op threads per process: by default the cores split evenly."""
+    default = max(1, (os.cpu_count() or 1) // max(1, total_processes))
+    return max(1, int(os.getenv(f"MODEL_THREADS_{family.upper()}", str(default))))
+
+
+# ── Shared-memory transport ──────────────────────────────────────────────────
+class _Segments:
+    """Reusable argument segments owned (created and unlinked) by the API process."""
+
+    def __init__(self):
+        self._free: List[shared_memory.SharedMemory] = []
+        self._all: List[shared_memory.SharedMemory] = []
+        # (digest, shape) → [segment, ref, live frames]: frame pixels written once
+        self._frames: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, nbytes: int) -> shared_memory.SharedMemory:
+        with self._lock:
+            fits = [s for s in self._free if s.size >= nbytes]
+            if fits:
+                segment = min(fits, key=lambda s: s.size)
+                self._free.remove(segment)
+                return segment
+        segment = shared_memory.SharedMemory(create=True, size=max(nbytes, SHM_MIN_BYTES))
+        with self._lock:
+            self._all.append(segment)
+        return segment
+
+    def release(self, segments: List[shared_memory.SharedMemory]) -> None:
+        with self._lock:
+            self._free.extend(segments)
+
+    def discard(self, segments: List[shared_memory.SharedMemory], frames: Iterable[str] = ()) -> None:
+        """
+        Retire the segments of a call that timed out: its worker may still be
+        reading them, so they are never handed out again. Argument segments
+        are unlinked now (the worker's mapping outlives the name); shared
+        frame segments (by name) once their last frame is collected, since
+        those frames may still be passed to other calls.
+        """
+        frames = set(frames)
+        with self._lock:
+            for segment in segments:
+                self._all.remove(segment)
+            for key in [k for k, shared in self._frames.items() if shared[0].name in frames]:
+                del self._frames[key]
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    def frame(self, frame: PreparedFrame) -> Tuple[str, tuple, str]:
+        """
+        Segment reference holding `frame`'s pixels. Written on first use and
+        shared by every frame of the same content until the last one is
+        collected; call once per frame object (see _pack_arg).
+        """
+        image = frame.image
+        shape = (image.height, image.width, len(image.getbands()))
+        key = (frame.digest, shape) if frame.digest else ("object", id(frame))
+        with self._lock:
+            shared = self._frames.get(key)
+            if shared is not None:
+                shared[2] += 1
+        if shared is None:
+            pixels = np.asarray(image)
+            segment = self.acquire(pixels.nbytes)
+            ref = _write(pixels, segment)
+            with self._lock:
+                shared = self._frames.get(key)
+                if shared is None:
+                    shared = self._frames[key] = [segment, ref, 1]
+                else:                         # Written concurrently by another frame object
+                    shared[2] += 1
+                    self._free.append(segment)
+        weakref.finalize(frame, self._drop_frame, key, shared)
+        return shared[1]
+
+    def _drop_frame(self, key: tuple, shared: list) -> None:
+        with self._lock:
+            shared[2] -= 1
+            if shared[2] > 0:
+                return
+            if self._frames.get(key) is shared:
+                del self._frames[key]
+                self._free.append(shared[0])
+                return
+            if shared[0] not in self._all:        # Pool already closed
+                return
+            self._all.remove(shared[0])           # Discarded after a timeout
+        shared[0].close()
+        shared[0].unlink()
+
+    def close(self) -> None:
+        with self._lock:
+            for segment in self._all:
+                segment.close()
+                segment.unlink()
+            self._all.clear()
+            self._free.clear()
+            self._frames.clear()
+
+
+def _write(array: np.ndarray, segment: shared_memory.SharedMemory) -> Tuple[str, tuple, str]:
+    np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+    return segment.name, array.shape, array.dtype.str
+
+
+def _pack_arg(value: Any, segments: _Segments, used: list) -> tuple:
+    """API side: frames and large buffers into shared memory, the rest as is."""
+    if isinstance(value, PreparedFrame):
+        # Once per frame and pool, however many calls the frame is passed to
+        ref = value.cached(("shm", id(segments)), lambda: segments.frame(value))
+        return ("frame", ref, value.original_size, value.digest)
+    if isinstance(value, (bytes, bytearray)) and len(value) >= SHM_MIN_BYTES:
+        value = np.frombuffer(value, np.uint8)
+        kind = "bytes"
+    elif isinstance(value, np.ndarray) and value.nbytes >= SHM_MIN_BYTES:
+        kind = "array"
+    else:
+        return ("value", value)
+    segment = segments.acquire(value.nbytes)
+    used.append(segment)
+    return (kind, _write(value, segment))
+
+
+def _pack_result(value: Any) -> tuple:
+    """Worker side: large results into a fresh segment the API process unlinks."""
+    if isinstance(value, (bytes, bytearray)) and len(value) >= SHM_MIN_BYTES:
+        array, kind = np.frombuffer(value, np.uint8), "bytes"
+    elif isinstance(value, np.ndarray) and value.nbytes >= SHM_MIN_BYTES:
+        array, kind = value, "array"
+    else:
+        return ("value", value)
+    segment = shared_memory.SharedMemory(create=True, size=array.nbytes)
+    ref = _write(array, segment)
+    segment.close()
+    return (kind, ref)
+
+
+def _unpack_result(packed: tuple) -> Any:
+    kind, payload = packed[0], packed[1]
+    if kind == "value":
+        return payload
+    name, shape, dtype = payload
+    segment = shared_memory.SharedMemory(name=name)
+    try:
+        array = np.ndarray(shape, np.dtype(dtype), buffer=segment.buf).copy()
+    finally:
+        segment.close()
+        segment.unlink()
+    return array.tobytes() if kind == "bytes" else array
+
+
+# ── Worker process ───────────────────────────────────────────────────────────
+class _Host:
+    """Runs inside a worker process: builds the family's models and serves calls."""
+
+    def __init__(self, conn, specs: Dict[str, Tuple[str, str, Dict]], concurrency: int):
+        self.conn = conn
+        self.specs = specs
+        self.models: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.segments: Dict[str, shared_memory.SharedMemory] = {}   # Attached argument segments
+        # (segment, digest, shape) → the frame calls in flight share, with its cached() preprocessing
+        self.frames: "weakref.WeakValueDictionary[tuple, PreparedFrame]" = weakref.WeakValueDictionary()
+        self.frames_lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="call")
+        self.send_lock = threading.Lock()
+
+    def load(self) -> None:
+        for name, (module, cls, kwargs) in self.specs.items():
+            try:
+                self.models[name] = getattr(importlib.import_module(module), cls)(**kwargs)
+            except Exception as e:
+                self.errors[name] = str(e)
+                traceback.print_exc()
+        self.send(("ready", list(self.models), self.errors))
+
+    def send(self, message: tuple) -> None:
+        with self.send_lock:
+            self.conn.send(message)
+
+    def serve(self) -> None:
+        while True:
+            try:
+                request = self.conn.recv()
+            except (EOFError, OSError):
+                break              # API process went away
+            if request is None:
+                break
+            call_id, model, path, kind = request[:4]
+            if kind == "get" or path.rsplit(".", 1)[-1] in _INLINE:
+                self.handle(request)
+            else:
+                self.pool.submit(self.handle, request)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def handle(self, request: tuple) -> None:
+        call_id, model, path, kind, args, kwargs = request
+        try:
+            target = self.models[model]
+            for attr in path.split("."):
+                target = getattr(target, attr)
+            if kind == "get":
+                self.send((call_id, "ok", _pack_result(target)))
+                return
+            result = target(*[self.unpack(a) for a in args], **{k: self.unpack(v) for k, v in kwargs.items()})
+            if isinstance(result, Iterator):
+                for item in result:
+                    self.send((call_id, "item", _pack_result(item)))
+                self.send((call_id, "end", None))
+            else:
+                self.send((call_id, "ok", _pack_result(result)))
+        except Exception as e:
+            self.send((call_id, "error", f"{type(e).__name__}: {e}"))
+
+    def unpack(self, packed: tuple) -> Any:
+        kind = packed[0]
+        if kind == "value":
+            return packed[1]
+        name, shape, dtype = packed[1]
+        segment = self.segments.get(name)
+        if segment is None:
+            segment = self.segments[name] = shared_memory.SharedMemory(name=name)
+        # Zero-copy view: the segment is not reused until this call has answered
+        array = np.ndarray(shape, np.dtype(dtype), buffer=segment.buf)
+        if kind == "frame":
+            original_size, digest = packed[2:]
+            if digest is None:
+                return PreparedFrame(Image.fromarray(array), original_size, digest)
+            with self.frames_lock:
+                frame = self.frames.get((name, digest, shape))
+                if frame is None:
+                    frame = PreparedFrame(Image.fromarray(array), original_size, digest)
+                    self.frames[(name, digest, shape)] = frame
+            return frame
+        return array.tobytes() if kind == "bytes" else array
+
+
+def _serve(conn, specs: Dict[str, Tuple[str, str, Dict]], threads: int, concurrency: int) -> None:
+    """Worker process entry point."""
+    import torch
+    torch.set_num_threads(threads)
+    host = _Host(conn, specs, concurrency)
+    host.load()
+    host.serve()
+
+
+# ── API side ─────────────────────────────────────────────────────────────────
+class _Process:
+    """One worker process of a pool, seen from the API process."""
+
+    def __init__(self, pool: "WorkerPool", index: int):
+        self.pool = pool
+        self.index = index
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn = None
+        self.pending: Dict[int, "queue.Queue"] = {}   # call id → its response queue
+        self.ready = threading.Event()
+        self.alive = False
+        self.boot_failures = 0   # Consecutive exits while still loading
+        self.send_lock = threading.Lock()
+
+    def start(self) -> None:
+        ctx = multiprocessing.get_context("spawn")   # Fresh interpreter: no inherited threads or torch state
+        self.conn, child = ctx.Pipe()
+        self.ready.clear()
+        self.process = ctx.Process(
+            target=_serve,
+            args=(child, self.pool.specs, self.pool.threads, self.pool.concurrency),
+            name=f"model-{self.pool.family}-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.alive = True
+        threading.Thread(target=self._read, name=f"ipc-{self.pool.family}-{self.index}", daemon=True).start()
+
+    def send(self, message: Optional[tuple]) -> None:
+        with self.send_lock:
+            self.conn.send(message)
+
+    def _read(self) -> None:
+        conn = self.conn
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            if message[0] == "ready":
+                self.pool.errors.update(message[2])
+                self.boot_failures = 0
+                self.ready.set()
+                continue
+            responses = self.pending.get(message[0])
+            if responses is not None:
+                responses.put(message[1:])
+
+        self.alive = False
+        self.process.join(timeout=1)   # Reap it, so exitcode is known
+        if not self.ready.is_set():
+            self.boot_failures += 1
+        for responses in list(self.pending.values()):
+            responses.put(("crashed", None))
+        self.pool.on_exit(self)
+
+
+class WorkerPool:
+    """The worker processes of one model family."""
+
+    def __init__(self, family: str, specs: Dict[str, ModelSpec], processes: int, threads: int,
+                 concurrency: int = MODEL_PROCESS_CONCURRENCY, timeout: float = MODEL_CALL_TIMEOUT_SEC):
+        self.family = family
+        # Sent to the spawned process, so classes travel as import paths
+        self.specs = {name: (cls.__module__, cls.__name__, kwargs) for name, (cls, kwargs) in specs.items()}
+        self.threads = threads
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.errors: Dict[str, str] = {}   # model → load error
+        self.segments = _Segments()
+        self.closing = False
+        self._ids = itertools.count()
+        self._processes = [_Process(self, i) for i in range(processes)]
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._crashes = 0
+        self._timeouts = 0
+
+    def start(self) -> None:
+        print(f"  📥 Starting {len(self._processes)} {self.family} worker process(es), "
+              f"{self.threads} torch threads each...")
+        for process in self._processes:
+            process.start()
+
+    def wait_ready(self, model: str) -> None:
+        """Block until a process has loaded `model`; raise its load error if it failed."""
+        while not any(p.ready.is_set() for p in self._processes):
+            if self.closing:
+                raise WorkerCrashed(f"{self.family} workers are shutting down")
+            if all(p.boot_failures >= MAX_BOOT_FAILURES for p in self._processes):
+                raise WorkerCrashed(f"{self.family} workers keep exiting while loading")
+            time.sleep(0.1)
+        if model in self.errors:
+            raise RuntimeError(self.errors[model])
+
+    def on_exit(self, process: _Process) -> None:
+        if self.closing:
+            return
+        with self._lock:
+            self._crashes += 1
+        if process.boot_failures >= MAX_BOOT_FAILURES:
+            print(f"  ⚠️  {self.family} worker {process.index} exited while loading "
+                  f"{MAX_BOOT_FAILURES} times (code {process.process.exitcode}); giving up")
+            return
+        print(f"  ⚠️  {self.family} worker {process.index} exited "
+              f"(code {process.process.exitcode}); restarting in {RESTART_DELAY_SEC:.0f}s")
+        threading.Timer(RESTART_DELAY_SEC, lambda: self.closing or process.start()).start()
+
+    def _pick(self, deadline: float) -> _Process:
+        """The ready process with the fewest calls in flight."""
+        while True:
+            ready = [p for p in self._processes if p.alive and p.ready.is_set()]
+            if ready:
+                return min(ready, key=lambda p: len(p.pending))
+            if time.monotonic() > deadline:
+                raise WorkerTimeout(f"no {self.family} worker available")
+            time.sleep(0.05)
+
+    def call(self, model: str, path: str, kind: str = "call", args: tuple = (), kwargs: Optional[Dict] = None) -> Any:
+        deadline = time.monotonic() + self.timeout
+        process = self._pick(deadline)
+        call_id = next(self._ids)
+        responses: "queue.Queue" = queue.Queue()
+        used: List[shared_memory.SharedMemory] = []
+        process.pending[call_id] = responses
+        with self._lock:
+            self._calls += 1
+        streaming = timed_out = False
+        packed: List[tuple] = []
+        try:
+            packed_args = tuple(_pack_arg(a, self.segments, used) for a in args)
+            packed_kwargs = {k: _pack_arg(v, self.segments, used) for k, v in (kwargs or {}).items()}
+            packed = [*packed_args, *packed_kwargs.values()]
+            try:
+                process.send((call_id, model, path, kind, packed_args, packed_kwargs))
+            except OSError:
+                raise WorkerCrashed(f"{self.family} worker exited before {model}.{path}")
+            status, payload = self._next(responses, deadline, model, path)
+            if status == "item":
+                streaming = True
+                return self._stream(process, call_id, responses, used, packed, payload, model, path)
+            return _unpack_result(payload)
+        except WorkerTimeout:
+            timed_out = True
+            raise
+        finally:
+            if not streaming:
+                process.pending.pop(call_id, None)
+                self._finish(used, packed, timed_out)
+
+    def _finish(self, used: list, packed: List[tuple], timed_out: bool) -> None:
+        """Return a call's argument segments for reuse, or retire them after a timeout."""
+        if timed_out:
+            self.segments.discard(used, (p[1][0] for p in packed if p[0] == "frame"))
+        else:
+            self.segments.release(used)
+
+    def _next(self, responses: "queue.Queue", deadline: float, model: str, path: str) -> tuple:
+        try:
+            status, payload = responses.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise WorkerTimeout(f"{model}.{path} took longer than {self.timeout:.0f}s")
+        if status == "crashed":
+            raise WorkerCrashed(f"{self.family} worker exited during {model}.{path}")
+        if status == "error":
+            raise RuntimeError(f"{model}.{path} failed in worker: {payload}")
+        return status, payload
+
+    def _stream(self, process: _Process, call_id: int, responses: "queue.Queue",
+                used: list, args: List[tuple], first: tuple, model: str, path: str) -> Iterator[Any]:
+        """Items of a generator running in the worker, as they arrive."""
+        timed_out = False
+        try:
+            packed = first
+            while True:
+                yield _unpack_result(packed)
+                status, packed = self._next(responses, time.monotonic() + self.timeout, model, path)
+                if status == "end":
+                    return
+        except WorkerTimeout:
+            timed_out = True
+            raise
+        finally:
+            process.pending.pop(call_id, None)
+            self._finish(used, args, timed_out)
+
+    def close(self) -> None:
+        self.closing = True
+        for process in self._processes:
+            if process.alive:
+                try:
+                    process.send(None)
+                except OSError:
+                    pass
+        for process in self._processes:
+            if process.process is not None:
+                process.process.join(timeout=5)
+                if process.process.is_alive():
+                    process.process.terminate()
+        self.segments.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "processes": [
+                    {
+                        "pid":      p.process.pid if p.process else None,
+                        "alive":    p.alive,
+                        "ready":    p.ready.is_set(),
+                        "inflight": len(p.pending),
+                    }
+                    for p in self._processes
+                ],
+                "threads":  self.threads,
+                "calls":    self._calls,
+                "crashes":  self._crashes,
+                "timeouts": self._timeouts,
+            }
+
+
+class ModelProxy:
+    """Stands in for a model hosted in a worker pool: same attributes, served over IPC."""
+
+    nbytes = 0   # Weights live in the worker processes
+
+    def __init__(self, pool: WorkerPool, name: str, cls: type):
+        self._pool = pool
+        self._name = name
+        self._cls = cls
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        static = getattr(self._cls, attr, None)
+        if isinstance(static, property):
+            return self._pool.call(self._name, attr, "get")
+        if static is not None and not callable(static):
+            return static              # Class constants, e.g. INPUT_MIN_SIDE
+        return _Remote(self._pool, self._name, attr)
+
+
+class _Remote:
+    """A method, or a path to one, on a hosted model (e.g. detector.batcher.stats)."""
+
+    def __init__(self, pool: WorkerPool, model: str, path: str):
+        self._pool = pool
+        self._model = model
+        self._path = path
+
+    def __getattr__(self, attr: str) -> "_Remote":
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return _Remote(self._pool, self._model, f"{self._path}.{attr}")
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._pool.call(self._model, self._path, "call", args, kwargs)
+
+
+class ModelWorkers:
+    """All the family pools; each starts on the first request for one of its models."""
+
+    def __init__(self, specs: Dict[str, ModelSpec]):
+        self.specs = specs
+        total = sum(family_processes(f) for f in FAMILIES)
+        self.pools = {
+            family: WorkerPool(
+                family,
+                {name: specs[name] for name in names},
+                processes=family_processes(family),
+                threads=family_threads(family, total),
+            )
+            for family, names in FAMILIES.items()
+        }
+        self._started: set = set()
+        self._lock = threading.Lock()
+
+    def _pool(self, model: str) -> WorkerPool:
+        family = next(f for f, names in FAMILIES.items() if model in names)
+        pool = self.pools[family]
+        with self._lock:
+            if family not in self._started:
+                self._started.add(family)
+                pool.start()
+        return pool
+
+    def proxy(self, model: str) -> ModelProxy:
+        """A proxy for `model`, once its worker has loaded it (blocking)."""
+        pool = self._pool(model)
+        pool.wait_ready(model)
+        return ModelProxy(pool, model, self.specs[model][0])
+
+    def close(self) -> None:
+        for pool in self.pools.values():
+            pool.close()
+
+    def stats(self) -> Dict:
+        return {family: self.pools[family].stats() for family in sorted(self._started)}
@@ -0,0 +1,169 @@
+"""
+Dynamic Micro-Batching
+Collects concurrent single-image requests for one model into a batch and runs
+one forward / generate call for all of them.
+
+A batch closes when `max_batch` requests are waiting or `window_ms` has passed
+since the first one arrived, whichever comes first. Callers block on their own
+future and get back only their result, so model wrappers keep their
+one-image-in / one-result-out API.
+
+Set BATCH_WINDOW_MS=0 to disable batching: requests then run inline on the
+calling thread exactly as before.
+
+The worker thread starts on first use in each process, so a batcher built
+before a fork (gunicorn preload, see gunicorn.conf.py) works in the children.
+It holds the batcher, and through `batch_fn` the model wrapper, so `close()`
+must stop it before an evicted model can be freed (see residency.py); a closed
+batcher runs any late request inline.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+DEFAULT_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "10"))
+DEFAULT_MAX_BATCH = int(os.getenv("BATCH_MAX_SIZE", "8"))
+
+_STOP = object()   # Queued by close(): the worker exits once the items before it are done
+
+
+class _Pending:
+    __slots__ = ("item", "enqueued", "future")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.enqueued = time.perf_counter()
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[Sequence[Any]], List[Any]],
+        max_batch: int = DEFAULT_MAX_BATCH,
+        window_ms: float = DEFAULT_WINDOW_MS,
+    ):
+        """
+        Args:
+            name:      Label used in metrics and the worker thread name.
+            batch_fn:  Maps a list of items to a list of results, same order.
+            max_batch: Largest batch handed to `batch_fn`.
+            window_ms: How long the first request waits for company.
+        """
+        self.name = name
+        self.max_batch = max(1, max_batch)
+        self.window = max(0.0, window_ms) / 1000
+        self._batch_fn = batch_fn
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker_pid = 0    # Process the worker thread runs in
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+        # Metrics (guarded by _lock)
+        self._batches = 0
+        self._items = 0
+        self._sizes: Dict[int, int] = {}   # batch size → count
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and self.max_batch > 1
+
+    def submit(self, item: Any) -> Any:
+        """Run `item` as part of the next batch and return its result (blocking)."""
+        if self.enabled:
+            pending = _Pending(item)
+            with self._lock:
+                queued = not self._closed
+                if queued:
+                    self._start_worker()
+                    self._queue.put(pending)
+            if queued:
+                return pending.future.result()
+        self._record([0.0])
+        return self._batch_fn([item])[0]
+
+    # ── Worker ───────────────────────────────────────────────────────────────
+    def _start_worker(self) -> None:
+        """Start this process's worker thread if needed (caller holds _lock)."""
+        if self._worker_pid != os.getpid():
+            self._queue = queue.Queue()   # A forked copy may hold the parent's items
+            self._worker = threading.Thread(
+                target=self._loop, args=(self._queue,), name=f"batcher-{self.name}", daemon=True
+            )
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the worker thread after the queued requests; later requests run inline."""
+        with self._lock:
+            self._closed = True
+            worker = self._worker if self._worker_pid == os.getpid() else None
+            if worker is not None:
+                self._queue.put(_STOP)
+            self._worker, self._worker_pid = None, 0
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout)
+
+    def _loop(self, items: "queue.Queue") -> None:
+        stopping = False
+        while not stopping:
+            first = items.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = first.enqueued + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = items.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if pending is _STOP:
+                    stopping = True
+                    break
+                batch.append(pending)
+
+            started = time.perf_counter()
+            self._record([started - p.enqueued for p in batch])
+            try:
+                results = self._batch_fn([p.item for p in batch])
+                for pending, result in zip(batch, results):
+                    pending.future.set_result(result)
+            except Exception as e:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+
+    def _record(self, waits: List[float]) -> None:
+        with self._lock:
+            self._batches += 1
+            self._items += len(waits)
+            self._sizes[len(waits)] = self._sizes.get(len(waits), 0) + 1
+            self._wait_total += sum(waits)
+            self._wait_max = max(self._wait_max, *waits)
+
+    # ── Introspection ────────────────────────────────────────────────────────
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled":        self.enabled,
+                "window_ms":      self.window * 1000,
+                "max_batch":      self.max_batch,
+                "batches":        self._batches,
+                "items":          self._items,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "batch_sizes":    dict(sorted(self._sizes.items())),
+                "queued":         self._queue.qsize(),
+                "avg_wait_ms":    round(1000 * self._wait_total / self._items, 2) if self._items else 0.0,
+                "max_wait_ms":    round(1000 * self._wait_max, 2),
+            }
@@ -4,48 +4,93 @@ Model: Salesforce/blip-image-captioning-large (990 MB)
 Task: Image → Natural language scene description
 """
 from transformers import BlipProcessor, BlipForConditionalGeneration
-from PIL import Image
+from typing import List, Sequence, Union
 import torch
-import io
+
+from models.batching import MicroBatcher
+from models.frame import PreparedFrame
+from models.onnx_backend import OnnxModule
+from models import metrics
+from models import precision as prec
+from models.result_cache import ResultCache
+from models.snapshots import snapshot
 
 
 class CaptionerModel:
     MODEL_ID = "Salesforce/blip-image-captioning-large"
+    INPUT_MIN_SIDE = 384          # BLIP resizes to 384×384
 
-    def __init__(self):
+    def __init__(self, precision: str = "fp32", backend: str = "torch"):
+        self.precision = precision
         print(f"  📥 Loading BLIP captioner ({self.MODEL_ID})...")
-        self.processor = BlipProcessor.from_pretrained(self.MODEL_ID)
+        self.processor = BlipProcessor.from_pretrained(snapshot(self.MODEL_ID))
         self.model = BlipForConditionalGeneration.from_pretrained(
-            self.MODEL_ID, torch_dtype=torch.float32
+            snapshot(self.MODEL_ID), torch_dtype=torch.float32, low_cpu_mem_usage=True
         )
         self.model.eval()
+        self.model = prec.prepare(self.model, precision)
+        # ONNX Runtime runs the ViT image encoder; beam search stays in PyTorch
+        self.vision_onnx = OnnxModule.load("captioner_vision") if backend == "onnx" else None
+        self.batcher = MicroBatcher("captioner", self.caption_batch)
+        self.results = ResultCache("captioner")
         print("  ✅ BLIP captioner ready.")
 
-    def caption(self, image_bytes: bytes) -> str:
+    def caption(self, image: Union[bytes, PreparedFrame], use_cache: bool = True) -> str:
         """
-        Generate a natural language scene description from raw image bytes.
+        Generate a natural language scene description.
         
         Args:
-            image_bytes: Raw image file bytes (JPEG / PNG / WebP)
+            image: Raw image file bytes (JPEG / PNG / WebP) or a PreparedFrame
+            use_cache: Reuse the caption of an identical or near-identical image
             
         Returns:
             Scene description string, e.g. "a busy street with people walking"
         """
         try:
-            image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-            inputs = self.processor(images=image, return_tensors="pt")
-
-            with torch.no_grad():
-                output = self.model.generate(
-                    **inputs,
-                    max_new_tokens=100,
-                    num_beams=5,
-                    early_stopping=True,
-                )
-
-            caption = self.processor.decode(output[0], skip_special_tokens=True)
-            return caption.strip()
+            frame = PreparedFrame.ensure(image, min_side=self.INPUT_MIN_SIDE)
+            if not use_cache:
+                return self.batcher.submit(frame)
+            return self.results.fetch(frame, lambda: self.batcher.submit(frame))
 
         except Exception as e:
             print(f"  ⚠️  BLIP captioner error: {e}")
+            metrics.stage_error("caption")
             return "Unable to describe the scene."
+
+    def caption_batch(self, frames: Sequence[PreparedFrame]) -> List[str]:
+        """Caption several frames with one batched beam-search `generate` call."""
+        pixel_values = torch.cat([
+            frame.cached(self.MODEL_ID, lambda f=frame: self._preprocess(f))["pixel_values"]
+            for frame in frames
+        ])
+
+        generate_kwargs = dict(max_new_tokens=100, num_beams=5, early_stopping=True)
+        with torch.no_grad(), prec.autocast(self.precision):
+            if self.vision_onnx is not None:
+                image_embeds = self.vision_onnx(pixel_values=pixel_values)["image_embeds"]
+                output = self._decode(image_embeds, **generate_kwargs)
+            else:
+                output = self.model.generate(pixel_values=pixel_values, **generate_kwargs)
+
+        captions = self.processor.batch_decode(output, skip_special_tokens=True)
+        return [c.strip() for c in captions]
+
+    def _decode(self, image_embeds: torch.Tensor, **generate_kwargs) -> torch.Tensor:
+        """BlipForConditionalGeneration.generate, from precomputed image embeddings."""
+        text_config = self.model.config.text_config
+        batch_size = image_embeds.shape[0]
+        image_attention_mask = torch.ones(image_embeds.shape[:-1], dtype=torch.long)
+        input_ids = torch.LongTensor([[text_config.bos_token_id]]).repeat(batch_size, 1)
+        return self.model.text_decoder.generate(
+            input_ids=input_ids,
+            eos_token_id=text_config.sep_token_id,
+            pad_token_id=text_config.pad_token_id,
+            encoder_hidden_states=image_embeds,
+            encoder_attention_mask=image_attention_mask,
+            **generate_kwargs,
+        )
+
+    def _preprocess(self, frame: PreparedFrame):
+        size = self.processor.image_processor.size
+        resized = frame.resized((size["width"], size["height"]))
+        return self.processor(images=resized, return_tensors="pt")
@@ -7,43 +7,78 @@ Zone layout (left third | center third | right third):
 ┌───────┬────────┬───────┐
 │  LEFT │ CENTER │ RIGHT │
 └───────┴────────┴───────┘
+
+Beside the three zones, the map is reduced to a DEPTH_GRID (rows × columns)
+grid of cells and center-third bands — see models/zones.py, which holds the
+numpy-only reduction.
+
+DPT runs at DEPTH_INPUT_SIDE px square. 384 is DPT-Large's native input; a
+smaller multiple of 32 (e.g. 256: 2.25× fewer ViT tokens) is the
+low-resolution mode for the coarse zone decision — the position embeddings
+are interpolated. `python -m benchmarks.depth` measures the latency saved
+against agreement with the full-resolution zone labels.
 """
-import io
+import os
+
 import numpy as np
 import torch
-from PIL import Image
 from transformers import DPTImageProcessor, DPTForDepthEstimation
-from typing import Dict
-
+from typing import Dict, List, Sequence, Union
 
-PROXIMITY_LEVELS = [
-    (70, "Very Close", "🚨 STOP — obstacle very close, do not move forward"),
-    (45, "Close",      "⚠️  Caution — obstacle ahead, proceed slowly"),
-    (25, "Medium",     "🟡 Some objects nearby, stay alert"),
-    (0,  "Clear",      "✅ Path appears clear"),
-]
+from models.batching import MicroBatcher
+from models.frame import PreparedFrame
+from models.onnx_backend import OnnxModule
+from models import metrics
+from models import precision as prec
+from models.result_cache import ResultCache
+from models.snapshots import snapshot
+from models.zones import parse_grid, reduce_depth
 
 
-def _proximity_label(pct: float) -> Dict:
-    for threshold, label, warning in PROXIMITY_LEVELS:
-        if pct >= threshold:
-            return {"label": label, "warning": warning, "percent": round(pct, 1)}
-    return {"label": "Clear", "warning": "✅ Path appears clear", "percent": 0.0}
-
+DEPTH_INPUT_SIDE = int(os.getenv("DEPTH_INPUT_SIDE", "384"))
+DEPTH_GRID = os.getenv("DEPTH_GRID", "3x3")   # rows x columns
+if DEPTH_INPUT_SIDE % 32:
+    raise ValueError(f"DEPTH_INPUT_SIDE must be a multiple of 32, got {DEPTH_INPUT_SIDE}")
 
 class DepthModel:
     MODEL_ID = "Intel/dpt-large"
-
-    def __init__(self):
-        print(f"  📥 Loading DPT depth estimator ({self.MODEL_ID})...")
-        self.processor = DPTImageProcessor.from_pretrained(self.MODEL_ID)
-        self.model = DPTForDepthEstimation.from_pretrained(self.MODEL_ID)
-        self.model.eval()
+    INPUT_MIN_SIDE = DEPTH_INPUT_SIDE   # DPT resizes to DEPTH_INPUT_SIDE square
+
+    def __init__(
+        self,
+        precision: str = "fp32",
+        backend: str = "torch",
+        input_side: int = DEPTH_INPUT_SIDE,
+        grid: str = DEPTH_GRID,
+    ):
+        self.precision = precision
+        self.input_side = input_side
+        self.grid = parse_grid(grid)
+        print(f"  📥 Loading DPT depth estimator ({self.MODEL_ID}, {input_side}px)...")
+        self.processor = DPTImageProcessor.from_pretrained(snapshot(self.MODEL_ID))
+        self.onnx = OnnxModule.load("depth") if backend == "onnx" else None
+        if self.onnx is not None:
+            graph_side = self.onnx.session.get_inputs()[0].shape[-1]
+            if isinstance(graph_side, int) and graph_side != input_side:
+                print(f"  ⚠️  onnx/depth.onnx was exported at {graph_side}px — DPT runs at {graph_side}px.")
+                self.input_side = graph_side
+        self.model = None
+        if self.onnx is None:
+            self.model = DPTForDepthEstimation.from_pretrained(snapshot(self.MODEL_ID), low_cpu_mem_usage=True)
+            self.model.eval()
+            self.model = prec.prepare(self.model, precision)
+        self.batcher = MicroBatcher("depth", self.analyze_batch)
+        self.results = ResultCache("depth")
         print("  ✅ DPT depth estimator ready.")
 
-    def analyze(self, image_bytes: bytes) -> Dict:
+    def analyze(self, image: Union[bytes, PreparedFrame], use_cache: bool = True) -> Dict:
         """
         Run depth estimation and return 3-zone proximity results.
+
+        Args:
+            image: Raw image bytes or a PreparedFrame.
+            use_cache: Reuse the zones of an identical image (near-identical only
+                       if opted in, see models/result_cache.py).
         
         Returns:
             {
@@ -52,62 +87,59 @@ class DepthModel:
                 "center": {...},
                 "right":  {...},
               },
+              "bands": {"head": {...}, "body": {...}, "ground": {...}},   # center third, top down
+              "grid": [[{...}, ...], ...],  # DEPTH_GRID cells, top row first
               "overall_warning": str,   # worst-case zone warning
               "safe_to_walk": bool,
             }
         """
         try:
-            image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-            inputs = self.processor(images=image, return_tensors="pt")
-
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-
-            # Interpolate to original size
-            predicted_depth = outputs.predicted_depth.squeeze().numpy()
-
-            # Normalise depth to 0–100 % where 100 = closest
-            dmin, dmax = predicted_depth.min(), predicted_depth.max()
-            if dmax - dmin < 1e-6:
-                norm = np.zeros_like(predicted_depth)
-            else:
-                # DPT: larger value = closer
-                norm = ((predicted_depth - dmin) / (dmax - dmin)) * 100
-
-            h, w = norm.shape
-            third = w // 3
-            left_zone   = norm[:, :third]
-            center_zone = norm[:, third:2*third]
-            right_zone  = norm[:, 2*third:]
-
-            # 90th percentile = robust "how close is the closest thing"
-            def zone_pct(zone):
-                return float(np.percentile(zone, 90))
-
-            zones = {
-                "left":   _proximity_label(zone_pct(left_zone)),
-                "center": _proximity_label(zone_pct(center_zone)),
-                "right":  _proximity_label(zone_pct(right_zone)),
-            }
-
-            worst_pct = max(z["percent"] for z in zones.values())
-            overall = _proximity_label(worst_pct)
-            safe = overall["label"] in ("Clear", "Medium")
-
-            return {
-                "zones": zones,
-                "overall_warning": overall["warning"],
-                "safe_to_walk": safe,
-            }
+            frame = PreparedFrame.ensure(image, min_side=self.INPUT_MIN_SIDE)
+            if not use_cache:
+                return self.batcher.submit(frame)
+            return self.results.fetch(frame, lambda: self.batcher.submit(frame))
 
         except Exception as e:
             print(f"  ⚠️  DPT depth error: {e}")
+            metrics.stage_error("depth")
             return {
                 "zones": {
                     "left":   {"label": "Unknown", "warning": "Cannot determine", "percent": 0},
                     "center": {"label": "Unknown", "warning": "Cannot determine", "percent": 0},
                     "right":  {"label": "Unknown", "warning": "Cannot determine", "percent": 0},
                 },
+                "bands": {},
+                "grid": [],
                 "overall_warning": "Depth estimation unavailable.",
                 "safe_to_walk": False,
             }
+
+    def analyze_batch(self, frames: Sequence[PreparedFrame]) -> List[Dict]:
+        """Estimate depth for several frames with one batched forward pass."""
+        return [self._zones(depth) for depth in self.depth_maps(frames)]
+
+    def depth_maps(self, frames: Sequence[PreparedFrame]) -> np.ndarray:
+        """Raw (N, side, side) DPT depth maps, larger = closer."""
+        # Every frame is resized to the same square input, so they stack directly
+        key = f"{self.MODEL_ID}@{self.input_side}"
+        pixel_values = torch.cat([
+            frame.cached(key, lambda f=frame: self._preprocess(f))["pixel_values"]
+            for frame in frames
+        ])
+
+        if self.onnx is not None:
+            predicted_depth = self.onnx(pixel_values=pixel_values)["predicted_depth"]
+        else:
+            with torch.no_grad(), prec.autocast(self.precision):
+                predicted_depth = self.model(pixel_values=pixel_values).predicted_depth
+
+        return predicted_depth.float().numpy()
+
+    def _zones(self, predicted_depth: np.ndarray) -> Dict:
+        """Reduce one (H, W) depth map to the zone, band and grid proximity result."""
+        return reduce_depth(predicted_depth, self.grid)
+
+    def _preprocess(self, frame: PreparedFrame):
+        side = self.input_side
+        resized = frame.resized((side, side))
+        return self.processor(images=resized, size={"height": side, "width": side}, return_tensors="pt")
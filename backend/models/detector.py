@@ -3,11 +3,18 @@ DETR Object Detector
 Model: facebook/detr-resnet-50 (166 MB)
 Task: Object detection + bounding boxes
 """
-from transformers import DetrImageProcessor, DetrForObjectDetection
-from PIL import Image
+from transformers import DetrConfig, DetrImageProcessor, DetrForObjectDetection
+from transformers.models.detr.modeling_detr import DetrObjectDetectionOutput
 import torch
-import io
-from typing import List, Dict
+from typing import List, Dict, Sequence, Tuple, Union
+
+from models.batching import MicroBatcher
+from models.frame import PreparedFrame
+from models.onnx_backend import OnnxModule
+from models import metrics
+from models import precision as prec
+from models.result_cache import ResultCache
+from models.snapshots import snapshot
 
 
 CONFIDENCE_THRESHOLD = 0.70
@@ -15,64 +22,130 @@ CONFIDENCE_THRESHOLD = 0.70
 
 class DetectorModel:
     MODEL_ID = "facebook/detr-resnet-50"
+    INPUT_MIN_SIDE = 800          # DETR resizes the shortest edge to 800
 
-    def __init__(self):
+    def __init__(self, precision: str = "fp32", backend: str = "torch"):
+        self.precision = precision
         print(f"  📥 Loading DETR detector ({self.MODEL_ID})...")
-        self.processor = DetrImageProcessor.from_pretrained(self.MODEL_ID)
-        self.model = DetrForObjectDetection.from_pretrained(self.MODEL_ID)
-        self.model.eval()
+        self.processor = DetrImageProcessor.from_pretrained(snapshot(self.MODEL_ID))
+        self.onnx = OnnxModule.load("detector") if backend == "onnx" else None
+        if self.onnx is None:
+            # No low_cpu_mem_usage: the timm backbone is built eagerly inside the model
+            self.model = DetrForObjectDetection.from_pretrained(snapshot(self.MODEL_ID))
+            self.model.eval()
+            self.model = prec.prepare(self.model, precision)
+            self.id2label = self.model.config.id2label
+        else:
+            self.model = None
+            self.id2label = DetrConfig.from_pretrained(snapshot(self.MODEL_ID)).id2label
+        self.batcher = MicroBatcher("detector", self.detect_batch)
+        self.results = ResultCache("detector", adapt=_rescale_boxes)
         print("  ✅ DETR detector ready.")
 
-    def detect(self, image_bytes: bytes) -> List[Dict]:
+    def detect(self, image: Union[bytes, PreparedFrame], use_cache: bool = True) -> List[Dict]:
         """
         Detect objects in an image.
         
         Args:
-            image_bytes: Raw image bytes.
+            image: Raw image bytes or a PreparedFrame.
+            use_cache: Reuse the detections of an identical image (near-identical
+                       only if opted in, see models/result_cache.py; boxes
+                       rescaled to this image's size).
             
         Returns:
             List of dicts:
               { "label": str, "confidence": float (0–1), "box": [x0,y0,x1,y1] }
+            Boxes are in the pixel coordinates of the original upload.
             Sorted by confidence descending, top 10 results.
         """
         try:
-            image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-            inputs = self.processor(images=image, return_tensors="pt")
-
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-
-            target_sizes = torch.tensor([image.size[::-1]])
-            results = self.processor.post_process_object_detection(
-                outputs,
-                threshold=CONFIDENCE_THRESHOLD,
-                target_sizes=target_sizes,
-            )[0]
-
-            detections = []
-            for score, label, box in zip(
-                results["scores"], results["labels"], results["boxes"]
-            ):
-                detections.append({
-                    "label": self.model.config.id2label[label.item()],
-                    "confidence": round(score.item(), 3),
-                    "box": [round(v, 1) for v in box.tolist()],
-                })
-
-            # Sort by confidence, return top 10
-            detections.sort(key=lambda d: d["confidence"], reverse=True)
-            return detections[:10]
+            frame = PreparedFrame.ensure(image, min_side=self.INPUT_MIN_SIDE)
+            if not use_cache:
+                return self.batcher.submit(frame)
+            return self.results.fetch(frame, lambda: self.batcher.submit(frame))
 
         except Exception as e:
             print(f"  ⚠️  DETR detector error: {e}")
+            metrics.stage_error("detect")
             return []
 
+    def detect_batch(self, frames: Sequence[PreparedFrame]) -> List[List[Dict]]:
+        """Detect objects in several frames with one batched forward pass."""
+        if len(frames) == 1:
+            frame = frames[0]
+            inputs = frame.cached(
+                self.MODEL_ID,
+                lambda: self.processor(images=frame.image, return_tensors="pt"),
+            )
+        else:
+            # Frames differ in aspect ratio: let the processor pad them and
+            # build the pixel mask for the batch.
+            inputs = self.processor(images=[f.image for f in frames], return_tensors="pt")
+
+        if self.onnx is not None:
+            outputs = DetrObjectDetectionOutput(**self.onnx(**inputs))
+        else:
+            with torch.no_grad(), prec.autocast(self.precision):
+                outputs = self.model(**inputs)
+            # Post-process in fp32: bf16 boxes would be off by pixels at 800 px
+            outputs.logits = outputs.logits.float()
+            outputs.pred_boxes = outputs.pred_boxes.float()
+
+        # Boxes are predicted normalised, so scale them straight to the
+        # original upload even if the frame was draft-decoded smaller.
+        target_sizes = torch.tensor([f.original_size[::-1] for f in frames])
+        results = self.processor.post_process_object_detection(
+            outputs,
+            threshold=CONFIDENCE_THRESHOLD,
+            target_sizes=target_sizes,
+        )
+        return [self._to_detections(r) for r in results]
+
+    def _to_detections(self, results: Dict) -> List[Dict]:
+        detections = []
+        for score, label, box in zip(
+            results["scores"], results["labels"], results["boxes"]
+        ):
+            detections.append({
+                "label": self.id2label[label.item()],
+                "confidence": round(score.item(), 3),
+                "box": [round(v, 1) for v in box.tolist()],
+            })
+
+        # Sort by confidence, return top 10
+        detections.sort(key=lambda d: d["confidence"], reverse=True)
+        return detections[:10]
+
+    HAZARDS = {
+        "car", "truck", "bus", "motorcycle", "bicycle", "train",
+        "fire hydrant", "stop sign", "traffic light",
+        "person", "dog", "cat", "horse",
+        "stairs", "step",
+    }
+
     def hazardous_objects(self, detections: List[Dict]) -> List[str]:
-        """Return labels of detected hazard-class objects."""
-        HAZARDS = {
-            "car", "truck", "bus", "motorcycle", "bicycle", "train",
-            "fire hydrant", "stop sign", "traffic light",
-            "person", "dog", "cat", "horse",
-            "stairs", "step",
-        }
-        return [d["label"] for d in detections if d["label"].lower() in HAZARDS]
+        """
+        Return labels of detected hazard-class objects.
+        Tracked detections (live mode) that are approaching come first.
+        """
+        hazards = [d for d in detections if d["label"].lower() in self.HAZARDS]
+        hazards.sort(key=lambda d: not d.get("approaching", False))
+        return [d["label"] for d in hazards]
+
+    def approaching_hazards(self, detections: List[Dict]) -> List[str]:
+        """Labels of tracked hazards whose boxes are growing, i.e. getting closer."""
+        return [
+            d["label"] for d in detections
+            if d.get("approaching") and d["label"].lower() in self.HAZARDS
+        ]
+
+
+def _rescale_boxes(
+    detections: List[Dict], cached_size: Tuple[int, int], size: Tuple[int, int]
+) -> List[Dict]:
+    """Map cached boxes onto a near-duplicate image of another resolution."""
+    sx, sy = size[0] / cached_size[0], size[1] / cached_size[1]
+    for d in detections:
+        x0, y0, x1, y1 = d["box"]
+        d["box"] = [round(x0 * sx, 1), round(y0 * sy, 1), round(x1 * sx, 1), round(y1 * sy, 1)]
+    return detections
@@ -0,0 +1,93 @@
+"""
+Prepared Frame
+Decodes an uploaded image once per request and shares it between the vision
+models (BLIP / DETR / DPT), together with any resized images or processor
+tensors they derive from it.
+
+JPEGs are decoded in Pillow draft mode: the DCT is scaled down by 1/2, 1/4 or
+1/8 during decoding, so a 12 MP phone photo is never fully decompressed when
+the models only need a few hundred pixels.
+"""
+import hashlib
+import io
+import math
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from PIL import Image
+
+
+# Shortest edge the most demanding model resizes to (DETR: 800 px)
+DEFAULT_MIN_SIDE = 800
+
+
+class FrameDecodeError(ValueError):
+    """Raised when uploaded bytes cannot be decoded as an image."""
+
+
+class PreparedFrame:
+    def __init__(
+        self,
+        image: Image.Image,
+        original_size: Tuple[int, int],
+        digest: Optional[str] = None,
+    ):
+        self.image = image                    # Decoded RGB image (possibly draft-reduced)
+        self.original_size = original_size    # (width, height) of the uploaded image
+        self.digest = digest                  # Content hash of the uploaded bytes
+        self._cache: Dict[Any, Any] = {}
+        self._locks: Dict[Any, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_bytes(cls, image_bytes: bytes, min_side: int = DEFAULT_MIN_SIDE) -> "PreparedFrame":
+        """
+        Decode raw image bytes (JPEG / PNG / WebP) to RGB.
+
+        Args:
+            min_side: Smallest shortest-edge resolution any consumer needs.
+                      JPEG decoding stops at the coarsest DCT scale that
+                      still covers it.
+        """
+        try:
+            image = Image.open(io.BytesIO(image_bytes))
+            original_size = image.size
+            width, height = original_size
+            if image.format == "JPEG" and min(width, height) > min_side:
+                scale = min_side / min(width, height)
+                image.draft("RGB", (math.ceil(width * scale), math.ceil(height * scale)))
+            digest = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+            return cls(image.convert("RGB"), original_size, digest)
+        except Exception as e:
+            raise FrameDecodeError(f"Could not decode image: {e}") from e
+
+    @classmethod
+    def ensure(cls, image: Union[bytes, "PreparedFrame"], min_side: int = DEFAULT_MIN_SIDE) -> "PreparedFrame":
+        """Accept either raw bytes or an already prepared frame."""
+        if isinstance(image, PreparedFrame):
+            return image
+        return cls.from_bytes(image, min_side=min_side)
+
+    # ── Shared derived data ──────────────────────────────────────────────────
+    def cached(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """
+        Return `compute()` memoised under `key`. Safe to call from concurrent
+        stages: each key is computed exactly once, different keys in parallel.
+        """
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._cache:
+                value = compute()
+                with self._lock:
+                    self._cache[key] = value
+            return self._cache[key]
+
+    def resized(self, size: Tuple[int, int], resample: int = Image.BICUBIC) -> Image.Image:
+        """Image resized to exactly (width, height), shared across models."""
+        return self.cached(
+            ("resized", size, resample),
+            lambda: self.image.resize(size, resample=resample),
+        )
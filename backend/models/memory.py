@@ -0,0 +1,292 @@
+"""
+AccessWorld Memory Telemetry
+Finds which stage or model makes a long-running replica's RSS creep:
+
+  • per stage    every run of a pipeline stage (StageGraph) and of Whisper's
+                 two phases records the net RSS growth across it and its peak
+                 RSS above the level it started at (the kernel's high-water
+                 mark, VmHWM, reset through /proc/self/clear_refs when no other
+                 stage is running). torch / MKL buffers freed before the stage
+                 ends show up in the peak, never in the growth. With
+                 MEMORY_TRACE=tracemalloc, the peak of traced (Python / NumPy)
+                 allocations is recorded as well
+  • sampling     every MEMORY_SAMPLE_SEC the RSS and a probe of the caches that
+                 grow with traffic (loaded MarianMT pairs, sentence cache) are
+                 appended to a bounded history, so growth has a slope
+  • snapshots    with tracemalloc on and MEMORY_SNAPSHOT_DIR set, each sample
+                 also dumps an allocation snapshot for offline diffing (the
+                 newest MEMORY_SNAPSHOT_KEEP are kept):
+                     python -m models.memory diff old.snap new.snap
+
+Stages overlap (caption / detect / depth run concurrently), so per-stage
+numbers are attributions, not exact accounting: the peak of overlapping stages
+includes each other's allocations, and the stage that keeps growing RSS while
+the others don't is the suspect. tracemalloc sees Python and NumPy allocations
+but not PyTorch's tensor allocator; RSS covers both. Without a writable
+clear_refs (non-Linux, old kernels) the high-water mark is never reset and the
+peaks only grow.
+
+Config: MEMORY_TRACE = off | rss (default) | tracemalloc, MEMORY_TRACE_FRAMES
+(traceback depth kept by tracemalloc).
+"""
+import argparse
+import contextlib
+import glob
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+from models import metrics
+
+MEMORY_TRACE = os.getenv("MEMORY_TRACE", "rss")
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "1"))
+MEMORY_SAMPLE_SEC = float(os.getenv("MEMORY_SAMPLE_SEC", "60"))
+MEMORY_SNAPSHOT_DIR = os.getenv("MEMORY_SNAPSHOT_DIR", "")
+MEMORY_SNAPSHOT_KEEP = int(os.getenv("MEMORY_SNAPSHOT_KEEP", "24"))   # Newest kept in the directory
+MEMORY_HISTORY = 240   # Samples kept (4 h at the default interval)
+
+TRACE_MODES = ("off", "rss", "tracemalloc")
+if MEMORY_TRACE not in TRACE_MODES:
+    raise ValueError(f"MEMORY_TRACE must be one of {TRACE_MODES}, got {MEMORY_TRACE!r}")
+
+# Started at import so model loading is traced too
+if MEMORY_TRACE == "tracemalloc" and not tracemalloc.is_tracing():
+    tracemalloc.start(MEMORY_TRACE_FRAMES)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> int:
+    """Current resident set size, or 0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _hwm_bytes() -> int:
+    """The kernel's RSS high-water mark (VmHWM) since its last reset, or 0."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+_peak_before_reset = 0   # Highest VmHWM seen before a reset
+
+
+def reset_peak_rss() -> bool:
+    """Restart the high-water mark from the current RSS (Linux); False if unsupported."""
+    global _peak_before_reset
+    _peak_before_reset = max(_peak_before_reset, _hwm_bytes())
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes() -> int:
+    """Highest RSS since the process started, or 0."""
+    return max(_peak_before_reset, _hwm_bytes())
+
+
+# ── Per-stage tracking ───────────────────────────────────────────────────────
+_lock = threading.Lock()
+_stages: Dict[str, Dict[str, int]] = {}
+_active = 0   # Stages currently inside track(); peaks are reset only when none are
+
+
+@contextlib.contextmanager
+def track(stage: str) -> Iterator[None]:
+    """Attribute the RSS growth and peaks of the `with` block to `stage`."""
+    global _active
+    if MEMORY_TRACE == "off":
+        yield
+        return
+
+    tracing = tracemalloc.is_tracing()
+    with _lock:
+        if _active == 0:
+            reset_peak_rss()
+            if tracing:
+                tracemalloc.reset_peak()
+        _active += 1
+    rss_before = rss_bytes()
+    traced_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+    try:
+        yield
+    finally:
+        growth = rss_bytes() - rss_before
+        peak = max(0, _hwm_bytes() - rss_before)
+        traced_peak = max(0, tracemalloc.get_traced_memory()[1] - traced_before) if tracing else 0
+        with _lock:
+            _active -= 1
+            s = _stages.setdefault(stage, {
+                "runs": 0, "rss_growth_bytes": 0, "rss_growth_max_bytes": 0, "rss_net_bytes": 0,
+                "rss_peak_max_bytes": 0, "rss_peak_last_bytes": 0,
+                "traced_peak_max_bytes": 0, "traced_peak_last_bytes": 0,
+            })
+            s["runs"] += 1
+            s["rss_net_bytes"] += growth
+            if growth > 0:
+                s["rss_growth_bytes"] += growth
+                s["rss_growth_max_bytes"] = max(s["rss_growth_max_bytes"], growth)
+            s["rss_peak_last_bytes"] = peak
+            s["rss_peak_max_bytes"] = max(s["rss_peak_max_bytes"], peak)
+            if tracing:
+                s["traced_peak_last_bytes"] = traced_peak
+                s["traced_peak_max_bytes"] = max(s["traced_peak_max_bytes"], traced_peak)
+        if growth > 0:
+            metrics.STAGE_RSS_GROWTH.inc(growth, stage=stage)
+        metrics.STAGE_PEAK_RSS.observe(peak, stage=stage)
+        if tracing:
+            metrics.STAGE_TRACED_PEAK.observe(traced_peak, stage=stage)
+
+
+def stage_stats() -> Dict[str, Dict[str, int]]:
+    with _lock:
+        return {name: dict(s) for name, s in sorted(_stages.items())}
+
+
+# ── Sampling ─────────────────────────────────────────────────────────────────
+_history: deque = deque(maxlen=MEMORY_HISTORY)
+_sampler: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def sample(probe: Optional[Callable[[], Dict]] = None) -> Dict:
+    """Record one history point: RSS plus whatever `probe` reports."""
+    point = {"time": round(time.time(), 1), "rss_bytes": rss_bytes()}
+    if probe is not None:
+        try:
+            point.update(probe())
+        except Exception as e:
+            print(f"  ⚠️  Memory probe failed: {e}")
+    if tracemalloc.is_tracing():
+        point["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+    _history.append(point)
+    if tracemalloc.is_tracing() and MEMORY_SNAPSHOT_DIR:
+        snapshot(MEMORY_SNAPSHOT_DIR)
+    return point
+
+
+def start_sampling(probe: Optional[Callable[[], Dict]] = None, interval: float = MEMORY_SAMPLE_SEC) -> None:
+    """Sample every `interval` seconds on a daemon thread (no-op if off or running)."""
+    global _sampler
+    if MEMORY_TRACE == "off" or interval <= 0 or (_sampler is not None and _sampler.is_alive()):
+        return
+    _stop.clear()
+
+    def _run():
+        sample(probe)
+        while not _stop.wait(interval):
+            sample(probe)
+
+    _sampler = threading.Thread(target=_run, name="memory-sampler", daemon=True)
+    _sampler.start()
+
+
+def stop_sampling() -> None:
+    _stop.set()
+
+
+def history() -> List[Dict]:
+    return list(_history)
+
+
+def growth() -> Dict[str, Dict[str, float]]:
+    """Change of every numeric history field from the first sample to the last, and per hour."""
+    points = list(_history)
+    if len(points) < 2:
+        return {}
+    first, last = points[0], points[-1]
+    hours = max((last["time"] - first["time"]) / 3600, 1e-9)
+    return {
+        key: {"change": last[key] - first[key], "per_hour": round((last[key] - first[key]) / hours, 1)}
+        for key in last
+        if key != "time" and isinstance(last[key], (int, float)) and isinstance(first.get(key), (int, float))
+    }
+
+
+# ── Allocation snapshots ─────────────────────────────────────────────────────
+def snapshot(directory: str, keep: int = MEMORY_SNAPSHOT_KEEP) -> str:
+    """
+    Dump a tracemalloc snapshot into `directory` and delete all but the
+    newest `keep` there (0 = keep all); returns its path.
+    """
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running (set MEMORY_TRACE=tracemalloc)")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"memory-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.snap")
+    tracemalloc.take_snapshot().dump(path)
+    if keep > 0:
+        for old in sorted(snapshots(directory), key=_mtime)[:-keep]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass   # Already pruned by another worker
+    return path
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def snapshots(directory: str = MEMORY_SNAPSHOT_DIR) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, "*.snap"))) if directory else []
+
+
+def _rows(stats, limit: int) -> List[Dict]:
+    return [
+        {
+            "where": str(s.traceback),
+            "size_bytes": s.size,
+            "count": s.count,
+            **({"size_diff_bytes": s.size_diff, "count_diff": s.count_diff} if hasattr(s, "size_diff") else {}),
+        }
+        for s in stats[:limit]
+    ]
+
+
+def top_allocations(limit: int = 15) -> List[Dict]:
+    """Largest live allocation sites, by source line (tracemalloc only)."""
+    if not tracemalloc.is_tracing():
+        return []
+    return _rows(tracemalloc.take_snapshot().statistics("lineno"), limit)
+
+
+def diff(old_path: str, new_path: str, limit: int = 20) -> List[Dict]:
+    """Allocation sites that grew most between two dumped snapshots."""
+    old = tracemalloc.Snapshot.load(old_path)
+    new = tracemalloc.Snapshot.load(new_path)
+    return _rows(new.compare_to(old, "lineno"), limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two allocation snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    d = sub.add_parser("diff", help="Sites that grew between OLD and NEW")
+    d.add_argument("old")
+    d.add_argument("new")
+    d.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    for row in diff(args.old, args.new, args.limit):
+        print(f"{row['size_diff_bytes'] / 1024:+10.1f} KiB  {row['count_diff']:+8d} blocks  {row['where']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+AccessWorld Metrics
+Process-local counters and histograms, rendered in the Prometheus text
+exposition format by GET /metrics (no client library needed):
+
+  accessworld_stage_seconds{stage}            histogram   every pipeline stage, ASR audio
+                                                          decode / Whisper decode, deferred TTS
+  accessworld_stage_errors_total{stage}       counter     stage failures, including the ones a
+                                                          wrapper turns into a placeholder answer
+  accessworld_fallbacks_total{kind}           counter     degraded paths taken (see FALLBACKS)
+  accessworld_stage_rss_growth_bytes_total{stage}
+                                              counter     RSS growth across stage runs
+  accessworld_stage_peak_rss_bytes{stage}     histogram   peak RSS above the stage's starting level
+  accessworld_stage_traced_peak_bytes{stage}  histogram   tracemalloc peak (Python / NumPy only),
+                                                          see models/memory.py
+  accessworld_http_request_seconds{route}     histogram
+  accessworld_http_requests_total{route,status}
+
+A metric lives in the process that records it: under gunicorn every worker
+exports its own series, and with MODEL_ISOLATION=process what a model
+measures internally (Whisper's two phases, wrapper errors) stays in its
+model worker; the pipeline stages are still timed in the API process.
+"""
+import bisect
+import contextlib
+import threading
+import time
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; from a cached caption to a long Whisper decode on CPU
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTE_BUCKETS = tuple(2 ** n for n in range(16, 32, 2))   # 64 KiB … 1 GiB
+
+# fallbacks_total kinds
+FALLBACKS = (
+    "translation_english",   # Answer left in English (translation failed / unsupported language)
+    "phrase_table_miss",     # Templated sentence machine-translated instead of assembled
+    "onnx_to_pytorch",       # ONNX backend requested but unavailable for a model
+)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(v)}" for key, v in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List] = {}   # key → [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the `with` block, whether or not it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        lines = []
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), values):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {values[-1]!r}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+_REGISTRY: List[_Metric] = []
+
+STAGE_SECONDS = Histogram("accessworld_stage_seconds", "Time spent in each processing stage.", ["stage"])
+STAGE_ERRORS  = Counter("accessworld_stage_errors_total", "Failed stage executions.", ["stage"])
+FALLBACKS_TOTAL = Counter("accessworld_fallbacks_total", "Degraded paths taken instead of the normal one.", ["kind"])
+HTTP_SECONDS  = Histogram("accessworld_http_request_seconds", "HTTP request latency (until the response starts).",
+                          ["route"])
+STAGE_RSS_GROWTH = Counter("accessworld_stage_rss_growth_bytes_total",
+                           "Process RSS growth across stage runs (attributed; stages overlap).", ["stage"])
+STAGE_PEAK_RSS = Histogram("accessworld_stage_peak_rss_bytes",
+                           "Peak RSS above the level at stage start (includes overlapping stages).",
+                           ["stage"], BYTE_BUCKETS)
+STAGE_TRACED_PEAK = Histogram("accessworld_stage_traced_peak_bytes",
+                              "Peak tracemalloc-traced allocation above the level at stage start.",
+                              ["stage"], BYTE_BUCKETS)
+HTTP_REQUESTS = Counter("accessworld_http_requests_total", "HTTP requests by route and status.", ["route", "status"])
+
+
+def stage_error(stage: str) -> None:
+    STAGE_ERRORS.inc(stage=stage)
+
+
+def fallback(kind: str) -> None:
+    FALLBACKS_TOTAL.inc(kind=kind)
+
+
+def sampled(name: str, help: str, samples: Dict[Tuple[Tuple[str, str], ...], float],
+            kind: str = "gauge") -> List[str]:
+    """
+    Text lines for a value read at scrape time (e.g. a queue depth), keyed by
+    ((label, value), ...) tuples.
+    """
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples.items():
+        names, values = zip(*labels) if labels else ((), ())
+        lines.append(f"{name}{_labels(names, values)} {_number(value)}")
+    return lines
+
+
+def render(extra: Sequence[str] = ()) -> str:
+    """Every registered metric, plus any `sampled` lines, in exposition format."""
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
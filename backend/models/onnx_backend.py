@@ -0,0 +1,250 @@
+"""
+ONNX Runtime Backend
+Alternate execution backend for the model wrappers, chosen per model:
+
+  • detector    DETR, whole network               onnx/detector.onnx
+  • depth       DPT, whole network                onnx/depth.onnx
+  • captioner   BLIP ViT image encoder            onnx/captioner_vision.onnx
+                (beam-search text decoder stays in PyTorch)
+  • tts         HiFiGAN vocoder                   onnx/tts_vocoder.onnx
+  • translator  MarianMT encoder + decoder        onnx/translator-{lang}/  (via optimum)
+
+Graphs are exported at image build time by download_models.py. A model set
+to "onnx" falls back to PyTorch, with a warning, when onnxruntime is not
+installed or its graph is missing. ORT runs with full graph optimizations and
+ORT_INTRA_OP_THREADS / ORT_INTER_OP_THREADS threads.
+
+Config: MODEL_BACKEND (torch | onnx) sets the default, BACKEND_<MODEL>
+overrides it, and ModelStore accepts an explicit mapping.
+"""
+import os
+from typing import Dict, Iterable, Optional
+
+import torch
+
+from models import metrics
+
+BACKENDS = ("torch", "onnx")
+BACKEND_MODELS = ("captioner", "detector", "depth", "translator", "tts")
+
+DEFAULT_BACKEND = os.getenv("MODEL_BACKEND", "torch")
+ONNX_DIR = os.getenv("ONNX_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "onnx"))
+ORT_INTRA_OP_THREADS = int(os.getenv("ORT_INTRA_OP_THREADS", "0"))   # 0 = one per physical core
+ORT_INTER_OP_THREADS = int(os.getenv("ORT_INTER_OP_THREADS", "1"))
+ONNX_OPSET = 17
+
+
+def backend_profile(overrides: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Resolve the backend of every model: explicit overrides, then
+    BACKEND_<MODEL>, then MODEL_BACKEND.
+
+    Raises:
+        ValueError: on an unknown model name or backend.
+    """
+    overrides = dict(overrides or {})
+    unknown = set(overrides) - set(BACKEND_MODELS)
+    if unknown:
+        raise ValueError(
+            f"Unknown model(s) {', '.join(sorted(unknown))}. Choose from: {', '.join(BACKEND_MODELS)}"
+        )
+    profile = {}
+    for name in BACKEND_MODELS:
+        value = overrides.get(name) or os.getenv(f"BACKEND_{name.upper()}") or DEFAULT_BACKEND
+        if value not in BACKENDS:
+            raise ValueError(f"Unknown backend '{value}' for {name}. Choose from: {', '.join(BACKENDS)}")
+        profile[name] = value
+    return profile
+
+
+def graph_path(graph: str) -> str:
+    return os.path.join(ONNX_DIR, f"{graph}.onnx")
+
+
+def session_options():
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.intra_op_num_threads = ORT_INTRA_OP_THREADS
+    options.inter_op_num_threads = ORT_INTER_OP_THREADS
+    return options
+
+
+class OnnxModule:
+    """Runs an exported graph on torch tensors: keyword inputs in, named outputs out."""
+
+    def __init__(self, session):
+        self.session = session
+        self.input_names = [i.name for i in session.get_inputs()]
+        self.output_names = [o.name for o in session.get_outputs()]
+
+    @classmethod
+    def load(cls, graph: str) -> Optional["OnnxModule"]:
+        """Open onnx/<graph>.onnx, or return None (caller falls back to PyTorch)."""
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            return _fall_back(graph, "onnxruntime not installed")
+        path = graph_path(graph)
+        if not os.path.exists(path):
+            return _fall_back(graph, f"{path} not found (run download_models.py)")
+        try:
+            session = ort.InferenceSession(path, session_options(), providers=["CPUExecutionProvider"])
+        except Exception as e:
+            return _fall_back(graph, f"Could not load {path}: {e}")
+        print(f"  ⚡ {graph} running on ONNX Runtime.")
+        return cls(session)
+
+    def __call__(self, **inputs: torch.Tensor) -> Dict[str, torch.Tensor]:
+        feeds = {name: inputs[name].numpy() for name in self.input_names}
+        outputs = self.session.run(self.output_names, feeds)
+        return {name: torch.from_numpy(out) for name, out in zip(self.output_names, outputs)}
+
+
+def _fall_back(name: str, reason: str) -> None:
+    print(f"  ⚠️  {reason} — {name} falls back to PyTorch.")
+    metrics.fallback("onnx_to_pytorch")
+    return None
+
+
+def load_seq2seq(lang: str):
+    """
+    MarianMT for `lang` as an optimum ORTModelForSeq2SeqLM (same generate()
+    API as the PyTorch model), or None to fall back to PyTorch.
+    """
+    name = f"translator-{lang}"
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError:
+        return _fall_back(name, "optimum[onnxruntime] not installed")
+    directory = os.path.join(ONNX_DIR, name)
+    if not os.path.isdir(directory):
+        return _fall_back(name, f"{directory} not found (run download_models.py)")
+    try:
+        model = ORTModelForSeq2SeqLM.from_pretrained(
+            directory, session_options=session_options(), provider="CPUExecutionProvider",
+        )
+    except Exception as e:
+        return _fall_back(name, f"Could not load {directory}: {e}")
+    print(f"  ⚡ {name} running on ONNX Runtime.")
+    return model
+
+
+# ── Export (download_models.py, at image build time) ─────────────────────────
+class _DetrGraph(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values, pixel_mask):
+        out = self.model(pixel_values=pixel_values, pixel_mask=pixel_mask)
+        return out.logits, out.pred_boxes
+
+
+class _DepthGraph(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        return self.model(pixel_values=pixel_values).predicted_depth
+
+
+class _VisionGraph(torch.nn.Module):
+    def __init__(self, vision_model):
+        super().__init__()
+        self.vision_model = vision_model
+
+    def forward(self, pixel_values):
+        return self.vision_model(pixel_values=pixel_values)[0]
+
+
+def _export(module: torch.nn.Module, args, graph: str, inputs, outputs, dynamic_axes) -> None:
+    os.makedirs(ONNX_DIR, exist_ok=True)
+    module.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            module, args, graph_path(graph),
+            input_names=inputs, output_names=outputs,
+            dynamic_axes=dynamic_axes, opset_version=ONNX_OPSET,
+        )
+    print(f"  → {graph_path(graph)}")
+
+
+def export_detector() -> None:
+    from models.detector import DetectorModel
+    from transformers import DetrForObjectDetection
+    model = DetrForObjectDetection.from_pretrained(DetectorModel.MODEL_ID)
+    _export(
+        _DetrGraph(model),
+        (torch.randn(1, 3, 800, 1066), torch.ones(1, 800, 1066, dtype=torch.long)),
+        "detector", ["pixel_values", "pixel_mask"], ["logits", "pred_boxes"],
+        {
+            "pixel_values": {0: "batch", 2: "height", 3: "width"},
+            "pixel_mask":   {0: "batch", 1: "height", 2: "width"},
+            "logits":       {0: "batch"},
+            "pred_boxes":   {0: "batch"},
+        },
+    )
+
+
+def export_depth() -> None:
+    from models.depth import DepthModel
+    from transformers import DPTForDepthEstimation
+    model = DPTForDepthEstimation.from_pretrained(DepthModel.MODEL_ID)
+    side = DepthModel.INPUT_MIN_SIDE   # DEPTH_INPUT_SIDE at export time
+    _export(
+        _DepthGraph(model), (torch.randn(1, 3, side, side),),
+        "depth", ["pixel_values"], ["predicted_depth"],
+        {"pixel_values": {0: "batch"}, "predicted_depth": {0: "batch"}},
+    )
+
+
+def export_captioner() -> None:
+    from models.captioner import CaptionerModel
+    from transformers import BlipForConditionalGeneration
+    model = BlipForConditionalGeneration.from_pretrained(CaptionerModel.MODEL_ID)
+    size = model.config.vision_config.image_size
+    _export(
+        _VisionGraph(model.vision_model), (torch.randn(1, 3, size, size),),
+        "captioner_vision", ["pixel_values"], ["image_embeds"],
+        {"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+    )
+
+
+def export_tts() -> None:
+    from models.tts import TTSModel
+    from transformers import SpeechT5HifiGan
+    vocoder = SpeechT5HifiGan.from_pretrained(TTSModel.VOCODER_ID)
+    _export(
+        vocoder, (torch.randn(120, vocoder.config.model_in_dim),),
+        "tts_vocoder", ["spectrogram"], ["waveform"],
+        {"spectrogram": {0: "frames"}, "waveform": {0: "samples"}},
+    )
+
+
+def export_translator() -> None:
+    from models.translator import SUPPORTED_LANGUAGES
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    for lang, model_id in SUPPORTED_LANGUAGES.items():
+        directory = os.path.join(ONNX_DIR, f"translator-{lang}")
+        ORTModelForSeq2SeqLM.from_pretrained(model_id, export=True).save_pretrained(directory)
+        print(f"  → {directory}")
+
+
+EXPORTS = {
+    "detector":   export_detector,
+    "depth":      export_depth,
+    "captioner":  export_captioner,
+    "tts":        export_tts,
+    "translator": export_translator,
+}
+
+
+def export_all(names: Iterable[str] = BACKEND_MODELS) -> None:
+    """Export the ONNX graphs of `names`; a failed export is reported, not fatal."""
+    for name in names:
+        try:
+            EXPORTS[name]()
+        except Exception as e:
+            print(f"  ⚠️  ONNX export of {name} failed: {e}")
@@ -0,0 +1,135 @@
+"""
+Multilingual Phrase Table
+Precomputed translations of the closed vocabulary the answer templates are
+built from: proximity labels, DETR class names, template headings and the
+walk verdicts.
+
+The table is built once (at image build time via download_models.py, or by
+running `python -m models.phrasebook`) and stored as gzipped JSON:
+
+    { "es": { "Very Close": "Muy cerca", "car": "coche", ... }, ... }
+
+At request time answers are assembled directly in the target language from
+these fragments, so MarianMT only ever sees the free-text BLIP caption.
+
+The zone sides and proximity labels are single words MarianMT translates
+without context, and it picks the wrong sense for several of them ("Close" →
+shut, "Right" → correct, "Clear" → obvious). Those come from CURATED_PHRASES,
+checked by hand, and are never machine-translated.
+"""
+import gzip
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+
+PHRASE_TABLE_PATH = os.getenv(
+    "PHRASE_TABLE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "phrase_table.json.gz"),
+)
+
+# Template fragments used by pipeline.compose_segments
+TEMPLATE_PHRASES: List[str] = [
+    "I can see",
+    "Warning, hazards nearby",
+    "Depth analysis",
+    "Left",
+    "Center",
+    "Right",
+    "Unknown",
+    "It appears safe to walk forward.",
+    "Do not walk forward — obstacle detected.",
+]
+
+# Hand-checked translations of the zone sides and proximity labels, in the
+# navigation sense. They override the machine-translated table entries.
+CURATED_PHRASES: Dict[str, Dict[str, str]] = {
+    "hi": {
+        "Left": "बाएँ", "Center": "बीच में", "Right": "दाएँ",
+        "Very Close": "बहुत पास", "Close": "पास", "Medium": "मध्यम दूरी", "Clear": "रास्ता साफ़", "Unknown": "अज्ञात",
+    },
+    "fr": {
+        "Left": "Gauche", "Center": "Centre", "Right": "Droite",
+        "Very Close": "Très proche", "Close": "Proche", "Medium": "Distance moyenne", "Clear": "Dégagé", "Unknown": "Inconnu",
+    },
+    "es": {
+        "Left": "Izquierda", "Center": "Centro", "Right": "Derecha",
+        "Very Close": "Muy cerca", "Close": "Cerca", "Medium": "Distancia media", "Clear": "Despejado", "Unknown": "Desconocido",
+    },
+    "de": {
+        "Left": "Links", "Center": "Mitte", "Right": "Rechts",
+        "Very Close": "Sehr nah", "Close": "Nah", "Medium": "Mittlere Entfernung", "Clear": "Frei", "Unknown": "Unbekannt",
+    },
+    "zh": {
+        "Left": "左侧", "Center": "中间", "Right": "右侧",
+        "Very Close": "非常近", "Close": "近", "Medium": "中等距离", "Clear": "畅通", "Unknown": "未知",
+    },
+}
+
+
+class Phrasebook:
+    def __init__(self, table: Optional[Dict[str, Dict[str, str]]] = None):
+        self._table: Dict[str, Dict[str, str]] = table or {}
+
+    @classmethod
+    def load(cls, path: str = PHRASE_TABLE_PATH) -> "Phrasebook":
+        """Load a table from disk; an absent file yields an empty phrasebook."""
+        if not os.path.exists(path):
+            print(f"  ⚠️  No phrase table at {path}; answers will be fully machine-translated.")
+            return cls()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            table = json.load(f)
+        # Tables built before a curated entry existed still get the right sense
+        table = {lang: {**phrases, **CURATED_PHRASES.get(lang, {})} for lang, phrases in table.items()}
+        print(f"  ✅ Phrase table loaded ({', '.join(sorted(table))}).")
+        return cls(table)
+
+    def save(self, path: str = PHRASE_TABLE_PATH) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(self._table, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+    def lookup(self, lang: str, phrase: str) -> Optional[str]:
+        """Translation of `phrase` into `lang`, or None if not in the table."""
+        if lang == "en":
+            return phrase
+        return self._table.get(lang, {}).get(phrase)
+
+    @property
+    def languages(self) -> List[str]:
+        return sorted(self._table)
+
+
+def vocabulary() -> List[str]:
+    """Every fixed fragment the answer templates can emit."""
+    from transformers import DetrConfig
+    from models.zones import PROXIMITY_LEVELS
+    from models.detector import DetectorModel
+
+    labels = [label for _, label, _ in PROXIMITY_LEVELS]
+    classes = DetrConfig.from_pretrained(DetectorModel.MODEL_ID).id2label.values()
+    return list(dict.fromkeys([*TEMPLATE_PHRASES, *labels, *classes]))
+
+
+def build(translator, languages: Iterable[str], phrases: Iterable[str]) -> Phrasebook:
+    """
+    Translate `phrases` into each language with one batched MarianMT pass per
+    language; phrases in CURATED_PHRASES take the curated translation instead.
+    """
+    phrases = list(phrases)
+    table: Dict[str, Dict[str, str]] = {}
+    for lang in languages:
+        curated = CURATED_PHRASES.get(lang, {})
+        pending = [p for p in phrases if p not in curated]
+        print(f"  🌐 Building phrase table for {lang} ({len(pending)} phrases, {len(curated)} curated)...")
+        table[lang] = dict(zip(pending, translator.translate_many(pending, lang)))
+        table[lang].update(curated)
+    return Phrasebook(table)
+
+
+if __name__ == "__main__":
+    from models.translator import SUPPORTED_LANGUAGES, TranslatorModel
+
+    book = build(TranslatorModel(), SUPPORTED_LANGUAGES, vocabulary())
+    book.save()
+    print(f"✅ Phrase table written to {PHRASE_TABLE_PATH}")
@@ -0,0 +1,64 @@
+"""
+Precision Profiles
+CPU inference precision, chosen per model:
+  • fp32 — reference weights and math
+  • bf16 — fp32 weights, forward passes under torch.autocast(bfloat16);
+           fast on CPUs with AVX-512 BF16 / AMX, roughly neutral elsewhere
+  • int8 — dynamic quantization of every nn.Linear (int8 weights, activations
+           quantized on the fly); ~4× smaller Linear weights
+
+Defaults come from MODEL_PRECISION, overridden per model by
+PRECISION_<MODEL> (e.g. PRECISION_TTS=int8), and can be passed explicitly to
+ModelStore. `benchmarks/precision.py` measures what each profile costs in
+accuracy against fp32. torch is only imported for the bf16 / int8 paths.
+"""
+import contextlib
+import os
+from typing import Dict, Optional
+
+
+PRECISIONS = ("fp32", "bf16", "int8")
+
+# Models whose wrappers honour a precision profile
+PRECISION_MODELS = ("captioner", "detector", "depth", "translator", "tts")
+
+DEFAULT_PRECISION = os.getenv("MODEL_PRECISION", "fp32")
+
+
+def precision_profile(overrides: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Resolve the precision of every model: explicit overrides, then
+    PRECISION_<MODEL>, then MODEL_PRECISION.
+
+    Raises:
+        ValueError: on an unknown model name or precision.
+    """
+    overrides = dict(overrides or {})
+    unknown = set(overrides) - set(PRECISION_MODELS)
+    if unknown:
+        raise ValueError(
+            f"Unknown model(s) {', '.join(sorted(unknown))}. Choose from: {', '.join(PRECISION_MODELS)}"
+        )
+    profile = {}
+    for name in PRECISION_MODELS:
+        value = overrides.get(name) or os.getenv(f"PRECISION_{name.upper()}") or DEFAULT_PRECISION
+        if value not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{value}' for {name}. Choose from: {', '.join(PRECISIONS)}")
+        profile[name] = value
+    return profile
+
+
+def prepare(model: "torch.nn.Module", precision: str) -> "torch.nn.Module":
+    """Return `model` converted for `precision` (int8 quantizes; others unchanged)."""
+    if precision == "int8":
+        import torch
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def autocast(precision: str):
+    """Context manager for a forward pass at `precision`."""
+    if precision == "bf16":
+        import torch
+        return torch.autocast("cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext()
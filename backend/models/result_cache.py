@@ -0,0 +1,220 @@
+"""
+Vision Result Cache
+Remembers what BLIP / DETR / DPT said about recent images, so near-identical
+requests (the same doorway twice, a retry after a network blip, two phones
+pointed at the same scene) skip the model entirely.
+
+Lookup order:
+  1. exact content hash of the uploaded bytes      (memory, then disk)
+  2. perceptual dHash within `max_distance` bits   (memory only; same aspect
+     ratio; only for the models in RESULT_CACHE_NEAR)
+
+Entries expire after a TTL and the memory tier is an LRU bounded by entry
+count. The optional disk tier stores one JSON file per content hash.
+
+Safety: a near-duplicate hit answers for a *different* photo. The same
+doorway minutes later, now with a person or car in it, can hash within a few
+bits of the empty one, and DETR / DPT results decide `hazards` and
+`safe_to_walk`. So near-duplicate matching is opt-in per model and off for
+them by default (exact bytes are the same photo, so exact hits are always
+safe). Opted-in hazard models only match entries younger than
+RESULT_CACHE_HAZARD_NEAR_TTL_SEC (a retry, a double send), never the full TTL.
+"""
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from models.frame import PreparedFrame
+from models.scene import frame_hash, hamming
+
+
+RESULT_CACHE_SIZE     = int(os.getenv("RESULT_CACHE_SIZE", "512"))       # Entries per model
+RESULT_CACHE_TTL_SEC  = float(os.getenv("RESULT_CACHE_TTL_SEC", "600"))
+RESULT_CACHE_DISTANCE = int(os.getenv("RESULT_CACHE_DISTANCE", "4"))     # dHash bits; -1 = exact only
+RESULT_CACHE_DIR      = os.getenv("RESULT_CACHE_DIR", "")
+# Models allowed near-duplicate hits; the others hit on exact bytes only
+RESULT_CACHE_NEAR = [
+    name.strip() for name in os.getenv("RESULT_CACHE_NEAR", "captioner").split(",") if name.strip()
+]
+RESULT_CACHE_HAZARD_NEAR_TTL_SEC = float(os.getenv("RESULT_CACHE_HAZARD_NEAR_TTL_SEC", "5"))
+
+HAZARD_MODELS = ("detector", "depth")   # Their results decide hazards / safe_to_walk
+
+ASPECT_TOLERANCE = 0.02   # Near-duplicates must share the aspect ratio within 2 %
+
+# Adapts a stored value to a frame of another size: (value, stored_size, new_size) → value
+Adapter = Callable[[Any, Tuple[int, int], Tuple[int, int]], Any]
+
+
+class _Entry:
+    __slots__ = ("value", "dhash", "size", "created")
+
+    def __init__(self, value: Any, dhash: int, size: Tuple[int, int], created: float):
+        self.value = value
+        self.dhash = dhash
+        self.size = size
+        self.created = created
+
+
+class ResultCache:
+    def __init__(
+        self,
+        name: str,
+        adapt: Optional[Adapter] = None,
+        max_entries: int = RESULT_CACHE_SIZE,
+        ttl: float = RESULT_CACHE_TTL_SEC,
+        max_distance: Optional[int] = None,
+        near_ttl: Optional[float] = None,
+        directory: str = RESULT_CACHE_DIR,
+    ):
+        """
+        `max_distance` defaults to RESULT_CACHE_DISTANCE for the models in
+        RESULT_CACHE_NEAR and -1 (exact only) for the rest; `near_ttl`, the
+        oldest entry a near-duplicate may match, to the TTL, or to
+        RESULT_CACHE_HAZARD_NEAR_TTL_SEC for DETR / DPT.
+        """
+        self.name = name
+        self.adapt = adapt
+        self.max_entries = max_entries
+        self.ttl = ttl
+        if max_distance is None:
+            max_distance = RESULT_CACHE_DISTANCE if name in RESULT_CACHE_NEAR else -1
+        if near_ttl is None:
+            near_ttl = RESULT_CACHE_HAZARD_NEAR_TTL_SEC if name in HAZARD_MODELS else ttl
+        self.max_distance = max_distance
+        self.near_ttl = min(near_ttl, ttl)
+        self.directory = os.path.join(directory, name) if directory else ""
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()   # digest → entry
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._near_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def fetch(self, frame: PreparedFrame, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result for `frame`, or `compute()` and store it.
+        Exceptions from `compute` propagate and nothing is cached.
+        """
+        if not self.enabled or frame.digest is None:
+            return compute()
+        value = self.get(frame)
+        if value is not None:
+            return value
+        value = compute()
+        self.put(frame, value)
+        return value
+
+    def get(self, frame: PreparedFrame) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(frame.digest)
+            if entry is not None:
+                self._entries.move_to_end(frame.digest)
+                self._hits += 1
+                return copy.deepcopy(entry.value)
+
+        entry = self._load(frame.digest)
+        if entry is not None:
+            with self._lock:
+                self._disk_hits += 1
+                self._insert(frame.digest, entry)
+            return copy.deepcopy(entry.value)
+
+        if self.max_distance >= 0:
+            fingerprint = frame_hash(frame)
+            with self._lock:
+                best = None
+                for digest, entry in self._entries.items():
+                    if now - entry.created > self.near_ttl:
+                        continue
+                    distance = hamming(fingerprint, entry.dhash)
+                    if distance <= self.max_distance and _same_aspect(entry.size, frame.original_size):
+                        if best is None or distance < best[0]:
+                            best = (distance, digest, entry)
+                if best is not None:
+                    self._entries.move_to_end(best[1])
+                    self._near_hits += 1
+                    value = copy.deepcopy(best[2].value)
+                    if self.adapt is not None and best[2].size != frame.original_size:
+                        value = self.adapt(value, best[2].size, frame.original_size)
+                    return value
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, frame: PreparedFrame, value: Any) -> None:
+        entry = _Entry(copy.deepcopy(value), frame_hash(frame), frame.original_size, time.monotonic())
+        with self._lock:
+            self._insert(frame.digest, entry)
+        self._save(frame.digest, entry)
+
+    def _insert(self, digest: str, entry: _Entry) -> None:
+        self._entries[digest] = entry
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _expire(self, now: float) -> None:
+        for digest in [d for d, e in self._entries.items() if now - e.created > self.ttl]:
+            del self._entries[digest]
+
+    # ── Disk tier ────────────────────────────────────────────────────────────
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.json") if self.directory else ""
+
+    def _load(self, digest: str) -> Optional[_Entry]:
+        path = self._path(digest)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            return _Entry(data["value"], data["dhash"], tuple(data["size"]), time.monotonic())
+        except Exception:
+            return None
+
+    def _save(self, digest: str, entry: _Entry) -> None:
+        path = self._path(digest)
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"value": entry.value, "dhash": entry.dhash, "size": entry.size}, f)
+        except Exception as e:
+            print(f"  ⚠️  {self.name} result cache write failed: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self._hits + self._near_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "enabled":      self.enabled,
+                "entries":      len(self._entries),
+                "max_entries":  self.max_entries,
+                "max_distance": self.max_distance,
+                "hits":         self._hits,
+                "near_hits":    self._near_hits,
+                "disk_hits":    self._disk_hits,
+                "misses":       self._misses,
+                "hit_rate":     round(hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def _same_aspect(a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+    return abs(a[0] / a[1] - b[0] / b[1]) <= ASPECT_TOLERANCE * (a[0] / a[1])
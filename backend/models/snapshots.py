@@ -0,0 +1,47 @@
+"""
+Local Model Snapshots
+download_models.py saves every HuggingFace model once more as a local
+safetensors snapshot under MODEL_SNAPSHOT_DIR (one directory per model id).
+
+Loading from a snapshot skips the hub round-trips (cache lookups, revision
+checks), and with low_cpu_mem_usage the random initialisation of the model
+skeleton is skipped. The weights are still copied out of the safetensors files
+into freshly allocated tensors: nothing stays memory-mapped, so each process
+that loads a model holds its own copy (gunicorn shares one by forking instead).
+
+Memory-mapped loading (torch.load(mmap=True) + load_state_dict(assign=True))
+is deliberately not used: the int8 profile replaces every Linear weight right
+after loading, the model skeletons have non-persistent buffers that would have
+to be rebuilt per architecture, and gunicorn workers already share the pages.
+The cost is one private copy per MODEL_ISOLATION=process worker.
+Wrappers call `snapshot(model_id)` and transparently fall back to the hub id
+when no snapshot was prepared.
+"""
+import os
+
+
+SNAPSHOT_DIR = os.getenv(
+    "MODEL_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "snapshots"),
+)
+
+
+def snapshot_path(model_id: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, model_id.replace("/", "--"))
+
+
+def snapshot(model_id: str) -> str:
+    """Local snapshot directory for `model_id` if one exists, else the hub id."""
+    path = snapshot_path(model_id)
+    return path if os.path.isfile(os.path.join(path, "config.json")) else model_id
+
+
+def save_snapshot(model_id: str, *objects) -> None:
+    """Save a model and its processor / tokenizer side by side, weights as safetensors."""
+    path = snapshot_path(model_id)
+    for obj in objects:
+        if hasattr(obj, "state_dict"):
+            obj.save_pretrained(path, safe_serialization=True)
+        else:
+            obj.save_pretrained(path)
+    print(f"  → snapshot {path}")
@@ -0,0 +1,151 @@
+"""
+Speech Audio Helpers
+The torch-free half of text-to-speech: splitting text into the sentences
+SpeechT5 synthesizes one at a time, the sentence → waveform LRU, 16-bit PCM
+conversion, the WAV header and the per-sentence PCM stream. Routers import these
+without loading the TTS models.
+"""
+import hashlib
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from models.text import split_sentences
+
+
+SAMPLE_RATE     = 16000
+SEGMENT_GAP_SEC = 0.15     # Silence inserted between concatenated sentences
+
+# SpeechT5 input limit is ~600 tokens; longer sentences are split on words
+MAX_SEGMENT_CHARS = 580
+
+
+def speech_segments(text: str) -> List[str]:
+    """Split text into sentences, breaking any over-long sentence on word boundaries."""
+    segments = []
+    for sentence in split_sentences(text):
+        while len(sentence) > MAX_SEGMENT_CHARS:
+            cut = sentence.rfind(" ", 0, MAX_SEGMENT_CHARS)
+            cut = cut if cut > 0 else MAX_SEGMENT_CHARS
+            segments.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            segments.append(sentence)
+    return segments
+
+
+def wav_stream_header(sample_rate: int = SAMPLE_RATE) -> bytes:
+    """
+    RIFF/WAVE header for 16-bit mono PCM of unknown length, for chunked
+    streaming. Sizes are set to the maximum, which players treat as "until EOF".
+    """
+    unknown = 0xFFFFFFFF
+    return (
+        b"RIFF" + struct.pack("<I", unknown) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+        + b"data" + struct.pack("<I", unknown)
+    )
+
+
+def pcm16(waveform: np.ndarray) -> bytes:
+    """float32 [-1, 1] waveform → little-endian 16-bit PCM bytes."""
+    return (np.clip(waveform, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def pcm_stream(sentences: Iterable[str], waveform: Callable[[str], np.ndarray]) -> Iterator[bytes]:
+    """
+    16-bit PCM one sentence at a time, in the given order, with a short gap
+    between sentences. Prepend `wav_stream_header()` to play the chunks as a
+    single WAV. A sentence that fails to synthesize ends the stream with its
+    error: skipping it could silently drop the hazard warning.
+    """
+    gap = pcm16(np.zeros(int(SEGMENT_GAP_SEC * SAMPLE_RATE), dtype=np.float32))
+    first = True
+    for text in sentences:
+        for segment in speech_segments(text):
+            chunk = pcm16(waveform(segment))
+            yield chunk if first else gap + chunk
+            first = False
+
+
+class WaveformCache:
+    """Size-bounded LRU of sentence → float32 waveform, with an optional disk tier."""
+
+    def __init__(self, max_bytes: int, directory: str = ""):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        with self._lock:
+            if text in self._entries:
+                self._entries.move_to_end(text)
+                self._hits += 1
+                return self._entries[text]
+
+        path = self._path(text)
+        if path and os.path.exists(path):
+            try:
+                waveform = np.load(path)
+            except Exception:
+                waveform = None
+            if waveform is not None:
+                with self._lock:
+                    self._disk_hits += 1
+                self._insert(text, waveform)
+                return waveform
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, text: str, waveform: np.ndarray) -> None:
+        self._insert(text, waveform)
+        path = self._path(text)
+        if path:
+            try:
+                np.save(path, waveform)
+            except Exception as e:
+                print(f"  ⚠️  TTS cache write failed: {e}")
+
+    def _insert(self, text: str, waveform: np.ndarray) -> None:
+        if waveform.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if text in self._entries:
+                self._bytes -= self._entries.pop(text).nbytes
+            self._entries[text] = waveform
+            self._bytes += waveform.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def _path(self, text: str) -> str:
+        if not self.directory:
+            return ""
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.npy")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                "entries":   len(self._entries),
+                "bytes":     self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits":      self._hits,
+                "disk_hits": self._disk_hits,
+                "misses":    self._misses,
+                "hit_rate":  round((self._hits + self._disk_hits) / lookups, 3) if lookups else 0.0,
+            }
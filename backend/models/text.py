@@ -0,0 +1,13 @@
+"""
+Text helpers shared by the language models (MarianMT, SpeechT5).
+"""
+import re
+from typing import List
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text on sentence-final punctuation, dropping empty pieces."""
+    return [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
@@ -0,0 +1,181 @@
+"""
+Box Tracker
+Carries DETR detections across the frames between detector keyframes.
+
+Each object is a track with a stable id and a constant-velocity Kalman filter
+over its box centre and size. On a keyframe the fresh detections are matched
+to the predicted tracks by IoU (Hungarian assignment, same label only); in
+between, boxes are simply extrapolated — a few hundred flops per object
+instead of a DETR forward pass.
+
+The size velocity doubles as an approach signal: a box whose area keeps
+growing belongs to something getting closer to the camera.
+"""
+import itertools
+import os
+from typing import Dict, List
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+
+TRACK_IOU_THRESHOLD  = float(os.getenv("TRACK_IOU_THRESHOLD", "0.3"))
+TRACK_MAX_AGE_SEC    = float(os.getenv("TRACK_MAX_AGE_SEC", "1.5"))     # Coast this long unmatched
+APPROACH_GROWTH      = float(os.getenv("APPROACH_GROWTH", "0.25"))      # Box area growth per second
+APPROACH_MIN_HITS    = 3                                                # Keyframes before judging
+
+
+def iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of two [N,4] / [M,4] arrays of x0,y0,x1,y1 boxes."""
+    x0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+# ── Kalman track ─────────────────────────────────────────────────────────────
+class Track:
+    """
+    State: [cx, cy, w, h, vcx, vcy, vw, vh] in pixels and pixels/second.
+    Only the box (cx, cy, w, h) is observed.
+    """
+    _H = np.hstack([np.eye(4), np.zeros((4, 4))])
+    _R = np.diag([4.0, 4.0, 16.0, 16.0])              # Measurement noise (px²)
+
+    def __init__(self, track_id: int, detection: Dict, t: float):
+        self.id = track_id
+        self.label = detection["label"]
+        self.confidence = detection["confidence"]
+        self.x = np.zeros(8)
+        self.x[:4] = _to_cxcywh(detection["box"])
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1e3, 1e3, 1e3, 1e3])
+        self.t = t                                    # Time of the current state
+        self.last_seen = t
+        self.hits = 1
+
+    def predict(self, t: float) -> None:
+        dt = t - self.t
+        if dt <= 0:
+            return
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+        q = np.diag([1.0, 1.0, 1.0, 1.0, 50.0, 50.0, 50.0, 50.0]) * dt   # Acceleration noise
+        self.x = F @ self.x
+        self.x[2:4] = np.maximum(self.x[2:4], 1.0)    # Keep the box non-degenerate
+        self.P = F @ self.P @ F.T + q
+        self.t = t
+
+    def update(self, detection: Dict, t: float) -> None:
+        z = _to_cxcywh(detection["box"])
+        S = self._H @ self.P @ self._H.T + self._R
+        K = self.P @ self._H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - self._H @ self.x)
+        self.P = (np.eye(8) - K @ self._H) @ self.P
+        self.confidence = detection["confidence"]
+        self.last_seen = t
+        self.hits += 1
+
+    @property
+    def box(self) -> np.ndarray:
+        cx, cy, w, h = self.x[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2])
+
+    @property
+    def growth(self) -> float:
+        """Relative box-area growth per second: d(w·h)/dt ÷ (w·h)."""
+        w, h, vw, vh = self.x[2], self.x[3], self.x[6], self.x[7]
+        return float(vw / w + vh / h)
+
+    @property
+    def approaching(self) -> bool:
+        return self.hits >= APPROACH_MIN_HITS and self.growth >= APPROACH_GROWTH
+
+    def as_detection(self) -> Dict:
+        return {
+            "label":       self.label,
+            "confidence":  self.confidence,
+            "box":         [round(float(v), 1) for v in self.box],
+            "track_id":    self.id,
+            "growth":      round(self.growth, 3),
+            "approaching": self.approaching,
+        }
+
+
+def _to_cxcywh(box: List[float]) -> np.ndarray:
+    x0, y0, x1, y1 = box
+    return np.array([(x0 + x1) / 2, (y0 + y1) / 2, max(x1 - x0, 1.0), max(y1 - y0, 1.0)])
+
+
+# ── Tracker ──────────────────────────────────────────────────────────────────
+class BoxTracker:
+    def __init__(
+        self,
+        iou_threshold: float = TRACK_IOU_THRESHOLD,
+        max_age: float = TRACK_MAX_AGE_SEC,
+    ):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.tracks: List[Track] = []
+        self._ids = itertools.count(1)
+
+    def update(self, detections: List[Dict], t: float) -> List[Dict]:
+        """
+        Keyframe: fold fresh DETR detections into the tracks.
+
+        Returns:
+            The detections annotated with "track_id", "growth" and
+            "approaching", boxes smoothed by the filter, in input order.
+        """
+        for track in self.tracks:
+            track.predict(t)
+
+        matched = self._match(detections)
+        output: List[Track] = []
+        for i, detection in enumerate(detections):
+            track = matched.get(i)
+            if track is None:
+                track = Track(next(self._ids), detection, t)
+                self.tracks.append(track)
+            else:
+                track.update(detection, t)
+            output.append(track)
+
+        # Unmatched tracks coast until they have been missing for max_age
+        self.tracks = [tr for tr in self.tracks if t - tr.last_seen <= self.max_age]
+        return [track.as_detection() for track in output]
+
+    def propagate(self, t: float) -> List[Dict]:
+        """Between keyframes: extrapolate the tracks seen on the last keyframe to time `t`."""
+        if not self.tracks:
+            return []
+        keyframe = max(tr.last_seen for tr in self.tracks)
+        live = [tr for tr in self.tracks if tr.last_seen == keyframe]
+        for track in live:
+            track.predict(t)
+        live.sort(key=lambda tr: tr.confidence, reverse=True)
+        return [track.as_detection() for track in live]
+
+    def reset(self) -> None:
+        self.tracks = []
+
+    def _match(self, detections: List[Dict]) -> Dict[int, Track]:
+        """Hungarian assignment on IoU, restricted to same-label pairs."""
+        if not detections or not self.tracks:
+            return {}
+        det_boxes = np.array([d["box"] for d in detections], dtype=float)
+        trk_boxes = np.array([tr.box for tr in self.tracks])
+        scores = iou(det_boxes, trk_boxes)
+        same_label = np.array([[d["label"] == tr.label for tr in self.tracks] for d in detections])
+        scores = np.where(same_label, scores, 0.0)
+
+        rows, cols = linear_sum_assignment(-scores)
+        return {
+            r: self.tracks[c]
+            for r, c in zip(rows, cols)
+            if scores[r, c] >= self.iou_threshold
+        }
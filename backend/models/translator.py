@@ -5,9 +5,25 @@ Task: English text → target language
 
 Models are lazy-loaded: only the requested language's model is loaded on first use
 and then cached in memory to save RAM.
+
+Answers are translated sentence by sentence through a bounded LRU keyed by
+(lang, sentence). Most of a composed answer repeats across requests (depth
+summary, walk verdict), so only never-seen sentences reach MarianMT, and
+those go in a single padded batch.
+
+transformers and torch are imported when the first language pair loads, so
+the sentence cache works (and is testable) without them.
 """
-from transformers import MarianMTModel, MarianTokenizer
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import os
+import sys
+import threading
+
+from models import metrics
+from models.phrasebook import Phrasebook
+from models.snapshots import snapshot
+from models.text import split_sentences
 
 SUPPORTED_LANGUAGES: Dict[str, str] = {
     "hi": "Helsinki-NLP/opus-mt-en-hi",   # Hindi
@@ -17,24 +33,82 @@ SUPPORTED_LANGUAGES: Dict[str, str] = {
     "zh": "Helsinki-NLP/opus-mt-en-zh",   # Chinese
 }
 
+# Languages whose sentences are joined without spaces
+_NO_SPACE_LANGUAGES = {"zh"}
+
+SENTENCE_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "4096"))
+
+
+def _weight_bytes(model) -> int:
+    """Bytes of a PyTorch model's weights (0 for an ONNX Runtime model)."""
+    if not hasattr(model, "state_dict"):
+        return 0
+    return sum(t.numel() * t.element_size() for t in model.state_dict().values() if hasattr(t, "numel"))
+
 
 class TranslatorModel:
-    def __init__(self):
+    def __init__(
+        self,
+        cache_size: int = SENTENCE_CACHE_SIZE,
+        precision: str = "fp32",
+        backend: str = "torch",
+        residency=None,
+    ):
+        # Applied to each language model as it loads
+        self.precision = precision
+        self.backend = backend
+        # Language pairs are residency entries when a manager is given (evicted
+        # first under memory pressure); otherwise they stay in _cache forever.
+        self.residency = residency
         self._cache: Dict[str, tuple] = {}   # lang_code → (tokenizer, model)
+        self._load_lock = threading.Lock()
+
+        # (lang, sentence) → translation, least recently used first
+        self._sentences: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._sentences_max = cache_size
+        self._sentences_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        # Precomputed fixed-vocabulary translations (see models/phrasebook.py)
+        self.phrasebook = Phrasebook.load()
         print("  ✅ Translator ready (lazy-loading per language).")
 
     def _load(self, lang_code: str):
         """Load and cache a language model on first use."""
-        if lang_code not in self._cache:
-            model_id = SUPPORTED_LANGUAGES[lang_code]
-            print(f"  📥 Loading MarianMT ({model_id})...")
-            tokenizer = MarianTokenizer.from_pretrained(model_id)
-            model     = MarianMTModel.from_pretrained(model_id)
-            model.eval()
-            self._cache[lang_code] = (tokenizer, model)
-            print(f"  ✅ MarianMT {lang_code} ready.")
+        if self.residency is not None:
+            name = f"translator:{lang_code}"
+            self.residency.register(name, lambda: self._load_pair(lang_code), evict_first=True)
+            return self.residency.get(name)
+        with self._load_lock:
+            if lang_code not in self._cache:
+                self._cache[lang_code] = self._load_pair(lang_code)
         return self._cache[lang_code]
 
+    def warm(self, languages: Optional[List[str]] = None) -> None:
+        """Load the given language pairs (default: all) now rather than on first use."""
+        for lang_code in languages or list(SUPPORTED_LANGUAGES):
+            try:
+                self._load(lang_code)
+            except Exception as e:
+                print(f"  ⚠️  MarianMT {lang_code} failed to load: {e}")
+
+    def _load_pair(self, lang_code: str):
+        from transformers import MarianMTModel, MarianTokenizer
+        from models import precision as prec
+        from models.onnx_backend import load_seq2seq
+
+        model_id = SUPPORTED_LANGUAGES[lang_code]
+        print(f"  📥 Loading MarianMT ({model_id})...")
+        tokenizer = MarianTokenizer.from_pretrained(snapshot(model_id))
+        model     = load_seq2seq(lang_code) if self.backend == "onnx" else None
+        if model is None:
+            model = MarianMTModel.from_pretrained(snapshot(model_id), low_cpu_mem_usage=True)
+            model.eval()
+            model = prec.prepare(model, self.precision)
+        print(f"  ✅ MarianMT {lang_code} ready.")
+        return tokenizer, model
+
     def translate(self, text: str, target_lang: str) -> Optional[str]:
         """
         Translate English text into the target language.
@@ -51,21 +125,103 @@ class TranslatorModel:
 
         if target_lang not in SUPPORTED_LANGUAGES:
             print(f"  ⚠️  Unsupported language: {target_lang}")
+            metrics.fallback("translation_english")
             return None
 
         try:
-            tokenizer, model = self._load(target_lang)
-            inputs = tokenizer([text], return_tensors="pt", padding=True, truncation=True, max_length=512)
-            import torch
-            with torch.no_grad():
-                translated = model.generate(**inputs)
-            decoded = tokenizer.decode(translated[0], skip_special_tokens=True)
-            return decoded
+            return self.join(self.translate_many(split_sentences(text), target_lang), target_lang)
 
         except Exception as e:
             print(f"  ⚠️  Translation error ({target_lang}): {e}")
+            metrics.stage_error("translate")
+            metrics.fallback("translation_english")
             return text   # Fallback to original English
 
+    def translate_many(self, sentences: List[str], target_lang: str) -> List[str]:
+        """
+        Translate each sentence through the sentence cache; all misses go to
+        MarianMT in a single padded batch. Errors propagate to the caller.
+        """
+        translated: List[Optional[str]] = [self._lookup(target_lang, s) for s in sentences]
+
+        # Unique misses, in order of first appearance
+        misses = list(dict.fromkeys(
+            s for s, t in zip(sentences, translated) if t is None
+        ))
+        if misses:
+            fresh = dict(zip(misses, self._generate(misses, target_lang)))
+            for sentence, result in fresh.items():
+                self._store(target_lang, sentence, result)
+            translated = [t if t is not None else fresh[s] for s, t in zip(sentences, translated)]
+        return translated
+
+    @staticmethod
+    def join(sentences: List[str], lang: str) -> str:
+        joiner = "" if lang in _NO_SPACE_LANGUAGES else " "
+        return joiner.join(sentences)
+
+    def phrase(self, text: str, target_lang: str) -> Optional[str]:
+        """Precomputed translation of a fixed template fragment, or None."""
+        return self.phrasebook.lookup(target_lang, text)
+
+    def _generate(self, sentences: List[str], target_lang: str) -> List[str]:
+        """Translate a list of sentences with one padded MarianMT batch."""
+        import torch
+        from models import precision as prec
+        tokenizer, model = self._load(target_lang)
+        inputs = tokenizer(sentences, return_tensors="pt", padding=True, truncation=True, max_length=512)
+        with torch.no_grad(), prec.autocast(self.precision):
+            translated = model.generate(**inputs)
+        return tokenizer.batch_decode(translated, skip_special_tokens=True)
+
+    # ── Sentence cache ───────────────────────────────────────────────────────
+    def _lookup(self, lang: str, sentence: str) -> Optional[str]:
+        key = (lang, sentence)
+        with self._sentences_lock:
+            if key in self._sentences:
+                self._sentences.move_to_end(key)
+                self._hits += 1
+                return self._sentences[key]
+            self._misses += 1
+            return None
+
+    def _store(self, lang: str, sentence: str, translation: str) -> None:
+        if self._sentences_max <= 0:
+            return
+        with self._sentences_lock:
+            self._sentences[(lang, sentence)] = translation
+            self._sentences.move_to_end((lang, sentence))
+            while len(self._sentences) > self._sentences_max:
+                self._sentences.popitem(last=False)
+
+    def cache_stats(self) -> Dict:
+        """Sentence-cache hit/miss counters."""
+        with self._sentences_lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries":  len(self._sentences),
+                "capacity": self._sentences_max,
+                "hits":     self._hits,
+                "misses":   self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def memory_stats(self) -> Dict:
+        """
+        What grows with traffic: MarianMT pairs loaded into _cache (with a
+        residency manager they are reported by it instead) and the sentence cache.
+        """
+        pairs = dict(self._cache)        # Not under _load_lock: held while a pair loads
+        with self._sentences_lock:
+            entries = list(self._sentences.items())
+        return {
+            "pairs": {lang: _weight_bytes(model) for lang, (_, model) in pairs.items()},
+            "sentence_entries": len(entries),
+            "sentence_bytes": sum(
+                sys.getsizeof(sentence) + sys.getsizeof(translation) for (_, sentence), translation in entries
+            ),
+        }
+
     @property
     def supported_languages(self):
         return list(SUPPORTED_LANGUAGES.keys()) + ["en"]
@@ -5,37 +5,78 @@ Models:
   microsoft/speecht5_hifigan   (272 MB)
   Matthijs/cmu-arctic-xvectors (~50 MB)
 Task: Text → Natural speech WAV audio
+
+Speech is synthesized one sentence at a time. Each sentence's float32
+waveform is kept in a size-bounded LRU (optionally mirrored to disk), so fixed
+sentences such as the walk verdict are vocoded once and then only
+concatenated; only never-seen text (the BLIP caption) reaches the vocoder.
+
+`stream()` yields 16-bit PCM per sentence as soon as it is vocoded, so
+playback can start after the first short sentence instead of the whole answer.
+The sentence splitting, waveform cache and PCM / WAV helpers live in
+models/speech.py.
 """
 import io
+import os
 import base64
+from typing import Iterable, Iterator
 import torch
 import soundfile as sf
 import numpy as np
 from datasets import load_dataset
 from transformers import SpeechT5Processor, SpeechT5ForTextToSpeech, SpeechT5HifiGan
 
+from models import metrics
+from models import precision as prec
+from models.onnx_backend import OnnxModule
+from models.snapshots import snapshot, snapshot_path
+from models.speech import SAMPLE_RATE, SEGMENT_GAP_SEC, WaveformCache, pcm_stream, speech_segments
+
+
+WAVEFORM_CACHE_MB  = float(os.getenv("TTS_CACHE_MB", "64"))
+WAVEFORM_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "")   # Empty = memory only
+
 
 class TTSModel:
     TTS_MODEL   = "microsoft/speecht5_tts"
     VOCODER_ID  = "microsoft/speecht5_hifigan"
     SPEAKER_DS  = "Matthijs/cmu-arctic-xvectors"
+    SPEAKER_FILE = "speaker_embedding.npy"   # Saved beside the TTS snapshot by download_models.py
 
-    def __init__(self):
+    def __init__(self, precision: str = "fp32", backend: str = "torch"):
+        self.precision = precision
         print(f"  📥 Loading SpeechT5 TTS ({self.TTS_MODEL})...")
-        self.processor = SpeechT5Processor.from_pretrained(self.TTS_MODEL)
-        self.model     = SpeechT5ForTextToSpeech.from_pretrained(self.TTS_MODEL)
+        self.processor = SpeechT5Processor.from_pretrained(snapshot(self.TTS_MODEL))
+        self.model     = SpeechT5ForTextToSpeech.from_pretrained(snapshot(self.TTS_MODEL), low_cpu_mem_usage=True)
         self.model.eval()
+        self.model     = prec.prepare(self.model, precision)   # HiFiGAN is convolutional: left as is
 
         print(f"  📥 Loading HiFiGAN vocoder ({self.VOCODER_ID})...")
-        self.vocoder = SpeechT5HifiGan.from_pretrained(self.VOCODER_ID)
-        self.vocoder.eval()
+        vocoder_onnx = OnnxModule.load("tts_vocoder") if backend == "onnx" else None
+        if vocoder_onnx is not None:
+            # generate_speech only calls vocoder(spectrogram)
+            self.vocoder = lambda spectrogram: vocoder_onnx(spectrogram=spectrogram)["waveform"]
+        else:
+            self.vocoder = SpeechT5HifiGan.from_pretrained(snapshot(self.VOCODER_ID), low_cpu_mem_usage=True)
+            self.vocoder.eval()
 
-        print(f"  📥 Loading speaker embeddings ({self.SPEAKER_DS})...")
+        self.speaker_embeddings = torch.tensor(self.speaker_embedding()).unsqueeze(0)
+
+        self.cache = WaveformCache(int(WAVEFORM_CACHE_MB * 1024 * 1024), WAVEFORM_CACHE_DIR)
+        print("  ✅ SpeechT5 TTS ready.")
+
+    @classmethod
+    def speaker_embedding(cls) -> np.ndarray:
+        """The x-vector of the voice we speak with: from the snapshot, else the hub."""
+        local = os.path.join(snapshot_path(cls.TTS_MODEL), cls.SPEAKER_FILE)
+        if os.path.isfile(local):
+            return np.load(local)
+
+        print(f"  📥 Loading speaker embeddings ({cls.SPEAKER_DS})...")
         from huggingface_hub import hf_hub_download
         
         # Download the zip file containing x-vector embeddings bypassing the broken `datasets` script
         import zipfile
-        import io
         zip_path = hf_hub_download(
             repo_id="Matthijs/cmu-arctic-xvectors",
             filename="spkrec-xvect.zip",
@@ -43,42 +84,63 @@ class TTSModel:
         )
         with zipfile.ZipFile(zip_path) as z:
             # Read a specific speaker's numpy file from the zip archive into memory
-            embed_bytes = z.read("spkrec-xvect/cmu_us_slt_arctic-wav-arctic_a0001.npy")
-            self.speaker_embeddings = torch.tensor(np.load(io.BytesIO(embed_bytes))).unsqueeze(0)
-
-        print("  ✅ SpeechT5 TTS ready.")
+            return np.load(io.BytesIO(z.read("spkrec-xvect/cmu_us_slt_arctic-wav-arctic_a0001.npy")))
 
     def synthesize(self, text: str) -> str:
         """
         Convert text to speech and return base64-encoded WAV.
         
         Args:
-            text: Text to speak (max ~600 chars for quality output)
+            text: Text to speak, any length (synthesized sentence by sentence)
             
         Returns:
             Base64-encoded WAV string for browser Audio API consumption.
         """
         try:
-            # SpeechT5 max token limit is 600; truncate politely
-            if len(text) > 580:
-                text = text[:577] + "..."
+            return base64.b64encode(self.synthesize_wav(text)).decode("utf-8")
+
+        except Exception as e:
+            print(f"  ⚠️  TTS synthesis error: {e}")
+            metrics.stage_error("tts")
+            return ""
 
-            inputs = self.processor(text=text, return_tensors="pt")
+    def synthesize_wav(self, text: str) -> bytes:
+        """Convert text to raw WAV bytes. Errors propagate to the caller."""
+        gap = np.zeros(int(SEGMENT_GAP_SEC * SAMPLE_RATE), dtype=np.float32)
+        pieces = []
+        for sentence in speech_segments(text):
+            if pieces:
+                pieces.append(gap)
+            pieces.append(self.waveform(sentence))
+        speech = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
 
-            with torch.no_grad():
-                speech = self.model.generate_speech(
-                    inputs["input_ids"],
-                    self.speaker_embeddings,
-                    vocoder=self.vocoder,
-                )
+        # Convert to WAV bytes
+        wav_buffer = io.BytesIO()
+        sf.write(wav_buffer, speech, samplerate=SAMPLE_RATE, format="WAV")
+        return wav_buffer.getvalue()
 
-            # Convert to WAV bytes
-            wav_buffer = io.BytesIO()
-            sf.write(wav_buffer, speech.numpy(), samplerate=16000, format="WAV")
-            wav_bytes = wav_buffer.getvalue()
+    def stream(self, sentences: Iterable[str]) -> Iterator[bytes]:
+        """
+        Yield 16-bit PCM audio one sentence at a time (see speech.pcm_stream).
+        A sentence that fails to synthesize raises out of the stream; the
+        caller aborts the response and counts the error.
+        """
+        return pcm_stream(sentences, self.waveform)
 
-            return base64.b64encode(wav_bytes).decode("utf-8")
+    def waveform(self, sentence: str) -> np.ndarray:
+        """float32 waveform for one sentence, from the cache or the vocoder."""
+        cached = self.cache.get(sentence)
+        if cached is not None:
+            return cached
 
-        except Exception as e:
-            print(f"  ⚠️  TTS synthesis error: {e}")
-            return ""
+        inputs = self.processor(text=sentence, return_tensors="pt")
+        with torch.no_grad(), prec.autocast(self.precision):
+            speech = self.model.generate_speech(
+                inputs["input_ids"],
+                self.speaker_embeddings,
+                vocoder=self.vocoder,
+            )
+        waveform = speech.float().numpy()
+        waveform.setflags(write=False)   # Shared between requests via the cache
+        self.cache.put(sentence, waveform)
+        return waveform
@@ -2,11 +2,28 @@
 AccessWorld Pipeline Orchestrator
 Chains: Whisper → BLIP → DETR → DPT → MarianMT → SpeechT5
 Intelligently routes based on the spoken/typed query.
+
+The vision stages (BLIP / DETR / DPT) are independent and run concurrently
+through a small stage graph; compose, translate and TTS wait only on the
+outputs they consume. Stages are evaluated lazily: only those needed by the
+intent's answer template or by the requested response fields ever run.
 """
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional
+import os
 import re
 
+from models import metrics
+from models.frame import DEFAULT_MIN_SIDE, PreparedFrame
+from stage_graph import StageCallback, StageGraph
+
+
+# Shared pool for pipeline stages (and live-session frames). Sized for a few
+# concurrent requests, each fanning out into three vision stages.
+STAGE_WORKERS = int(os.getenv("PIPELINE_STAGE_WORKERS", "8"))
+stage_pool = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="stage")
+
 
 # ── Result Schema ────────────────────────────────────────────────────────────
 @dataclass
@@ -27,6 +44,8 @@ class PipelineResult:
     audio_b64: str                      # Base64 WAV from SpeechT5
     language: str                       # Target language code
     safe_to_walk: bool                  # Combined depth+hazard verdict
+    timings: Dict[str, Dict[str, float]] = field(default_factory=dict)  # Per-stage start/end (ms)
+    answer: List["AnswerSegment"] = field(default_factory=list)        # Composed English sentences
 
 
 # ── Query intent classifier ──────────────────────────────────────────────────
@@ -38,6 +57,48 @@ INTENT_PATTERNS = {
     "translate":   r"(translat|hindi|french|spanish|german|chinese)",
 }
 
+# Stages each intent's answer template actually reads
+INTENT_STAGES: Dict[str, List[str]] = {
+    "full":      ["caption", "detect", "hazards", "depth", "safe"],
+    "objects":   ["caption", "detect", "hazards"],
+    "vehicles":  ["caption", "detect", "hazards"],
+    "depth":     ["hazards", "depth", "safe"],
+    "translate": ["caption", "hazards"],   # caption is the fallback answer
+}
+
+# Response field → stage producing it
+FIELD_STAGES: Dict[str, str] = {
+    "description":     "caption",
+    "objects":         "detect",
+    "hazards":         "hazards",
+    "depth":           "depth",
+    "safe_to_walk":    "safe",
+    "translated_text": "translate",
+    "audio":           "tts",
+}
+
+# Stage → model it runs (the rest are cheap derivations)
+STAGE_MODELS: Dict[str, str] = {
+    "caption":   "captioner",
+    "detect":    "detector",
+    "depth":     "depth",
+    "translate": "translator",
+    "tts":       "tts",
+}
+
+# Always returned. The hazard verdict is the safety contract of every
+# response, so DETR + DPT always run; BLIP only runs when something reads it.
+DEFAULT_FIELDS = ("hazards", "depth", "safe_to_walk", "translated_text", "audio")
+
+
+class ModelsNotReady(RuntimeError):
+    """Raised when a request needs models that are still loading (or failed to)."""
+
+    def __init__(self, missing: List[str]):
+        super().__init__(f"Models still loading: {', '.join(missing)}")
+        self.missing = missing
+
+
 def classify_intent(query: str) -> str:
     q = query.lower()
     for intent, pattern in INTENT_PATTERNS.items():
@@ -46,91 +107,274 @@ def classify_intent(query: str) -> str:
     return "full"
 
 
-def _compose_answer(
+# ── Answer composition ───────────────────────────────────────────────────────
+@dataclass
+class AnswerSegment:
+    kind: str                           # caption | objects | hazards | depth | verdict
+    english: str                        # Sentence as spoken in English
+    head: str = ""                      # Fixed template heading, e.g. "I can see"
+    items: List[str] = field(default_factory=list)  # Closed-vocabulary slot values
+
+
+def compose_segments(
     intent: str,
     description: str,
     objects: List[Dict],
     hazards: List[str],
     depth: Dict,
     safe: bool,
-) -> str:
-    """Build a readable spoken answer from pipeline outputs."""
+) -> List[AnswerSegment]:
+    """Build the spoken answer as sentences tagged with their template."""
     parts = []
 
     if intent in ("full", "objects", "vehicles"):
-        parts.append(description.capitalize() + ".")
+        parts.append(AnswerSegment("caption", description.capitalize() + "."))
 
     if objects and intent in ("full", "objects", "vehicles"):
-        obj_names = list({o["label"] for o in objects[:5]})
-        parts.append(f"I can see: {', '.join(obj_names)}.")
+        obj_names = list(dict.fromkeys(o["label"] for o in objects[:5]))
+        parts.append(AnswerSegment(
+            "objects", f"I can see: {', '.join(obj_names)}.", "I can see", obj_names,
+        ))
 
     if hazards:
-        parts.append(f"Warning: {', '.join(hazards)} detected nearby.")
+        parts.append(AnswerSegment(
+            "hazards", f"Warning: {', '.join(hazards)} detected nearby.",
+            "Warning, hazards nearby", list(hazards),
+        ))
 
     if intent in ("full", "depth"):
-        center = depth.get("zones", {}).get("center", {})
-        left   = depth.get("zones", {}).get("left", {})
-        right  = depth.get("zones", {}).get("right", {})
-        parts.append(
+        zones  = depth.get("zones", {})
+        labels = [zones.get(z, {}).get("label", "Unknown") for z in ("left", "center", "right")]
+        parts.append(AnswerSegment(
+            "depth",
             f"Depth analysis — "
-            f"Left: {left.get('label','Unknown')}. "
-            f"Center: {center.get('label','Unknown')}. "
-            f"Right: {right.get('label','Unknown')}."
-        )
+            f"Left: {labels[0]}. "
+            f"Center: {labels[1]}. "
+            f"Right: {labels[2]}.",
+            "Depth analysis", labels,
+        ))
         verdict = "It appears safe to walk forward." if safe else "Do not walk forward — obstacle detected."
-        parts.append(verdict)
+        parts.append(AnswerSegment("verdict", verdict))
+
+    return parts if parts else [AnswerSegment("caption", description)]
+
+
+def _english(segments: List[AnswerSegment]) -> str:
+    return " ".join(s.english for s in segments)
+
+
+def speech_sentences(segments: List[AnswerSegment]) -> List[str]:
+    """English sentences in speaking order: the hazard warning always first."""
+    ordered = sorted(segments, key=lambda s: s.kind != "hazards")
+    return [s.english for s in ordered]
+
+
+def _render_local(segment: AnswerSegment, language: str, translator) -> Optional[str]:
+    """
+    Assemble a templated sentence from the phrase table, or None if any
+    fragment is missing (the caller then machine-translates the sentence).
+    """
+    if segment.kind == "caption":
+        return None
+    t = lambda phrase: translator.phrase(phrase, language)
+
+    if segment.kind == "verdict":
+        return t(segment.english)
+
+    head, items = t(segment.head), [t(i) for i in segment.items]
+    if head is None or None in items:
+        return None
+
+    if segment.kind == "depth":
+        sides = [t("Left"), t("Center"), t("Right")]
+        if None in sides:
+            return None
+        return f"{head} — " + " ".join(f"{side}: {label}." for side, label in zip(sides, items))
+
+    return f"{head}: {', '.join(items)}."
+
+
+def localize_answer(segments: List[AnswerSegment], language: str, translator) -> str:
+    """
+    Render the answer in `language`. Templated sentences come straight from
+    the phrase table; MarianMT only sees free text (the BLIP caption) and any
+    fragment the table does not cover. Without a translator (still loading)
+    the answer stays in English.
+    """
+    english = _english(segments)
+    if language == "en":
+        return english
+    if translator is None or language not in translator.supported_languages:
+        metrics.fallback("translation_english")
+        return english
 
-    return " ".join(parts) if parts else description
+    sentences = []
+    for segment in segments:
+        local = _render_local(segment, language, translator)
+        if local is None:
+            if segment.kind != "caption":
+                metrics.fallback("phrase_table_miss")
+            local = translator.translate(segment.english, language) or segment.english
+        sentences.append(local)
+    return translator.join(sentences, language)
 
 
 # ── Main pipeline function ───────────────────────────────────────────────────
+def build_graph(
+    image_bytes: bytes,
+    models,                   # app.state.models
+    language: str,
+    intent: str,
+) -> StageGraph:
+    """
+    Wire the pipeline stages into a dependency graph:
+
+                  ┌─► caption ─────────────────────────┐
+        decode ───┼─► detect ──► hazards ──┬───────────┼──► compose ──┬──► translate
+                  └─► depth ───────────────┴──► safe ──┘              └──► tts
+
+    compose depends only on the stages listed in INTENT_STAGES[intent].
+    """
+    graph = StageGraph(stage_pool)
+
+    # ── Decode once, at the largest resolution any vision model needs ────────
+    # (Models still loading are skipped; run_pipeline rejects requests needing them.)
+    # Read from the model classes, so an evicted model is not reloaded just for this.
+    vision = [name for name in ("captioner", "detector", "depth") if models.ready(name)]
+    min_side = models.input_min_side(vision) if vision else DEFAULT_MIN_SIDE
+    graph.add("decode", lambda: PreparedFrame.from_bytes(image_bytes, min_side=min_side))
+
+    # ── Vision stages (independent, run concurrently) ────────────────────────
+    # Detector and depth are submitted first: they feed the hazard path.
+    graph.add("detect",  lambda decode: models.detector.detect(decode),   deps=["decode"])
+    graph.add("depth",   lambda decode: models.depth.analyze(decode),     deps=["decode"])
+    graph.add("caption", lambda decode: models.captioner.caption(decode), deps=["decode"])
+
+    # ── Derived verdicts ─────────────────────────────────────────────────────
+    graph.add("hazards", lambda detect: models.detector.hazardous_objects(detect), deps=["detect"])
+    graph.add(
+        "safe",
+        lambda depth, hazards: depth.get("safe_to_walk", True) and len(hazards) == 0,
+        deps=["depth", "hazards"],
+    )
+
+    # ── Compose the English answer ───────────────────────────────────────────
+    graph.add(
+        "compose",
+        lambda **out: compose_segments(
+            intent,
+            out.get("caption", ""),
+            out.get("detect", []),
+            out.get("hazards", []),
+            out.get("depth", {}),
+            out.get("safe", False),
+        ),
+        deps=INTENT_STAGES.get(intent, INTENT_STAGES["full"]),
+    )
+
+    # ── Translate + TTS (both only need the composed answer) ─────────────────
+    graph.add(
+        "translate",
+        lambda compose: localize_answer(compose, language, models.translator),
+        deps=["compose"],
+    )
+    # SpeechT5 is English only; always speak the English answer (model limitation)
+    graph.add(
+        "tts",
+        lambda compose: models.tts.synthesize(" ".join(speech_sentences(compose))),
+        deps=["compose"],
+    )
+
+    return graph
+
+
+def _stage_models(stages: Iterable[str]) -> List[str]:
+    """
+    Models the given stages cannot do without. MarianMT is not one of them:
+    until it has loaded, localize_answer leaves the answer in English.
+    """
+    names = {STAGE_MODELS[s] for s in stages if s in STAGE_MODELS}
+    names.discard("translator")
+    return sorted(names)
+
+
+def resolve_fields(include: Optional[Iterable[str]] = None, audio: bool = True) -> List[str]:
+    """
+    Merge the default response fields with any extras the client asked for.
+    With `audio=False` the TTS stage is left out (callers that stream speech
+    separately).
+
+    Raises:
+        ValueError: on an unknown field name.
+    """
+    fields = list(DEFAULT_FIELDS)
+    for name in include or ():
+        name = name.strip()
+        if not name:
+            continue
+        if name not in FIELD_STAGES:
+            raise ValueError(
+                f"Unknown field '{name}'. Choose from: {', '.join(FIELD_STAGES)}"
+            )
+        if name not in fields:
+            fields.append(name)
+    if not audio:
+        fields = [f for f in fields if f != "audio"]
+    return fields
+
+
 def run_pipeline(
     image_bytes: bytes,
     models,                   # app.state.models
     language: str = "en",
     query: str = "",
+    include: Optional[Iterable[str]] = None,
+    on_stage: Optional[StageCallback] = None,
+    with_audio: bool = True,
 ) -> PipelineResult:
     """
-    Full AccessWorld pipeline:
-    1. Scene caption (BLIP)
-    2. Object detection (DETR)
-    3. Depth estimation (DPT)
+    AccessWorld pipeline, evaluated lazily:
+    1. Scene caption (BLIP)        ┐
+    2. Object detection (DETR)     ├ concurrently, only if needed
+    3. Depth estimation (DPT)      ┘
     4. Compose spoken answer
-    5. Translate (MarianMT)
-    6. TTS (SpeechT5)
-    """
-    intent = classify_intent(query) if query else "full"
+    5. Translate (MarianMT)        ┐ concurrently
+    6. TTS (SpeechT5)              ┘
 
-    # ── 1. Caption ────────────────────────────────────────────────────────────
-    description = models.captioner.caption(image_bytes)
+    Args:
+        include: Extra response fields to compute beyond DEFAULT_FIELDS,
+                 e.g. ["description", "objects"].
+        on_stage: Optional callback(stage_name, result) fired as each stage
+                  completes, used by the streaming endpoint.
+        with_audio: Run the TTS stage. Disable when speech is streamed
+                    separately from `result.answer`.
 
-    # ── 2. Object detection ──────────────────────────────────────────────────
-    objects = models.detector.detect(image_bytes)
-    hazards = models.detector.hazardous_objects(objects)
+    Skipped stages leave their fields empty ("" / [] / {}).
 
-    # ── 3. Depth estimation ──────────────────────────────────────────────────
-    depth = models.depth.analyze(image_bytes)
-    safe  = depth.get("safe_to_walk", True) and len(hazards) == 0
-
-    # ── 4. Compose the English answer ────────────────────────────────────────
-    english_answer = _compose_answer(intent, description, objects, hazards, depth, safe)
-
-    # ── 5. Translate ─────────────────────────────────────────────────────────
-    translated = models.translator.translate(english_answer, language) or english_answer
+    Raises:
+        ModelsNotReady: if a model the request needs has not loaded yet.
+        FrameDecodeError: if the image bytes cannot be decoded.
+    """
+    intent = classify_intent(query) if query else "full"
+    fields = resolve_fields(include, audio=with_audio)
 
-    # ── 6. TTS — speak the translated text ───────────────────────────────────
-    # SpeechT5 is English only; speak English if translation chosen
-    speak_text = english_answer  # always TTS in English (model limitation)
-    audio_b64  = models.tts.synthesize(speak_text)
+    graph = build_graph(image_bytes, models, language, intent)
+    targets = [FIELD_STAGES[f] for f in fields]
+    missing = models.missing(_stage_models(graph.closure(targets)))
+    if missing:
+        raise ModelsNotReady(missing)
+    out = graph.run(targets, on_stage=on_stage)
 
     return PipelineResult(
         query=query,
-        description=description,
-        objects=objects,
-        hazards=hazards,
-        depth=depth,
-        translated_text=translated,
-        audio_b64=audio_b64,
+        description=out.get("caption", ""),
+        objects=out.get("detect", []),
+        hazards=out.get("hazards", []),
+        depth=out.get("depth", {}),
+        translated_text=out.get("translate", ""),
+        audio_b64=out.get("tts", ""),
         language=language,
-        safe_to_walk=safe,
+        safe_to_walk=out.get("safe", False),
+        timings=graph.timings,
+        answer=out.get("compose", []),
     )
@@ -0,0 +1,194 @@
+"""
+AccessWorld Model Residency
+Keeps the resident models within a RAM budget.
+
+Every model (and every MarianMT language pair) is an entry with a loader.
+`get(name)` loads it on first use and marks it used; whenever the resident
+total exceeds the budget, the least recently used idle entries are evicted —
+MarianMT pairs before whole models — until it fits again. Pinned entries (the
+DETR / DPT hazard path) are never evicted, and an entry used within the last
+RESIDENCY_IDLE_SEC is not considered idle, so models in the middle of a
+request are left alone; the budget is soft in that case.
+
+Footprints are measured from the tensors each model holds after loading.
+Eviction drops the entry's reference and calls its `unload`, which must
+release anything else holding the model (ModelStore stops the model's
+MicroBatcher thread); only then can the collector free the weights.
+"""
+import ctypes
+import gc
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+RESIDENCY_BUDGET_MB = float(os.getenv("RESIDENCY_BUDGET_MB", "0"))    # 0 = unlimited
+RESIDENCY_IDLE_SEC  = float(os.getenv("RESIDENCY_IDLE_SEC", "60"))
+
+MB = 1024 * 1024
+
+
+def footprint(obj: Any, _seen: Optional[set] = None, _depth: int = 0) -> int:
+    """Bytes of tensor / array data reachable from a model wrapper."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen or _depth > 4:
+        return 0
+    seen.add(id(obj))
+
+    # Duck-typed, so the manager never imports torch itself. nbytes first: it
+    # covers arrays, tensors, ONNX Runtime graphs and worker proxies (whose
+    # __getattr__ would answer any other probe with a remote call).
+    if isinstance(getattr(obj, "nbytes", None), int):
+        return obj.nbytes
+    if hasattr(obj, "numel") and hasattr(obj, "element_size"):           # torch.Tensor
+        return obj.numel() * obj.element_size()
+    if callable(getattr(obj, "state_dict", None)):                      # torch.nn.Module
+        # state_dict also covers int8 packed params (stored as tensor tuples)
+        return sum(footprint(v, seen, _depth + 1) for v in obj.state_dict().values())
+    if isinstance(obj, (list, tuple)):
+        return sum(footprint(v, seen, _depth + 1) for v in obj)
+    if isinstance(obj, dict):
+        return sum(footprint(v, seen, _depth + 1) for v in obj.values())
+    if hasattr(obj, "__dict__") and _depth < 2:
+        return sum(footprint(v, seen, _depth + 1) for v in vars(obj).values())
+    return 0
+
+
+def _release_memory() -> None:
+    """Collect the evicted model and hand freed arenas back to the OS."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except Exception:
+        pass   # Not glibc
+
+
+class _Entry:
+    def __init__(self, name: str, loader: Callable[[], Any], unload: Optional[Callable[[], None]],
+                 pinned: bool, evict_first: bool):
+        self.name = name
+        self.loader = loader
+        self.unload = unload
+        self.pinned = pinned
+        self.evict_first = evict_first        # MarianMT pairs: cheapest to reload
+        self.value: Any = None
+        self.bytes = 0
+        self.last_used = 0.0
+        self.loads = 0
+        self.evictions = 0
+        self.load_sec = 0.0
+        self.lock = threading.Lock()          # Serialises loading of this entry
+
+
+class ResidencyManager:
+    def __init__(
+        self,
+        budget_bytes: int = int(RESIDENCY_BUDGET_MB * MB),
+        idle_sec: float = RESIDENCY_IDLE_SEC,
+    ):
+        self.budget_bytes = budget_bytes
+        self.idle_sec = idle_sec
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        unload: Optional[Callable[[], None]] = None,
+        pinned: bool = False,
+        evict_first: bool = False,
+    ) -> None:
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(name, loader, unload, pinned, evict_first)
+
+    def get(self, name: str) -> Any:
+        """The resident model, loading it first if needed (blocking). Loader errors propagate."""
+        entry = self._entries[name]
+        entry.last_used = time.monotonic()
+        if entry.value is not None:
+            return entry.value
+
+        with entry.lock:
+            if entry.value is None:
+                start = time.perf_counter()
+                value = entry.loader()
+                entry.load_sec = round(time.perf_counter() - start, 2)
+                entry.bytes = footprint(value)
+                entry.loads += 1
+                entry.value = value
+                if entry.loads > 1:
+                    print(f"  📥 Reloaded {name} ({entry.bytes / MB:.0f} MB, {entry.load_sec:.1f}s)")
+            value = entry.value
+        entry.last_used = time.monotonic()
+        self._enforce(keep=name)
+        return value
+
+    def peek(self, name: str) -> Any:
+        """The model if resident, else None — never loads."""
+        entry = self._entries.get(name)
+        return entry.value if entry is not None else None
+
+    def resident_bytes(self) -> int:
+        return sum(e.bytes for e in self._entries.values() if e.value is not None)
+
+    def _enforce(self, keep: str) -> None:
+        """Evict idle, unpinned entries (MarianMT pairs first, then LRU) until under budget."""
+        if self.budget_bytes <= 0:
+            return
+        evicted: List[str] = []
+        with self._lock:
+            total = self.resident_bytes()
+            if total <= self.budget_bytes:
+                return
+            now = time.monotonic()
+            candidates = sorted(
+                (
+                    e for e in self._entries.values()
+                    if e.value is not None and not e.pinned and e.name != keep
+                    and now - e.last_used >= self.idle_sec and not e.lock.locked()
+                ),
+                key=lambda e: (not e.evict_first, e.last_used),
+            )
+            for entry in candidates:
+                if total <= self.budget_bytes:
+                    break
+                total -= entry.bytes
+                self._evict(entry)
+                evicted.append(entry.name)
+        if evicted:
+            _release_memory()
+            print(f"  ♻️  Evicted {', '.join(evicted)} (resident {total / MB:.0f} MB "
+                  f"of {self.budget_bytes / MB:.0f} MB budget)")
+        elif total > self.budget_bytes:
+            print(f"  ⚠️  Over memory budget ({total / MB:.0f} / {self.budget_bytes / MB:.0f} MB), "
+                  f"nothing idle to evict")
+
+    def _evict(self, entry: _Entry) -> None:
+        if entry.unload is not None:
+            entry.unload()
+        entry.value = None
+        entry.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "budget_bytes":   self.budget_bytes,
+                "resident_bytes": self.resident_bytes(),
+                "models": {
+                    e.name: {
+                        "resident":  e.value is not None,
+                        "pinned":    e.pinned,
+                        "bytes":     e.bytes,
+                        "loads":     e.loads,
+                        "evictions": e.evictions,
+                        "load_sec":  e.load_sec,
+                        "idle_sec":  round(time.monotonic() - e.last_used, 1) if e.last_used else None,
+                    }
+                    for e in self._entries.values()
+                },
+            }
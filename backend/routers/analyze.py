@@ -1,47 +1,111 @@
 """
-Analyze Router — POST /analyze
+Analyze Router — POST /analyze, POST /analyze/stream, POST /analyze/speech
 Accepts: image file + optional language + optional query
 Returns: Full pipeline result (description, objects, depth, translated text, audio)
+
+/analyze/stream returns the same result progressively as Server-Sent Events,
+one typed event per pipeline stage, with the hazard path (hazards, depth zones,
+walk verdict) first so a warning reaches the user at detector/DPT latency.
+
+/analyze/speech streams only the spoken answer as a chunked WAV, one sentence
+at a time with the hazard warning first.
+
+By default the spoken answer is not inlined: the response carries an
+`audio_url` (GET /audio/{id}) whose WAV is synthesized in the background, or
+only when fetched with audio=lazy. audio=inline keeps the legacy `audio_b64`,
+audio=none skips speech entirely.
+
+With timings=true, /analyze adds a per-request breakdown — executor queueing,
+each pipeline stage and the total — to the JSON and as a Server-Timing header.
 """
 from fastapi import APIRouter, File, Form, UploadFile, Request, HTTPException
-from fastapi.responses import JSONResponse
-from pipeline import run_pipeline
+from fastapi.responses import JSONResponse, StreamingResponse
+from pipeline import ModelsNotReady, PipelineResult, run_pipeline, resolve_fields, speech_sentences
+from inference import ExecutorSaturated
+from models import metrics
+from models.frame import FrameDecodeError
+from models.speech import wav_stream_header
+from typing import Optional
+import asyncio
 import dataclasses
+import json
+import time
+import traceback
 
 router = APIRouter()
 
+ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+AUDIO_MODES = ("background", "lazy", "inline", "none")
 
-@router.post("")
-async def analyze_image(
-    request: Request,
-    image: UploadFile = File(..., description="Image to analyze (JPEG/PNG/WebP)"),
-    language: str = Form("en", description="Target language code: en|hi|fr|es|de|zh"),
-    query: str = Form("", description="Optional spoken/typed question about the image"),
+# Stage → (SSE event type, payload builder)
+STAGE_EVENTS = {
+    "hazards":   ("hazards",         lambda v: {"hazards": v}),
+    "depth":     ("depth",           lambda v: v),
+    "safe":      ("safe_to_walk",    lambda v: {"safe_to_walk": v}),
+    "detect":    ("objects",         lambda v: {"objects": v}),
+    "caption":   ("description",     lambda v: {"description": v}),
+    "compose":   ("answer",          lambda v: {"text": " ".join(s.english for s in v)}),
+    "translate": ("translated_text", lambda v: {"translated_text": v}),
+    "tts":       ("audio",           lambda v: {"audio_b64": v}),
+}
+
+# Events held back until another stage has been emitted, so the hazard
+# verdict always precedes the (less urgent) object list and scene caption.
+HELD_UNTIL = {"detect": "safe", "caption": "safe"}
+
+
+async def _read_request(
+    request: Request, image: UploadFile, include: str, audio: str = "inline"
 ):
-    """
-    🌍 Full AccessWorld pipeline:
-    Upload an image → get scene description, detected objects, depth zones, and TTS audio.
-    """
+    """Shared validation for the analyze routes. Returns (models, image_bytes, fields)."""
     models = request.app.state.models
-    if not models.loaded:
-        raise HTTPException(status_code=503, detail="Models are still loading. Please try again in a moment.")
+    if audio not in AUDIO_MODES:
+        raise HTTPException(status_code=400, detail=f"audio must be one of: {', '.join(AUDIO_MODES)}")
+    try:
+        fields = resolve_fields(include.split(","), audio=(audio == "inline"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    allowed_types = {"image/jpeg", "image/png", "image/webp", "image/gif"}
-    if image.content_type not in allowed_types:
+    if image.content_type not in ALLOWED_IMAGE_TYPES:
         raise HTTPException(status_code=400, detail=f"Unsupported image type: {image.content_type}")
 
     image_bytes = await image.read()
     if len(image_bytes) < 100:
         raise HTTPException(status_code=400, detail="Image file appears empty.")
 
-    result = run_pipeline(
-        image_bytes=image_bytes,
-        models=models,
-        language=language,
-        query=query,
+    return models, image_bytes, fields
+
+
+def _not_ready(e: ModelsNotReady) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"{e} — please try again in a moment.",
+        headers={"Retry-After": "10"},
     )
 
-    return JSONResponse(content={
+
+def _audio_handle(request: Request, result: PipelineResult, mode: str) -> Optional[str]:
+    """Register the spoken answer in the audio store; returns its URL, or None."""
+    if mode not in ("background", "lazy") or not result.answer:
+        return None
+    models = request.app.state.models
+    store = request.app.state.audio
+    audio_id = store.add(speech_sentences(result.answer))
+
+    if mode == "background" and models.ready("tts"):
+        try:
+            # models.tts is read on the worker: it may have to be reloaded first
+            clip = store.get(audio_id)
+            job = models.executor.submit(lambda: clip.render(models.tts))
+            # Failures surface on GET /audio; don't leave them unretrieved here
+            job.add_done_callback(lambda f: f.cancelled() or f.exception())
+        except ExecutorSaturated:
+            pass   # Falls back to synthesizing on first fetch
+    return request.url_for("get_audio", audio_id=audio_id).path
+
+
+def _result_payload(result: PipelineResult, audio_url: Optional[str] = None) -> dict:
+    return {
         "query":            result.query,
         "description":      result.description,
         "objects":          result.objects,
@@ -49,6 +113,247 @@ async def analyze_image(
         "depth":            result.depth,
         "translated_text":  result.translated_text,
         "audio_b64":        result.audio_b64,
+        "audio_url":        audio_url,
         "language":         result.language,
         "safe_to_walk":     result.safe_to_walk,
-    })
+    }
+
+
+def _timing_breakdown(result: PipelineResult, queue_ms: float, total_ms: float) -> dict:
+    return {
+        "queue_ms": round(queue_ms, 2),
+        "stages": {
+            name: {**t, "duration_ms": round(t["end_ms"] - t["start_ms"], 2)}
+            for name, t in sorted(result.timings.items(), key=lambda item: item[1]["start_ms"])
+        },
+        "total_ms": round(total_ms, 2),
+    }
+
+
+def _server_timing(breakdown: dict) -> str:
+    """Server-Timing header value, shown per request by browser dev tools."""
+    entries = [("queue", breakdown["queue_ms"])]
+    entries += [(name, t["duration_ms"]) for name, t in breakdown["stages"].items()]
+    entries.append(("total", breakdown["total_ms"]))
+    return ", ".join(f"{name};dur={ms}" for name, ms in entries)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("")
+async def analyze_image(
+    request: Request,
+    image: UploadFile = File(..., description="Image to analyze (JPEG/PNG/WebP)"),
+    language: str = Form("en", description="Target language code: en|hi|fr|es|de|zh"),
+    query: str = Form("", description="Optional spoken/typed question about the image"),
+    include: str = Form("", description="Comma-separated extra fields to compute, e.g. description,objects"),
+    audio: str = Form("background", description="Spoken answer: background|lazy|inline|none"),
+    timings: bool = Form(False, description="Add a per-stage timing breakdown (also as a Server-Timing header)"),
+):
+    """
+    🌍 Full AccessWorld pipeline:
+    Upload an image → get scene description, detected objects, depth zones, and an audio handle.
+    """
+    models, image_bytes, fields = await _read_request(request, image, include, audio)
+
+    started = {}
+
+    def job():
+        started["at"] = time.perf_counter()
+        return run_pipeline(
+            image_bytes=image_bytes,
+            models=models,
+            language=language,
+            query=query,
+            include=fields,
+            with_audio=(audio == "inline"),
+        )
+
+    submitted = time.perf_counter()
+    try:
+        result = await models.executor.run(job)
+    except ExecutorSaturated:
+        raise HTTPException(status_code=503, detail="Server is busy. Please try again in a moment.")
+    except ModelsNotReady as e:
+        raise _not_ready(e)
+    except FrameDecodeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    payload = _result_payload(result, _audio_handle(request, result, audio))
+    if not timings:
+        return JSONResponse(content=payload)
+    payload["timings"] = _timing_breakdown(
+        result,
+        queue_ms=1000 * (started["at"] - submitted),
+        total_ms=1000 * (time.perf_counter() - submitted),
+    )
+    return JSONResponse(content=payload, headers={"Server-Timing": _server_timing(payload["timings"])})
+
+
+@router.post("/stream")
+async def analyze_image_stream(
+    request: Request,
+    image: UploadFile = File(..., description="Image to analyze (JPEG/PNG/WebP)"),
+    language: str = Form("en", description="Target language code: en|hi|fr|es|de|zh"),
+    query: str = Form("", description="Optional spoken/typed question about the image"),
+    include: str = Form("", description="Comma-separated extra fields to compute, e.g. description,objects"),
+    audio: str = Form("background", description="Spoken answer: background|lazy|inline|none"),
+):
+    """
+    ⚡ Streaming AccessWorld pipeline (text/event-stream).
+
+    Emits one event per completed stage — `hazards`, `depth`, `safe_to_walk`,
+    `objects`, `description`, `answer`, `translated_text`, `audio` — then a
+    final `result` event carrying the full /analyze payload, then `done`.
+    The `audio` event carries `audio_b64` (audio=inline) or `audio_url`.
+    Failures are reported as an `error` event.
+    """
+    models, image_bytes, fields = await _read_request(request, image, include, audio)
+
+    loop = asyncio.get_running_loop()
+    stages: asyncio.Queue = asyncio.Queue()
+
+    def on_stage(name, value):
+        # Called on a pipeline thread: hand over to the event loop
+        loop.call_soon_threadsafe(stages.put_nowait, (name, value))
+
+    try:
+        job = models.executor.submit(
+            run_pipeline,
+            image_bytes=image_bytes,
+            models=models,
+            language=language,
+            query=query,
+            include=fields,
+            on_stage=on_stage,
+            with_audio=(audio == "inline"),
+        )
+    except ExecutorSaturated:
+        raise HTTPException(status_code=503, detail="Server is busy. Please try again in a moment.")
+
+    async def events():
+        emitted, held = set(), []
+
+        def ready(name):
+            gate = HELD_UNTIL.get(name)
+            return gate is None or gate in emitted
+
+        def release():
+            while True:
+                for i, (name, value) in enumerate(held):
+                    if ready(name):
+                        del held[i]
+                        emitted.add(name)
+                        event, build = STAGE_EVENTS[name]
+                        yield _sse(event, build(value))
+                        break
+                else:
+                    return
+
+        while not (job.done() and stages.empty()):
+            getter = asyncio.ensure_future(stages.get())
+            await asyncio.wait({getter, job}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                continue
+            name, value = getter.result()
+            if name in STAGE_EVENTS:
+                held.append((name, value))
+                for chunk in release():
+                    yield chunk
+
+        # Anything still gated (its gate stage never ran) goes out now
+        for name, value in held:
+            event, build = STAGE_EVENTS[name]
+            yield _sse(event, build(value))
+
+        try:
+            result = job.result()
+        except ModelsNotReady as e:
+            yield _sse("error", {"status": 503, "detail": str(e), "missing": e.missing})
+        except FrameDecodeError as e:
+            yield _sse("error", {"status": 400, "detail": str(e)})
+        except Exception as e:
+            yield _sse("error", {"status": 500, "detail": f"Pipeline failed: {e}"})
+        else:
+            audio_url = _audio_handle(request, result, audio)
+            if audio_url:
+                yield _sse("audio", {"audio_url": audio_url})
+            yield _sse("result", _result_payload(result, audio_url))
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/speech")
+async def analyze_image_speech(
+    request: Request,
+    image: UploadFile = File(..., description="Image to analyze (JPEG/PNG/WebP)"),
+    query: str = Form("", description="Optional spoken/typed question about the image"),
+):
+    """
+    🔊 Spoken answer as a chunked `audio/wav` stream.
+
+    Audio is synthesized sentence by sentence, hazard warning first, and each
+    sentence is sent as soon as it is vocoded. The answer is never truncated;
+    if synthesis fails partway, the stream is aborted (no final chunk).
+    Speech is English only (SpeechT5), so there is no language parameter.
+    """
+    models, image_bytes, fields = await _read_request(request, image, "")
+    if not models.ready("tts"):
+        raise _not_ready(ModelsNotReady(["tts"]))
+
+    try:
+        result = await models.executor.run(
+            run_pipeline,
+            image_bytes=image_bytes,
+            models=models,
+            query=query,
+            include=fields,
+            with_audio=False,
+        )
+    except ExecutorSaturated:
+        raise HTTPException(status_code=503, detail="Server is busy. Please try again in a moment.")
+    except ModelsNotReady as e:
+        raise _not_ready(e)
+    except FrameDecodeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue()
+
+    def synthesize():
+        # Runs on the inference pool; hands each sentence's PCM to the loop
+        for chunk in models.tts.stream(speech_sentences(result.answer)):
+            loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+
+    try:
+        job = models.executor.submit(synthesize)
+    except ExecutorSaturated:
+        raise HTTPException(status_code=503, detail="Server is busy. Please try again in a moment.")
+
+    async def audio():
+        yield wav_stream_header()
+        while not (job.done() and chunks.empty()):
+            getter = asyncio.ensure_future(chunks.get())
+            await asyncio.wait({getter, job}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+        error = job.exception()
+        if error is not None:
+            # The header promised more audio: abort the chunked response rather
+            # than end it cleanly, so the client can tell the answer is cut off
+            print(f"  ⚠️  Speech stream failed: {error}")
+            traceback.print_exception(type(error), error, error.__traceback__)
+            metrics.stage_error("tts")
+            raise RuntimeError("Speech synthesis failed mid-stream") from error
+
+    return StreamingResponse(audio(), media_type="audio/wav", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,72 @@
+"""
+Audio Router — GET /audio/{audio_id}
+Serves the spoken answer of an /analyze call as raw audio/wav.
+Supports single byte ranges (Range: bytes=start-end) for seeking players.
+"""
+import re
+
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import Response
+from inference import ExecutorSaturated
+
+router = APIRouter()
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header: str, size: int):
+    """Return (start, end) inclusive for a single-range header, or None if unsatisfiable."""
+    match = _RANGE.match(header.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    first, last = match.group(1), match.group(2)
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(0, size - int(last))
+        end = size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+@router.get("/{audio_id}")
+async def get_audio(audio_id: str, request: Request):
+    """
+    🔊 Fetch the WAV for an audio handle returned by /analyze.
+    Synthesizes it now if it was deferred; 404 once the handle has expired.
+    """
+    models = request.app.state.models
+    clip = request.app.state.audio.get(audio_id)
+    if clip is None:
+        raise HTTPException(status_code=404, detail="Audio not found or expired.")
+
+    wav = clip.wav
+    if wav is None:
+        if not models.ready("tts"):
+            raise HTTPException(status_code=503, detail="TTS is still loading.", headers={"Retry-After": "10"})
+        try:
+            wav = await models.executor.run(lambda: clip.render(models.tts))
+        except ExecutorSaturated:
+            raise HTTPException(status_code=503, detail="Server is busy. Please try again in a moment.")
+        except Exception as e:
+            print(f"  ⚠️  Audio synthesis error: {e}")
+            raise HTTPException(status_code=500, detail="Audio synthesis failed.")
+
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, max-age=300"}
+    range_header = request.headers.get("range")
+    if not range_header:
+        return Response(content=wav, media_type="audio/wav", headers=headers)
+
+    byte_range = _parse_range(range_header, len(wav))
+    if byte_range is None:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable.",
+            headers={"Content-Range": f"bytes */{len(wav)}"},
+        )
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(wav)}"
+    return Response(content=wav[start:end + 1], status_code=206, media_type="audio/wav", headers=headers)
@@ -0,0 +1,47 @@
+"""
+Debug Router — GET /debug/memory, POST /debug/memory/snapshot
+Memory telemetry in full (models/memory.py): per-stage RSS growth and traced
+allocation peaks, bytes of every model in memory, the translation cache, the
+sampled history with its growth rates and, under tracemalloc, the largest
+allocation sites.
+
+Mounted only with DEBUG_ENDPOINTS=1: it exposes source paths and takes
+snapshots on demand.
+"""
+import os
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from models import memory
+
+DEBUG_ENDPOINTS = os.getenv("DEBUG_ENDPOINTS", "0") == "1"
+
+router = APIRouter()
+
+
+@router.get("/memory")
+async def memory_report(request: Request, top: int = 15):
+    """🧠 Where this process's memory is going."""
+    models = request.app.state.models
+    return JSONResponse(content={
+        "trace": memory.MEMORY_TRACE,
+        "process": {"rss_bytes": memory.rss_bytes(), "peak_rss_bytes": memory.peak_rss_bytes()},
+        "stages": memory.stage_stats(),
+        **models.memory_stats(),
+        "history": memory.history(),
+        "growth": memory.growth(),
+        "top_allocations": memory.top_allocations(top),
+        "snapshots": memory.snapshots(),
+    })
+
+
+@router.post("/memory/snapshot")
+async def memory_snapshot():
+    """📸 Dump a tracemalloc snapshot into MEMORY_SNAPSHOT_DIR now (for `python -m models.memory diff`)."""
+    if not memory.MEMORY_SNAPSHOT_DIR:
+        raise HTTPException(status_code=409, detail="MEMORY_SNAPSHOT_DIR is not set.")
+    try:
+        return {"path": memory.snapshot(memory.MEMORY_SNAPSHOT_DIR)}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
@@ -1,27 +1,79 @@
 """
 Health Router — GET /health
 Returns model load status and system info.
+
+Model stats come from models.resident(): an evicted model reports nothing
+rather than being reloaded by a health probe. `memory` is a summary of the
+memory telemetry; GET /debug/memory has the detail (DEBUG_ENDPOINTS=1).
+
+A plain `def`, so FastAPI runs it on its threadpool: with
+MODEL_ISOLATION=process the stats are calls to the worker processes, which
+must not block the event loop.
 """
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 
+from models import memory
+
 router = APIRouter()
 
 
 @router.get("/health")
-async def health_check(request: Request):
-    """Check if AccessWorld backend is running and models are loaded."""
+def health_check(request: Request):
+    """Check if AccessWorld backend is running and which models are loaded."""
     models = request.app.state.models
+    translator, tts = models.resident("translator"), models.resident("tts")
     return JSONResponse(content={
         "status": "ok",
         "models_loaded": models.loaded,
+        "models": models.status(),
+        "load_times_sec": models.load_times,
+        "load_errors": models.load_errors,
         "services": {
-            "whisper":    models.whisper    is not None,
-            "captioner":  models.captioner  is not None,
-            "detector":   models.detector   is not None,
-            "depth":      models.depth      is not None,
-            "tts":        models.tts        is not None,
-            "translator": models.translator is not None,
+            "whisper":    models.ready("whisper"),
+            "captioner":  models.ready("captioner"),
+            "detector":   models.ready("detector"),
+            "depth":      models.ready("depth"),
+            "tts":        models.ready("tts"),
+            "translator": models.ready("translator"),
+        },
+        "precision": models.precision,
+        "backend": models.backend,
+        "inference": models.executor.stats() if models.executor else None,
+        "batching": {
+            name: model.batcher.stats()
+            for name, model in (
+                ("captioner", models.resident("captioner")),
+                ("detector",  models.resident("detector")),
+                ("depth",     models.resident("depth")),
+            )
+            if model is not None
+        },
+        "result_cache": {
+            name: model.results.stats()
+            for name, model in (
+                ("captioner", models.resident("captioner")),
+                ("detector",  models.resident("detector")),
+                ("depth",     models.resident("depth")),
+            )
+            if model is not None
+        },
+        "translation_cache": translator.cache_stats() if translator else None,
+        "tts_cache": tts.cache.stats() if tts else None,
+        "residency": models.residency.stats(),
+        "workers": models.workers.stats() if models.workers else None,
+        "memory": {
+            "trace":          memory.MEMORY_TRACE,
+            "rss_bytes":      memory.rss_bytes(),
+            "peak_rss_bytes": memory.peak_rss_bytes(),
+            "stage_rss_growth_bytes": {
+                name: s["rss_growth_bytes"] for name, s in memory.stage_stats().items()
+            },
+            "stage_peak_rss_bytes": {
+                name: s["rss_peak_max_bytes"] for name, s in memory.stage_stats().items()
+            },
+            "growth": memory.growth(),
         },
+        "audio_store": request.app.state.audio.stats(),
         "version": "1.0.0",
     })
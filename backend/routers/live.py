@@ -0,0 +1,94 @@
+"""
+Live Router — WebSocket /live
+Continuous camera mode.
+
+Client → server:
+  • binary message: one JPEG/PNG/WebP camera frame
+  • text message:   JSON options, e.g. {"language": "hi", "query": "...",
+                    "detect_every": 3, "depth_every": 3, "caption": true}
+Server → client (JSON):
+  • {"type": "update", ...}  only when hazards, approaching hazards, zone
+                              labels or caption changed
+  • {"type": "error", "detail": str}
+
+Frames are analyzed one at a time; if the phone sends faster than the models
+keep up, only the newest frame is kept. A frame that fails is answered with
+an error message and the session goes on.
+"""
+import asyncio
+import json
+import traceback
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from inference import ExecutorSaturated
+from live import LiveSession
+from models.frame import FrameDecodeError
+
+router = APIRouter()
+
+
+@router.websocket("/live")
+async def live_camera(websocket: WebSocket):
+    """📹 Stream camera frames, receive hazard / depth / scene updates."""
+    await websocket.accept()
+    models = websocket.app.state.models
+    missing = models.missing(["detector", "depth"])
+    if missing:
+        await websocket.send_json({"type": "error", "detail": f"Models still loading: {', '.join(missing)}"})
+        await websocket.close(code=1013)   # Try again later
+        return
+
+    session = LiveSession(models)
+    latest = {"frame": None}
+    frame_ready = asyncio.Event()
+
+    async def receive():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                if latest["frame"] is not None:
+                    session.dropped += 1      # Superseded before it was analyzed
+                latest["frame"] = message["bytes"]
+                frame_ready.set()
+            elif message.get("text"):
+                try:
+                    session.configure(json.loads(message["text"]))
+                except (ValueError, TypeError) as e:
+                    await websocket.send_json({"type": "error", "detail": f"Bad options: {e}"})
+
+    async def analyze():
+        while True:
+            await frame_ready.wait()
+            frame_ready.clear()
+            image_bytes, latest["frame"] = latest["frame"], None
+            try:
+                update = await models.executor.run(session.process, image_bytes)
+            except ExecutorSaturated:
+                session.dropped += 1
+                continue
+            except FrameDecodeError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            except Exception as e:
+                # A model error or worker timeout loses this frame, not the session
+                print(f"  ⚠️  Live frame failed: {e}")
+                traceback.print_exc()
+                await websocket.send_json({"type": "error", "detail": f"Frame analysis failed: {e}"})
+                continue
+            if update is not None:
+                update["dropped"] = session.dropped
+                await websocket.send_json(update)
+
+    receiver = asyncio.ensure_future(receive())
+    worker = asyncio.ensure_future(analyze())
+    try:
+        done, _ = await asyncio.wait({receiver, worker}, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        worker.cancel()
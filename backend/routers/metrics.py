@@ -0,0 +1,49 @@
+"""
+Metrics Router — GET /metrics
+Prometheus text exposition of the stage and HTTP latency histograms and the
+error / fallback counters (models/metrics.py), plus values sampled at scrape
+time: inference queue, model readiness, process RSS and model memory.
+A plain `def` like /health: model memory is a worker call in process mode.
+"""
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from models import memory, metrics
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics(request: Request):
+    """📈 Prometheus scrape endpoint (this process only — see models/metrics.py)."""
+    models = request.app.state.models
+    lines = []
+    if models.executor is not None:
+        stats = models.executor.stats()
+        lines += metrics.sampled(
+            "accessworld_inference_jobs", "Inference jobs by state.",
+            {(("state", "running"),): stats["running"], (("state", "queued"),): stats["queued"]},
+        )
+        lines += metrics.sampled(
+            "accessworld_inference_rejected_total", "Jobs rejected with 503 because the queue was full.",
+            {(): stats["rejected"]}, kind="counter",
+        )
+    lines += metrics.sampled(
+        "accessworld_model_ready", "1 when the model can serve requests.",
+        {(("model", name),): int(models.ready(name)) for name in models.status()},
+    )
+    lines += metrics.sampled(
+        "accessworld_model_resident_bytes", "Memory held by loaded model weights.",
+        {(): models.residency.resident_bytes()},
+    )
+    lines += metrics.sampled(
+        "accessworld_model_bytes", "Weights of each model in memory (MarianMT per language pair).",
+        {(("model", name),): nbytes for name, nbytes in models.memory_stats()["models_bytes"].items()},
+    )
+    lines += metrics.sampled(
+        "accessworld_process_resident_bytes", "Resident set size of this process.",
+        {(): memory.rss_bytes()},
+    )
+    return PlainTextResponse(metrics.render(lines), media_type=CONTENT_TYPE)
@@ -5,6 +5,7 @@ Returns: Transcribed text via Whisper
 """
 from fastapi import APIRouter, File, UploadFile, Request, HTTPException
 from fastapi.responses import JSONResponse
+from inference import ExecutorSaturated
 
 router = APIRouter()
 
@@ -25,14 +26,18 @@ async def transcribe_voice(
     Returns the transcribed text so the frontend can display and send it to /analyze.
     """
     models = request.app.state.models
-    if not models.loaded:
-        raise HTTPException(status_code=503, detail="Models still loading.")
+    if not models.ready("whisper"):
+        raise HTTPException(status_code=503, detail="Whisper is still loading.", headers={"Retry-After": "10"})
 
     audio_bytes = await audio.read()
     if len(audio_bytes) < 100:
         raise HTTPException(status_code=400, detail="Audio file appears empty.")
 
-    transcript = models.whisper.transcribe(audio_bytes)
+    try:
+        # Whisper may have been evicted: reloading it happens on the worker too
+        transcript = await models.executor.run(lambda: models.whisper.transcribe(audio_bytes))
+    except ExecutorSaturated:
+        raise HTTPException(status_code=503, detail="Server is busy. Please try again in a moment.")
 
     return JSONResponse(content={
         "transcript": transcript,
@@ -0,0 +1,115 @@
+"""
+AccessWorld Stage Graph
+A tiny dependency-graph runner used by the pipeline orchestrator.
+
+Each stage is a callable plus the names of the stages it depends on. A stage is
+submitted to the thread pool as soon as all of its dependencies have finished,
+so independent stages (caption / detect / depth) run concurrently while
+downstream stages wait only on the inputs they actually consume. Every stage
+run is timed into `timings` and the accessworld_stage_seconds histogram, and
+its memory growth is attributed to it (models/memory.py).
+
+PyTorch releases the GIL inside its kernels, so plain threads are enough to
+overlap the vision models.
+"""
+import time
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from models import memory, metrics
+
+# Called as on_stage(name, result) on the scheduling thread as each stage finishes
+StageCallback = Callable[[str, Any], None]
+
+
+class StageGraph:
+    def __init__(self, pool: Executor):
+        self._pool = pool
+        self._stages: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Iterable[str] = ()) -> "StageGraph":
+        """
+        Register a stage. `fn` is called with one keyword argument per
+        dependency, named after the dependency and bound to its result.
+        """
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self._stages[name] = (fn, deps)
+        return self
+
+    def run(
+        self,
+        targets: Optional[Iterable[str]] = None,
+        on_stage: Optional[StageCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute every stage needed to produce `targets` (all stages if None).
+        `on_stage` is notified as each stage completes, e.g. to stream results.
+
+        Returns:
+            { stage_name: result } for every stage that ran.
+            Per-stage start/end offsets (ms since run start) land in `self.timings`.
+        """
+        needed = self.closure(targets if targets is not None else self._stages)
+        remaining = {
+            name: set(self._stages[name][1]) for name in self._stages if name in needed
+        }
+        results: Dict[str, Any] = {}
+        running: Dict[Any, str] = {}
+        t0 = time.perf_counter()
+
+        while remaining or running:
+            # Submit in registration order so callers control tie-breaking
+            ready = [name for name, deps in remaining.items() if not deps]
+            for name in ready:
+                del remaining[name]
+                running[self._pool.submit(self._call, name, results, t0)] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                for deps in remaining.values():
+                    deps.discard(name)
+                if on_stage is not None:
+                    on_stage(name, results[name])
+
+        return results
+
+    def closure(self, targets: Iterable[str]) -> set:
+        """Names of every stage `run(targets)` would execute."""
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            if name not in self._stages:
+                raise ValueError(f"Unknown stage '{name}'")
+            needed.add(name)
+            stack.extend(self._stages[name][1])
+        return needed
+
+    # ── Internals ────────────────────────────────────────────────────────────
+    def _call(self, name: str, results: Dict[str, Any], t0: float) -> Any:
+        fn, deps = self._stages[name]
+        start = time.perf_counter()
+        try:
+            with memory.track(name):
+                return fn(**{dep: results[dep] for dep in deps})
+        except Exception:
+            metrics.stage_error(name)
+            raise
+        finally:
+            end = time.perf_counter()
+            self.timings[name] = {
+                "start_ms": round(1000 * (start - t0), 2),
+                "end_ms":   round(1000 * (end - t0), 2),
+            }
+            metrics.STAGE_SECONDS.observe(end - start, stage=name)
+
+    @property
+    def stages(self) -> List[str]:
+        return list(self._stages)
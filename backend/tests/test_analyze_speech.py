@@ -0,0 +1,89 @@
+import traceback
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from inference import InferenceExecutor
+from models import metrics
+from models.speech import SAMPLE_RATE, SEGMENT_GAP_SEC, pcm16, pcm_stream, wav_stream_header
+from pipeline import compose_segments
+from routers import analyze
+
+HAZARD = "Warning: car detected nearby."
+DEPTH = {"zones": {z: {"label": "Clear"} for z in ("left", "center", "right")}}
+SENTENCE_PCM = pcm16(np.full(160, 0.1, dtype=np.float32))
+GAP_PCM = pcm16(np.zeros(int(SEGMENT_GAP_SEC * SAMPLE_RATE), dtype=np.float32))
+
+
+class _TTS:
+    """TTSModel stand-in: the real sentence stream over a stubbed vocoder."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.spoken = []
+
+    def waveform(self, sentence):
+        if self.fail_on and sentence.startswith(self.fail_on):
+            raise RuntimeError("vocoder exploded")
+        self.spoken.append(sentence)
+        return np.full(160, 0.1, dtype=np.float32)
+
+    def stream(self, sentences):
+        return pcm_stream(sentences, self.waveform)
+
+
+class _Models:
+    def __init__(self, tts):
+        self.tts = tts
+        self.executor = InferenceExecutor(workers=1, max_queue=4)
+
+    def ready(self, name):
+        return True
+
+
+def _client(monkeypatch, tts) -> TestClient:
+    answer = compose_segments("depth", "", [], ["car"], DEPTH, False)
+    monkeypatch.setattr(analyze, "run_pipeline", lambda **kwargs: SimpleNamespace(answer=answer))
+    app = FastAPI()
+    app.include_router(analyze.router, prefix="/analyze")
+    app.state.models = _Models(tts)
+    return TestClient(app)
+
+
+def _post(client: TestClient):
+    return client.post("/analyze/speech", files={"image": ("scene.jpg", bytes(200), "image/jpeg")})
+
+
+def test_speech_streams_every_sentence_hazard_first(monkeypatch):
+    tts = _TTS()
+    response = _post(_client(monkeypatch, tts))
+    assert response.status_code == 200
+    assert tts.spoken[0] == HAZARD and len(tts.spoken) == 5
+    assert response.content == wav_stream_header() + SENTENCE_PCM + (GAP_PCM + SENTENCE_PCM) * 4
+
+
+@pytest.mark.parametrize("fail_on", [HAZARD, "Right:"])
+def test_speech_failure_aborts_stream_and_is_counted(monkeypatch, fail_on):
+    before = metrics.STAGE_ERRORS.value(stage="tts")
+    # The error escapes the response (possibly wrapped in an exception group):
+    # the chunked transfer is aborted, not ended cleanly without the sentence
+    with pytest.raises(Exception) as info:
+        _post(_client(monkeypatch, _TTS(fail_on=fail_on)))
+    assert "failed mid-stream" in "".join(traceback.format_exception(info.value))
+    assert metrics.STAGE_ERRORS.value(stage="tts") == before + 1
+
+
+def test_tts_model_stream_raises_on_a_failed_sentence():
+    for module in ("torch", "transformers", "soundfile", "datasets"):
+        pytest.importorskip(module)
+    from models.tts import TTSModel
+
+    model = object.__new__(TTSModel)        # Streaming only: no weights
+    model.waveform = _TTS(fail_on="Stop").waveform
+    chunks = model.stream(["Car ahead.", "Stop now."])
+    assert next(chunks) == SENTENCE_PCM
+    with pytest.raises(RuntimeError, match="vocoder exploded"):
+        next(chunks)
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from inference import InferenceExecutor
+from pipeline import PipelineResult, compose_segments
+from routers import analyze
+
+OBJECTS = [{"label": "car", "confidence": 0.9, "box": [0, 0, 10, 10]}]
+DEPTH = {"zones": {z: {"label": "Clear"} for z in ("left", "center", "right")}, "safe_to_walk": True}
+STAGES = {
+    "decode":  None,
+    "detect":  OBJECTS,
+    "caption": "a street",
+    "hazards": ["car"],
+    "depth":   DEPTH,
+    "safe":    False,
+    "compose": compose_segments("full", "a street", OBJECTS, ["car"], DEPTH, False),
+}
+
+
+class _Models:
+    def __init__(self):
+        self.executor = InferenceExecutor(workers=1, max_queue=4)
+
+    def ready(self, name):
+        return True
+
+
+def _events(monkeypatch, order):
+    """POST /analyze/stream with the pipeline finishing its stages in `order`."""
+    def run_pipeline(on_stage, **kwargs):
+        for name in order:
+            on_stage(name, STAGES[name])
+        return PipelineResult(
+            query="", description="a street", objects=OBJECTS, hazards=["car"], depth=DEPTH,
+            translated_text="", audio_b64="", language="en", safe_to_walk=False,
+        )
+
+    monkeypatch.setattr(analyze, "run_pipeline", run_pipeline)
+    app = FastAPI()
+    app.include_router(analyze.router, prefix="/analyze")
+    app.state.models = _Models()
+    response = TestClient(app).post(
+        "/analyze/stream",
+        files={"image": ("scene.jpg", bytes(200), "image/jpeg")},
+        data={"audio": "none"},
+    )
+    assert response.status_code == 200
+    blocks = [b for b in response.text.split("\n\n") if b]
+    return [(b.split("\n")[0][len("event: "):], json.loads(b.split("\n")[1][len("data: "):])) for b in blocks]
+
+
+@pytest.mark.parametrize("order", [
+    ["decode", "detect", "caption", "hazards", "depth", "safe", "compose"],
+    ["decode", "caption", "detect", "depth", "hazards", "safe", "compose"],
+    ["decode", "depth", "detect", "hazards", "safe", "caption", "compose"],
+])
+def test_hazard_verdict_precedes_objects_and_caption(monkeypatch, order):
+    names = [event for event, _ in _events(monkeypatch, order)]
+    assert names.index("safe_to_walk") < names.index("objects")
+    assert names.index("safe_to_walk") < names.index("description")
+    assert names.index("hazards") < names.index("safe_to_walk")
+    assert names[-2:] == ["result", "done"]
+
+
+def test_every_stage_is_emitted_once(monkeypatch):
+    events = dict(_events(monkeypatch, list(STAGES)))
+    assert events["hazards"] == {"hazards": ["car"]}
+    assert events["objects"] == {"objects": OBJECTS}
+    assert events["safe_to_walk"] == {"safe_to_walk": False}
+    assert events["answer"]["text"].startswith("A street. I can see: car.")
+    assert events["result"]["hazards"] == ["car"] and events["result"]["audio_url"] is None
+
+
+def test_gated_events_are_flushed_when_the_gate_never_runs(monkeypatch):
+    names = [event for event, _ in _events(monkeypatch, ["decode", "detect", "caption"])]
+    assert names == ["objects", "description", "result", "done"]
@@ -0,0 +1,143 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from audio_store import AudioStore
+from inference import InferenceExecutor
+from pipeline import PipelineResult, compose_segments
+from routers import analyze, audio
+from routers.audio import _parse_range
+
+WAV = bytes(range(256)) * 4   # 1024 bytes
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=0-0", (0, 0)),
+    ("bytes=1000-", (1000, 1023)),
+    ("bytes=1000-5000", (1000, 1023)),    # End clamped to the last byte
+    ("bytes=-24", (1000, 1023)),          # Suffix: the last 24 bytes
+    ("bytes=-5000", (0, 1023)),
+    (" bytes=10-20 ", (10, 20)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert _parse_range(header, len(WAV)) == expected
+
+
+@pytest.mark.parametrize("header", [
+    "bytes=1024-", "bytes=2000-3000", "bytes=20-10", "bytes=-0", "bytes=-",
+    "bytes=0-1,5-6", "items=0-10", "bytes=a-b",
+])
+def test_unsatisfiable_or_unsupported_ranges(header):
+    assert _parse_range(header, len(WAV)) is None
+
+
+class _TTS:
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize_wav(self, text):
+        self.calls += 1
+        return WAV
+
+
+class _Models:
+    def __init__(self):
+        self.tts = _TTS()
+        self.executor = InferenceExecutor(workers=1, max_queue=2)
+
+    def ready(self, name):
+        return True
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.include_router(audio.router, prefix="/audio")
+    app.include_router(analyze.router, prefix="/analyze")
+    app.state.models = _Models()
+    app.state.audio = AudioStore(ttl=0.2, directory="")
+    yield app
+    app.state.models.executor.shutdown()
+
+
+def test_deferred_clip_is_rendered_once_and_served_whole(app):
+    client = TestClient(app)
+    audio_id = app.state.audio.add(["Path is clear."])
+    for _ in range(2):
+        response = client.get(f"/audio/{audio_id}")
+        assert response.status_code == 200 and response.content == WAV
+        assert response.headers["accept-ranges"] == "bytes"
+    assert app.state.models.tts.calls == 1
+
+
+def test_range_request_returns_partial_content(app):
+    client = TestClient(app)
+    audio_id = app.state.audio.add(["Path is clear."])
+    response = client.get(f"/audio/{audio_id}", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == WAV[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(WAV)}"
+
+
+def test_unsatisfiable_range_is_416(app):
+    client = TestClient(app)
+    audio_id = app.state.audio.add(["Path is clear."])
+    response = client.get(f"/audio/{audio_id}", headers={"Range": "bytes=5000-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(WAV)}"
+
+
+def test_expired_handle_is_404(app):
+    client = TestClient(app)
+    audio_id = app.state.audio.add(["Path is clear."])
+    time.sleep(0.3)
+    assert client.get(f"/audio/{audio_id}").status_code == 404
+    assert client.get("/audio/unknown").status_code == 404
+
+
+def _analyze(app, monkeypatch, mode):
+    answer = compose_segments("depth", "", [], ["car"], {}, False)
+    result = PipelineResult(
+        query="", description="", objects=[], hazards=["car"], depth={}, translated_text="",
+        audio_b64="", language="en", safe_to_walk=False, answer=answer,
+    )
+    monkeypatch.setattr(analyze, "run_pipeline", lambda **kwargs: result)
+    response = TestClient(app).post(
+        "/analyze", files={"image": ("scene.jpg", bytes(200), "image/jpeg")}, data={"audio": mode},
+    )
+    assert response.status_code == 200 and response.json()["audio_b64"] == ""
+    return response.json()["audio_url"]
+
+
+def test_background_render_then_range_fetch(app, monkeypatch):
+    audio_url = _analyze(app, monkeypatch, "background")
+    clip = app.state.audio.get(audio_url.rsplit("/", 1)[1])
+    assert clip.sentences[0].startswith("Warning: car")
+    deadline = time.monotonic() + 2
+    while clip.wav is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert clip.wav == WAV                                # Rendered before anyone asked
+
+    response = TestClient(app).get(audio_url, headers={"Range": "bytes=-24"})
+    assert response.status_code == 206 and response.content == WAV[-24:]
+    assert app.state.models.tts.calls == 1
+
+
+def test_lazy_clip_is_rendered_on_first_fetch(app, monkeypatch):
+    audio_url = _analyze(app, monkeypatch, "lazy")
+    time.sleep(0.05)
+    assert app.state.models.tts.calls == 0
+    assert TestClient(app).get(audio_url).content == WAV
+    assert app.state.models.tts.calls == 1
+
+
+
+def test_handle_resolves_in_another_process_sharing_the_directory(tmp_path):
+    first, second = AudioStore(ttl=60, directory=str(tmp_path)), AudioStore(ttl=60, directory=str(tmp_path))
+    audio_id = first.add(["Stop."])
+    first.get(audio_id).render(_TTS())
+    clip = second.get(audio_id)
+    assert clip.sentences == ["Stop."] and clip.wav == WAV
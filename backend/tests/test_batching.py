@@ -0,0 +1,85 @@
+import gc
+import multiprocessing
+import threading
+import weakref
+
+import numpy as np
+
+from models.batching import MicroBatcher
+
+
+class _Wrapper:
+    """Stands in for a model wrapper: weights plus a batcher bound to its own method."""
+
+    def __init__(self):
+        self.weights = np.zeros(1024 * 1024, dtype=np.float32)
+        self.batcher = MicroBatcher("fake", self.run_batch, max_batch=4, window_ms=20)
+
+    def run_batch(self, items):
+        return [item * 2 for item in items]
+
+
+def test_concurrent_requests_share_a_batch():
+    batcher = MicroBatcher("double", lambda items: [i * 2 for i in items], max_batch=4, window_ms=200)
+    results = {}
+    threads = [threading.Thread(target=lambda i=i: results.update({i: batcher.submit(i)})) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {i: i * 2 for i in range(4)}
+    assert batcher.stats()["batches"] < 4
+    batcher.close()
+
+
+def test_errors_reach_every_caller():
+    def fail(items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher("fail", fail, max_batch=2, window_ms=1)
+    try:
+        batcher.submit(1)
+    except RuntimeError as e:
+        assert str(e) == "boom"
+    else:
+        raise AssertionError("expected the batch error")
+    batcher.close()
+
+
+def test_close_stops_worker_and_frees_wrapper():
+    wrapper = _Wrapper()
+    assert wrapper.batcher.submit(3) == 6
+    worker = wrapper.batcher._worker
+    assert worker is not None and worker.is_alive()
+
+    ref = weakref.ref(wrapper)
+    wrapper.batcher.close()
+    assert not worker.is_alive()
+    del wrapper
+    gc.collect()
+    assert ref() is None
+
+
+def test_submit_after_close_runs_inline():
+    wrapper = _Wrapper()
+    wrapper.batcher.close()
+    assert wrapper.batcher.submit(5) == 10
+    assert wrapper.batcher._worker is None
+
+
+def _submit_in_child(batcher, results):
+    results.put(batcher.submit(21))
+
+
+def test_batcher_built_before_a_fork_works_in_the_child():
+    # gunicorn preload: the master has used the batcher, then forks a worker
+    batcher = MicroBatcher("double", lambda items: [i * 2 for i in items], max_batch=4, window_ms=5)
+    assert batcher.submit(1) == 2
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    child = context.Process(target=_submit_in_child, args=(batcher, results))
+    child.start()
+    assert results.get(timeout=10) == 42
+    child.join(10)
+    assert child.exitcode == 0
+    assert batcher.submit(2) == 4                   # The parent's worker is untouched
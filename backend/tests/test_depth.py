@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from models.zones import band_names, group_percentile, parse_grid, reduce_depth
+
+
+def _zones(depth: np.ndarray, grid: str = "3x3") -> dict:
+    return reduce_depth(depth, parse_grid(grid))
+
+
+@pytest.mark.parametrize("shape", [(1,), (7,), (3, 128), (2, 3, 1000)])
+@pytest.mark.parametrize("q", [0, 10, 50, 90, 100])
+def test_group_percentile_matches_numpy(shape, q):
+    groups = np.random.default_rng(0).random(shape).astype(np.float32)
+    expected = np.percentile(groups, q, axis=-1)
+    assert np.allclose(group_percentile(groups, q), expected, rtol=1e-6, atol=1e-6)
+
+
+def test_parse_grid():
+    assert parse_grid("3x3") == (3, 3)
+    assert parse_grid("2X5") == (2, 5)
+    for text in ("0x3", "3", "axb"):
+        with pytest.raises(ValueError):
+            parse_grid(text)
+
+
+def test_band_names():
+    assert band_names(3) == ("head", "body", "ground")
+    assert band_names(4) == ("row0", "row1", "row2", "row3")
+
+
+def test_zones_match_per_zone_percentile():
+    rng = np.random.default_rng(1)
+    for width in (128, 129, 130, 96):
+        depth = (rng.random((96, width)) * rng.random() * 10).astype(np.float32)
+        result = _zones(depth)
+        norm = (depth - depth.min()) / (depth.max() - depth.min()) * 100
+        third = depth.shape[1] // 3
+        for name, part in zip(("left", "center", "right"),
+                              (norm[:, :third], norm[:, third:2 * third], norm[:, 2 * third:])):
+            assert result["zones"][name]["percent"] == pytest.approx(round(float(np.percentile(part, 90)), 1), abs=0.11)
+
+
+def test_right_zone_keeps_the_remainder_columns():
+    depth = np.zeros((96, 130), dtype=np.float32)   # 130 = 3 × 43 + 1
+    depth[:, 125:] = 10.0                          # 5 of the right zone's 44 columns, >10 %
+    result = _zones(depth)
+    assert result["zones"]["right"]["label"] == "Very Close"
+    assert result["zones"]["right"]["percent"] == pytest.approx(
+        round(float(np.percentile(depth[:, 86:] * 10, 90)), 1), abs=0.11)
+    assert result["zones"]["center"]["label"] == "Clear"
+
+
+def test_head_height_obstacle_shows_in_bands_and_grid():
+    depth = np.zeros((96, 96), dtype=np.float32)
+    depth[:32, 32:64] = 10.0                       # Close thing at head height, center
+    result = _zones(depth)
+    assert result["bands"]["head"]["label"] == "Very Close"
+    assert result["bands"]["ground"]["label"] == "Clear"
+    assert [cell["label"] for cell in result["grid"][0]] == ["Clear", "Very Close", "Clear"]
+    assert not result["safe_to_walk"]
+
+
+def test_flat_map_is_clear():
+    result = _zones(np.ones((64, 64), dtype=np.float32), "2x4")
+    assert all(z["label"] == "Clear" for z in result["zones"].values())
+    assert list(result["bands"]) == ["upper", "lower"]
+    assert len(result["grid"]) == 2 and len(result["grid"][0]) == 4
+    assert result["safe_to_walk"]
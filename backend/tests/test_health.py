@@ -0,0 +1,58 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import health
+
+
+def _off_event_loop():
+    """In process mode model stats are blocking worker calls."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    raise AssertionError("model stats read on the event loop")
+
+
+class _Residency:
+    def stats(self):
+        _off_event_loop()
+        return {"models": {}}
+
+
+class _Audio:
+    def stats(self):
+        return {"entries": 0}
+
+
+class _Models:
+    loaded = True
+    load_times = {}
+    load_errors = {}
+    precision = {}
+    backend = {}
+    executor = None
+    workers = None
+    residency = _Residency()
+
+    def status(self):
+        _off_event_loop()
+        return {"depth": "ready"}
+
+    def ready(self, name):
+        return name == "depth"
+
+    def resident(self, name):
+        _off_event_loop()
+        return None
+
+
+def test_health_reads_model_stats_off_the_event_loop():
+    app = FastAPI()
+    app.include_router(health.router)
+    app.state.models = _Models()
+    app.state.audio = _Audio()
+    body = TestClient(app).get("/health").json()
+    assert body["services"]["depth"] and not body["services"]["tts"]
+    assert body["models"] == {"depth": "ready"} and body["translation_cache"] is None
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+import pytest
+
+from inference import ExecutorSaturated, InferenceExecutor
+
+
+def test_admits_workers_plus_queue_then_rejects():
+    executor = InferenceExecutor(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = executor.submit(release.wait)
+        queued = executor.submit(lambda: "queued")
+        with pytest.raises(ExecutorSaturated):
+            executor.submit(lambda: "rejected")
+        release.set()
+        return await running, await queued
+
+    try:
+        assert asyncio.run(scenario()) == (True, "queued")
+        stats = executor.stats()
+        assert stats["rejected"] == 1 and stats["completed"] == 2 and stats["queued"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_slot_is_released_when_a_job_fails():
+    executor = InferenceExecutor(workers=1, max_queue=0)
+
+    def fail():
+        raise ValueError("model error")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+        return await executor.run(lambda: "next")
+
+    try:
+        assert asyncio.run(scenario()) == "next"
+        assert executor.stats()["failed"] == 1
+    finally:
+        executor.shutdown()
@@ -0,0 +1,117 @@
+import io
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from models import metrics
+from routers import live as live_router
+from live import LiveSession
+
+
+def _jpeg(seed: int = 0) -> bytes:
+    pixels = np.random.default_rng(seed).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class _Detector:
+    def __init__(self):
+        self.fail = 0          # Calls left that raise
+
+    def detect(self, frame, use_cache=True):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("DETR exploded")
+        return [{"label": "car", "confidence": 0.9, "box": [10, 10, 60, 50]}]
+
+    def hazardous_objects(self, detections):
+        return [d["label"] for d in detections if d["label"] == "car"]
+
+    def approaching_hazards(self, detections):
+        return [d["label"] for d in detections if d.get("approaching")]
+
+
+class _Depth:
+    def analyze(self, frame, use_cache=True):
+        zone = {"label": "Clear", "warning": "✅ Path appears clear", "percent": 5.0}
+        return {"zones": {"left": zone, "center": zone, "right": zone}, "safe_to_walk": True}
+
+
+class _Executor:
+    async def run(self, fn, *args):
+        return fn(*args)
+
+
+class _Models:
+    """ModelStore stand-in: the translator is still loading."""
+    translator = None
+
+    def __init__(self):
+        self.detector = _Detector()
+        self.depth = _Depth()
+        self.executor = _Executor()
+
+    def ready(self, name):
+        return name in ("detector", "depth")
+
+    def missing(self, names):
+        return [n for n in names if not self.ready(n)]
+
+    def input_min_side(self, names):
+        return 384
+
+
+def test_non_english_session_falls_back_to_english_while_translator_loads():
+    before = metrics.FALLBACKS_TOTAL.value(kind="translation_english")
+    update = LiveSession(_Models(), language="hi").process(_jpeg())
+    assert update["hazards"] == ["car"]
+    assert "car" in update["translated_text"].lower()
+    assert metrics.FALLBACKS_TOTAL.value(kind="translation_english") == before + 1
+
+
+class _CameraMoving:
+    """Every frame is a scene change, none a hard cut."""
+    jump = 15
+    hard_cut = False
+
+    def changed(self, frame):
+        return True
+
+
+class _Approaching(_Detector):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def detect(self, frame, use_cache=True):
+        grow = 20 * self.calls
+        self.calls += 1
+        return [{"label": "car", "confidence": 0.9, "box": [100 - grow, 100 - grow, 200 + grow, 200 + grow]}]
+
+
+def test_approaching_hazard_survives_scene_changes():
+    models = _Models()
+    models.detector = _Approaching()
+    session = LiveSession(models)
+    session.scene = _CameraMoving()
+    updates = [session.process(_jpeg(i)) for i in range(5)]
+    approaching = [u for u in updates if u is not None and u["approaching"]]
+    assert approaching and approaching[-1]["approaching"] == ["car"]
+    assert len({o["track_id"] for o in session.objects}) == 1
+
+
+def test_frame_error_is_reported_and_session_continues():
+    app = FastAPI()
+    app.include_router(live_router.router)
+    app.state.models = _Models()
+    app.state.models.detector.fail = 1
+
+    with TestClient(app).websocket_connect("/live") as ws:
+        ws.send_bytes(_jpeg(0))
+        error = ws.receive_json()
+        assert error["type"] == "error" and "DETR exploded" in error["detail"]
+        ws.send_bytes(_jpeg(1))
+        assert ws.receive_json()["type"] == "update"
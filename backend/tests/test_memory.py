@@ -0,0 +1,51 @@
+import os
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from models import memory
+
+
+needs_proc = pytest.mark.skipif(
+    memory.MEMORY_TRACE == "off" or not memory.reset_peak_rss() or not memory.rss_bytes(),
+    reason="needs MEMORY_TRACE on and a resettable /proc high-water mark",
+)
+
+
+@needs_proc
+def test_stage_peak_sees_memory_freed_inside_the_stage():
+    with memory.track("test_temporary"):
+        scratch = np.ones(64 * 1024 * 1024, dtype=np.uint8)   # 64 MiB, touched
+        del scratch
+    stats = memory.stage_stats()["test_temporary"]
+    assert stats["rss_peak_last_bytes"] >= 48 * 1024 * 1024
+    assert stats["rss_net_bytes"] < stats["rss_peak_last_bytes"]
+
+
+@needs_proc
+def test_lifetime_peak_survives_resets():
+    with memory.track("test_lifetime"):
+        scratch = np.ones(64 * 1024 * 1024, dtype=np.uint8)
+        peak = memory.peak_rss_bytes()
+        del scratch
+    memory.reset_peak_rss()
+    assert memory.peak_rss_bytes() >= peak
+
+
+def test_snapshots_are_pruned_to_the_newest(tmp_path):
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        for i in range(5):
+            old = tmp_path / f"memory-1-2026010{i}-000000.snap"
+            old.write_bytes(b"")
+            os.utime(old, (1000 + i, 1000 + i))
+        path = memory.snapshot(str(tmp_path), keep=3)
+    finally:
+        if started:
+            tracemalloc.stop()
+    kept = sorted(p.name for p in tmp_path.iterdir())
+    assert len(kept) == 3 and os.path.basename(path) in kept
+    assert "memory-1-20260104-000000.snap" in kept and "memory-1-20260101-000000.snap" not in kept
@@ -0,0 +1,86 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from models import metrics
+from routers import metrics as metrics_router
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_seconds", "Test latency.", ["stage"], buckets=(0.1, 1.0))
+    try:
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value, stage='say "hi"')
+        assert histogram.render() == [
+            "# HELP test_seconds Test latency.",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 1',
+            'test_seconds_bucket{stage="say \\"hi\\"",le="1.0"} 3',
+            'test_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 4',
+            'test_seconds_sum{stage="say \\"hi\\""} 4.05',
+            'test_seconds_count{stage="say \\"hi\\""} 4',
+        ]
+    finally:
+        metrics._REGISTRY.remove(histogram)
+
+
+def test_counter_rejects_wrong_labels():
+    counter = metrics.Counter("test_total", "Test events.", ["kind"])
+    try:
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        assert counter.render()[-1] == 'test_total{kind="a"} 3'
+        with pytest.raises(ValueError):
+            counter.inc(stage="a")
+    finally:
+        metrics._REGISTRY.remove(counter)
+
+
+class _Executor:
+    def stats(self):
+        return {"running": 2, "queued": 5, "rejected": 1}
+
+
+class _Residency:
+    def resident_bytes(self):
+        return 1024
+
+
+class _Models:
+    executor = _Executor()
+    residency = _Residency()
+
+    def status(self):
+        return {"depth": "ready", "tts": "loading"}
+
+    def ready(self, name):
+        return name == "depth"
+
+    def memory_stats(self):
+        return {"models_bytes": {"depth": 1000, "translator:hi": 24}, "translator": {}}
+
+
+def test_metrics_endpoint_renders_recorded_and_sampled_series():
+    app = FastAPI()
+    app.include_router(metrics_router.router)
+    app.state.models = _Models()
+    metrics.STAGE_SECONDS.observe(0.02, stage="test_depth")
+
+    response = TestClient(app).get("/metrics")
+    assert response.headers["content-type"] == metrics_router.CONTENT_TYPE
+    lines = response.text.splitlines()
+    assert response.text.endswith("\n")
+    for line in (
+        "# TYPE accessworld_stage_seconds histogram",
+        'accessworld_stage_seconds_bucket{stage="test_depth",le="0.025"} 1',
+        'accessworld_inference_jobs{state="running"} 2',
+        'accessworld_inference_jobs{state="queued"} 5',
+        "# TYPE accessworld_inference_rejected_total counter",
+        "accessworld_inference_rejected_total 1",
+        'accessworld_model_ready{model="depth"} 1',
+        'accessworld_model_ready{model="tts"} 0',
+        "accessworld_model_resident_bytes 1024",
+        'accessworld_model_bytes{model="translator:hi"} 24',
+    ):
+        assert line in lines
+    assert any(line.startswith("accessworld_process_resident_bytes ") for line in lines)
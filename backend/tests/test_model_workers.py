@@ -0,0 +1,105 @@
+import gc
+import io
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from model_workers import SHM_MIN_BYTES, WorkerPool, WorkerTimeout, _Host, _pack_arg, _Segments
+from models.frame import PreparedFrame
+
+
+def _jpeg(seed: int = 0) -> bytes:
+    pixels = np.random.default_rng(seed).integers(0, 255, (300, 400, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_frame_is_written_once_for_all_calls():
+    segments = _Segments()
+    try:
+        frame = PreparedFrame.from_bytes(_jpeg())
+        packed = [_pack_arg(frame, segments, []) for _ in range(3)]      # detector, depth, captioner
+        assert len({p[1][0] for p in packed}) == 1
+        assert len(segments._all) == 1
+
+        twin = PreparedFrame.from_bytes(_jpeg())                         # Same upload, decoded again
+        assert _pack_arg(twin, segments, [])[1] == packed[0][1]
+        other = PreparedFrame.from_bytes(_jpeg(seed=1))
+        assert _pack_arg(other, segments, [])[1][0] != packed[0][1][0]
+    finally:
+        segments.close()
+
+
+def test_segment_is_reused_once_its_frames_are_gone():
+    segments = _Segments()
+    try:
+        frame = PreparedFrame.from_bytes(_jpeg())
+        name = _pack_arg(frame, segments, [])[1][0]
+        assert not segments._free
+        del frame
+        gc.collect()
+        assert [s.name for s in segments._free] == [name] and not segments._frames
+
+        later = PreparedFrame.from_bytes(_jpeg(seed=2))
+        assert _pack_arg(later, segments, [])[1][0] == name
+        assert len(segments._all) == 1
+    finally:
+        segments.close()
+
+
+def test_worker_calls_share_one_frame_and_its_preprocessing():
+    segments = _Segments()
+    host = _Host(conn=None, specs={}, concurrency=1)
+    try:
+        frame = PreparedFrame.from_bytes(_jpeg())
+        first = host.unpack(_pack_arg(frame, segments, []))
+        second = host.unpack(_pack_arg(frame, segments, []))
+        assert first is second
+        assert np.array_equal(np.asarray(first.image), np.asarray(frame.image))
+        calls = []
+        first.cached("dhash", lambda: calls.append(1))
+        second.cached("dhash", lambda: calls.append(1))
+        assert calls == [1]
+    finally:
+        for segment in host.segments.values():
+            segment.close()
+        host.pool.shutdown()
+        segments.close()
+
+
+class _Wedged:
+    """A ready worker process that never answers."""
+    alive = True
+
+    def __init__(self):
+        self.pending = {}
+        self.ready = threading.Event()
+        self.ready.set()
+
+    def send(self, message):
+        pass
+
+
+def test_timed_out_call_never_reuses_its_segments():
+    pool = WorkerPool("vision", {}, processes=0, threads=1, timeout=0.1)
+    pool._processes = [_Wedged()]
+    try:
+        frame = PreparedFrame.from_bytes(_jpeg())
+        audio = bytes(SHM_MIN_BYTES)
+        with pytest.raises(WorkerTimeout):
+            pool.call("depth", "analyze", args=(frame, audio))
+        assert not pool.segments._free and not pool.segments._frames
+        assert len(pool.segments._all) == 1                     # The frame, still named for its PreparedFrame
+        name = pool.segments._all[0].name
+
+        del frame
+        gc.collect()
+        assert not pool.segments._all and not pool.segments._free
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+    finally:
+        pool.segments.close()
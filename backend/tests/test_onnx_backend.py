@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from models import metrics, onnx_backend
+from models.onnx_backend import BACKEND_MODELS, OnnxModule, backend_profile, load_seq2seq
+
+
+def test_env_and_explicit_overrides(monkeypatch):
+    monkeypatch.setattr(onnx_backend, "DEFAULT_BACKEND", "torch")
+    for name in BACKEND_MODELS:
+        monkeypatch.delenv(f"BACKEND_{name.upper()}", raising=False)
+    monkeypatch.setenv("BACKEND_DEPTH", "onnx")
+    profile = backend_profile({"detector": "onnx"})
+    assert profile == {**{name: "torch" for name in BACKEND_MODELS}, "depth": "onnx", "detector": "onnx"}
+
+
+@pytest.mark.parametrize("overrides", [{"whisper": "onnx"}, {"depth": "tensorrt"}])
+def test_unknown_model_or_backend_is_rejected(overrides):
+    with pytest.raises(ValueError):
+        backend_profile(overrides)
+
+
+def test_missing_graphs_fall_back_to_pytorch(monkeypatch, tmp_path):
+    monkeypatch.setattr(onnx_backend, "ONNX_DIR", str(tmp_path))
+    before = metrics.FALLBACKS_TOTAL.value(kind="onnx_to_pytorch")
+    assert OnnxModule.load("depth") is None
+    assert load_seq2seq("es") is None
+    assert metrics.FALLBACKS_TOTAL.value(kind="onnx_to_pytorch") == before + 2
+
+
+class _Node:
+    def __init__(self, name):
+        self.name = name
+
+
+class _Session:
+    """ONNX Runtime session stand-in: doubles its one input."""
+
+    def get_inputs(self):
+        return [_Node("pixel_values")]
+
+    def get_outputs(self):
+        return [_Node("predicted_depth")]
+
+    def run(self, names, feeds):
+        assert names == ["predicted_depth"] and isinstance(feeds["pixel_values"], np.ndarray)
+        return [feeds["pixel_values"] * 2]
+
+
+def test_module_maps_tensors_to_named_outputs():
+    module = OnnxModule(_Session())
+    out = module(pixel_values=torch.ones(1, 3, 4, 4), ignored=torch.zeros(1))
+    assert list(out) == ["predicted_depth"]
+    assert torch.equal(out["predicted_depth"], torch.full((1, 3, 4, 4), 2.0))
@@ -0,0 +1,92 @@
+import pytest
+
+from models import metrics
+from models.phrasebook import CURATED_PHRASES, Phrasebook, TEMPLATE_PHRASES, build
+from models.translator import TranslatorModel
+from pipeline import compose_segments, localize_answer
+
+# What MarianMT makes of bare fragments: the wrong sense for the safety words
+WRONG_SENSE = {"Close": "Cerrado", "Right": "Correcto", "Clear": "Claro"}
+DEPTH = {"zones": {"left": {"label": "Clear"}, "center": {"label": "Close"}, "right": {"label": "Very Close"}}}
+
+
+@pytest.fixture
+def translator():
+    """A real TranslatorModel whose MarianMT is a word-for-word stand-in."""
+    model = TranslatorModel()
+    model.phrasebook = Phrasebook()
+    model.generated = []
+
+    def generate(sentences, lang):
+        model.generated.extend(sentences)
+        return [WRONG_SENSE.get(s, f"<{s}>") for s in sentences]
+
+    model._generate = generate
+    return model
+
+
+def test_phrasebook_lookup():
+    book = Phrasebook({"es": {"car": "coche"}})
+    assert book.lookup("es", "car") == "coche"
+    assert book.lookup("es", "person") is None
+    assert book.lookup("fr", "car") is None
+    assert book.lookup("en", "car") == "car"
+
+
+def test_phrasebook_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / "table" / "phrases.json.gz")
+    Phrasebook({"hi": {"car": "कार"}, "es": {"car": "coche"}}).save(path)
+    book = Phrasebook.load(path)
+    assert book.languages == ["es", "hi"]
+    assert book.lookup("hi", "car") == "कार"
+
+
+def test_curated_words_override_a_table_on_disk(tmp_path):
+    path = str(tmp_path / "phrases.json.gz")
+    Phrasebook({"es": {"Close": "Cerrado", "car": "coche"}}).save(path)
+    book = Phrasebook.load(path)
+    assert book.lookup("es", "Close") == "Cerca"
+    assert book.lookup("es", "car") == "coche"
+
+
+def test_missing_phrase_table_is_empty(tmp_path):
+    book = Phrasebook.load(str(tmp_path / "absent.json.gz"))
+    assert book.languages == [] and book.lookup("es", "car") is None
+
+
+def test_curated_phrases_cover_every_language_and_safety_word():
+    words = {"Left", "Center", "Right", "Very Close", "Close", "Medium", "Clear", "Unknown"}
+    for lang in ("hi", "fr", "es", "de", "zh"):
+        assert set(CURATED_PHRASES[lang]) == words
+
+
+def test_build_never_machine_translates_curated_words(translator):
+    book = build(translator, ["es"], [*TEMPLATE_PHRASES, "Very Close", "Close", "Medium", "Clear", "car"])
+    assert not set(translator.generated) & set(CURATED_PHRASES["es"])
+    assert "car" in translator.generated
+    assert book.lookup("es", "Right") == "Derecha" and book.lookup("es", "Close") == "Cerca"
+
+
+def test_depth_answer_is_rendered_from_the_phrase_table(translator):
+    translator.phrasebook = build(translator, ["es"], [*TEMPLATE_PHRASES, "Very Close", "Close", "Clear"])
+    translator.generated.clear()
+    segments = compose_segments("depth", "", [], [], DEPTH, False)
+
+    answer = localize_answer(segments, "es", translator)
+    assert answer.startswith("<Depth analysis> — Izquierda: Despejado. Centro: Cerca. Derecha: Muy cerca. ")
+    assert "Cerrado" not in answer and "Correcto" not in answer
+    assert translator.generated == []                       # Nothing left for MarianMT
+
+
+def test_phrase_table_miss_is_machine_translated(translator):
+    before = metrics.FALLBACKS_TOTAL.value(kind="phrase_table_miss")
+    segments = compose_segments("objects", "a street", [{"label": "car"}], [], {}, True)
+    answer = localize_answer(segments, "es", translator)
+    assert answer == "<A street.> <I can see: car.>"
+    assert metrics.FALLBACKS_TOTAL.value(kind="phrase_table_miss") == before + 1
+
+
+def test_answer_stays_english_without_a_translator():
+    segments = compose_segments("depth", "", [], [], DEPTH, False)
+    assert localize_answer(segments, "fr", None).startswith("Depth analysis — Left: Clear.")
+    assert localize_answer(segments, "en", None) == localize_answer(segments, "xx", None)
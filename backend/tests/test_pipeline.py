@@ -0,0 +1,103 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from models import metrics
+
+from pipeline import ModelsNotReady, build_graph, run_pipeline
+
+
+def _jpeg() -> bytes:
+    pixels = np.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class _Captioner:
+    def __init__(self):
+        self.calls = 0
+
+    def caption(self, frame):
+        self.calls += 1
+        return "a quiet street"
+
+
+class _Detector:
+    def detect(self, frame):
+        return [{"label": "car", "confidence": 0.9, "box": [0, 0, 10, 10]}]
+
+    def hazardous_objects(self, detections):
+        return [d["label"] for d in detections]
+
+
+class _Depth:
+    def analyze(self, frame):
+        zone = {"label": "Clear", "warning": "✅ Path appears clear", "percent": 5.0}
+        return {"zones": {"left": zone, "center": zone, "right": zone}, "safe_to_walk": True}
+
+
+class _TTS:
+    def synthesize(self, text):
+        return "audio:" + text
+
+
+class _Models:
+    """ModelStore stand-in; `loaded` are the models ready to serve."""
+    translator = None
+
+    def __init__(self, loaded=("captioner", "detector", "depth", "tts")):
+        self.loaded = set(loaded)
+        self.captioner, self.detector, self.depth, self.tts = _Captioner(), _Detector(), _Depth(), _TTS()
+
+    def ready(self, name):
+        return name in self.loaded
+
+    def missing(self, names):
+        return [n for n in names if not self.ready(n)]
+
+    def input_min_side(self, names):
+        return 384
+
+
+@pytest.mark.parametrize("intent, stages", [
+    ("full", {"caption", "detect", "hazards", "depth", "safe"}),
+    ("depth", {"detect", "hazards", "depth", "safe"}),
+    ("translate", {"caption", "detect", "hazards"}),
+])
+def test_compose_needs_only_the_intent_stages(intent, stages):
+    graph = build_graph(b"", _Models(), "en", intent)
+    assert graph.closure(["compose"]) == stages | {"decode", "compose"}
+
+
+def test_safety_query_skips_blip():
+    models = _Models()
+    result = run_pipeline(_jpeg(), models, query="Is it safe to walk forward?")
+    assert models.captioner.calls == 0
+    assert result.description == "" and result.hazards == ["car"]
+    assert result.audio_b64.startswith("audio:Warning: car")
+
+
+def test_requested_description_runs_blip():
+    result = run_pipeline(_jpeg(), _Models(), query="Is it safe to walk?", include=["description"])
+    assert result.description == "a quiet street"
+
+
+def test_safety_query_is_served_before_blip_loads():
+    result = run_pipeline(_jpeg(), _Models(loaded=("detector", "depth", "tts")), query="Is it safe?")
+    assert not result.safe_to_walk and result.depth["zones"]["center"]["label"] == "Clear"
+
+
+def test_missing_hazard_model_is_reported():
+    with pytest.raises(ModelsNotReady) as error:
+        run_pipeline(_jpeg(), _Models(loaded=("captioner", "tts")), query="describe")
+    assert error.value.missing == ["depth", "detector"]
+
+
+def test_non_english_answer_stays_english_while_marian_loads():
+    before = metrics.FALLBACKS_TOTAL.value(kind="translation_english")
+    result = run_pipeline(_jpeg(), _Models(), language="hi", query="Is it safe to walk?")
+    assert result.translated_text.startswith("Warning: car detected nearby.")
+    assert metrics.FALLBACKS_TOTAL.value(kind="translation_english") == before + 1
@@ -0,0 +1,51 @@
+import pytest
+
+from models import precision
+from models.precision import PRECISION_MODELS, precision_profile
+
+
+def test_default_profile_is_uniform(monkeypatch):
+    for name in PRECISION_MODELS:
+        monkeypatch.delenv(f"PRECISION_{name.upper()}", raising=False)
+    monkeypatch.setattr(precision, "DEFAULT_PRECISION", "bf16")
+    assert precision_profile() == {name: "bf16" for name in PRECISION_MODELS}
+
+
+def test_env_and_explicit_overrides(monkeypatch):
+    monkeypatch.setattr(precision, "DEFAULT_PRECISION", "fp32")
+    monkeypatch.setenv("PRECISION_TTS", "int8")
+    monkeypatch.setenv("PRECISION_TRANSLATOR", "int8")
+    profile = precision_profile({"translator": "bf16"})
+    assert profile["tts"] == "int8"
+    assert profile["translator"] == "bf16"             # Explicit beats PRECISION_<MODEL>
+    assert profile["depth"] == "fp32"
+
+
+@pytest.mark.parametrize("overrides", [{"whisper": "int8"}, {"depth": "fp16"}])
+def test_unknown_model_or_precision_is_rejected(overrides):
+    with pytest.raises(ValueError):
+        precision_profile(overrides)
+
+
+def test_fp32_leaves_the_model_alone():
+    model = object()
+    assert precision.prepare(model, "fp32") is model
+    with precision.autocast("fp32"):
+        pass
+
+
+def test_int8_quantizes_linear_layers_within_tolerance():
+    torch = pytest.importorskip("torch")
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(torch.nn.Linear(64, 64), torch.nn.ReLU(), torch.nn.Linear(64, 8)).eval()
+    inputs = torch.randn(16, 64)
+    quantized = precision.prepare(model, "int8")
+    assert not any(type(m) is torch.nn.Linear for m in quantized.modules())
+    with torch.no_grad():
+        assert torch.allclose(quantized(inputs), model(inputs), atol=0.05)
+
+
+def test_bf16_autocasts_matmuls():
+    torch = pytest.importorskip("torch")
+    with torch.no_grad(), precision.autocast("bf16"):
+        assert (torch.randn(4, 4) @ torch.randn(4, 4)).dtype == torch.bfloat16
@@ -0,0 +1,103 @@
+import gc
+import time
+import weakref
+
+import numpy as np
+
+from models.batching import MicroBatcher
+from residency import ResidencyManager, footprint
+
+
+class _Model:
+    def __init__(self, mb: int = 4):
+        self.weights = np.zeros(mb * 1024 * 1024 // 4, dtype=np.float32)
+        self.batcher = MicroBatcher("fake", self.run_batch, max_batch=4, window_ms=5)
+
+    def run_batch(self, items):
+        return list(items)
+
+
+def _manager(budget_mb: float) -> ResidencyManager:
+    return ResidencyManager(budget_bytes=int(budget_mb * 1024 * 1024), idle_sec=0)
+
+
+def _register(manager: ResidencyManager, name: str, **kwargs) -> None:
+    # Same unload ModelStore registers: stop the batcher thread holding the wrapper
+    manager.register(name, _Model, unload=lambda: manager.peek(name).batcher.close(), **kwargs)
+
+
+def test_evicted_batched_model_is_garbage_collected():
+    manager = _manager(6)
+    _register(manager, "captioner")
+    _register(manager, "tts")
+
+    captioner = manager.get("captioner")
+    assert captioner.batcher.submit("x") == "x"     # Starts the batcher thread
+    ref = weakref.ref(captioner)
+    del captioner
+    time.sleep(0.01)
+
+    manager.get("tts")                               # 8 MB > 6 MB budget: captioner goes
+    assert manager.peek("captioner") is None
+    gc.collect()
+    assert ref() is None
+
+
+def test_least_recently_used_is_evicted_first_and_pinned_never():
+    manager = _manager(10)
+    _register(manager, "detector", pinned=True)
+    _register(manager, "captioner")
+    _register(manager, "tts")
+
+    manager.get("detector")
+    manager.get("captioner")
+    time.sleep(0.01)
+    manager.get("tts")
+    assert manager.peek("detector") is not None
+    assert manager.peek("captioner") is None
+    assert manager.peek("tts") is not None
+    assert manager.stats()["models"]["captioner"]["evictions"] == 1
+
+
+def test_evicted_model_reloads_on_use():
+    manager = _manager(6)
+    _register(manager, "captioner")
+    _register(manager, "tts")
+    manager.get("captioner")
+    time.sleep(0.01)
+    manager.get("tts")
+    time.sleep(0.01)
+    assert manager.get("captioner").batcher.submit(1) == 1
+    assert manager.stats()["models"]["captioner"]["loads"] == 2
+
+
+class _Tensor:
+    def __init__(self, n):
+        self.n = n
+
+    def numel(self):
+        return self.n
+
+    def element_size(self):
+        return 4
+
+
+class _Module:
+    def state_dict(self):
+        return {"weight": _Tensor(100), "packed": (_Tensor(10), _Tensor(10))}
+
+
+class _Proxy:
+    """Like model_workers.ModelProxy: any attribute is a remote call."""
+    nbytes = 0
+
+    def __getattr__(self, name):
+        raise AssertionError(f"footprint probed {name} over IPC")
+
+
+def test_footprint_counts_weights_reachable_from_a_wrapper():
+    wrapper = _Model(mb=1)
+    wrapper.model = _Module()
+    wrapper.vocoder = [_Tensor(5)]
+    assert footprint(wrapper) == 1024 * 1024 + 4 * 125
+    assert footprint(_Proxy()) == 0
@@ -0,0 +1,106 @@
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from models.frame import PreparedFrame
+from models.result_cache import ResultCache
+from models.scene import frame_hash, hamming
+
+
+def _photo(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # Smooth gradients plus noise: a stable dHash that survives re-encoding
+    y, x = np.mgrid[0:240, 0:320]
+    base = np.stack([x * 0.8, y, (x + y) * 0.4], axis=-1) + rng.normal(0, 4, (240, 320, 3))
+    return np.clip(base, 0, 255).astype(np.uint8)
+
+
+def _jpeg(pixels: np.ndarray, quality: int = 90) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def _near_pair():
+    """Two different uploads of the same scene (re-encoded)."""
+    pixels = _photo()
+    a = PreparedFrame.from_bytes(_jpeg(pixels, 90))
+    b = PreparedFrame.from_bytes(_jpeg(pixels, 70))
+    assert a.digest != b.digest and hamming(frame_hash(a), frame_hash(b)) <= 4
+    return a, b
+
+
+def _fetch(cache: ResultCache, frame: PreparedFrame, value):
+    calls = []
+    result = cache.fetch(frame, lambda: calls.append(1) or value)
+    return result, bool(calls)
+
+
+def test_exact_hit_skips_compute():
+    cache = ResultCache("detector")
+    frame = PreparedFrame.from_bytes(_jpeg(_photo()))
+    assert _fetch(cache, frame, ["car"]) == (["car"], True)
+    again = PreparedFrame.from_bytes(_jpeg(_photo()))
+    assert _fetch(cache, again, ["person"]) == (["car"], False)
+
+
+def test_hazard_models_ignore_near_duplicates_by_default():
+    for name in ("detector", "depth"):
+        cache = ResultCache(name)
+        a, b = _near_pair()
+        _fetch(cache, a, {"safe_to_walk": True})
+        assert _fetch(cache, b, {"safe_to_walk": False}) == ({"safe_to_walk": False}, True)
+
+
+def test_captioner_matches_near_duplicates():
+    cache = ResultCache("captioner")
+    a, b = _near_pair()
+    _fetch(cache, a, "a doorway")
+    assert _fetch(cache, b, "a car") == ("a doorway", False)
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_opted_in_hazard_near_hits_expire_quickly():
+    cache = ResultCache("depth", max_distance=4, near_ttl=0.05)
+    a, b = _near_pair()
+    _fetch(cache, a, {"safe_to_walk": True})
+    time.sleep(0.1)
+    assert _fetch(cache, b, {"safe_to_walk": False}) == ({"safe_to_walk": False}, True)
+    # The exact entry is still within the TTL
+    assert _fetch(cache, a, None) == ({"safe_to_walk": True}, False)
+
+
+def test_entries_expire_after_ttl():
+    cache = ResultCache("detector", ttl=0.05)
+    frame = PreparedFrame.from_bytes(_jpeg(_photo()))
+    _fetch(cache, frame, ["car"])
+    time.sleep(0.1)
+    assert _fetch(cache, frame, ["person"]) == (["person"], True)
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = ResultCache("detector", max_entries=2)
+    frames = [PreparedFrame.from_bytes(_jpeg(_photo(seed))) for seed in range(3)]
+    _fetch(cache, frames[0], 0)
+    _fetch(cache, frames[1], 1)
+    _fetch(cache, frames[0], None)      # Refreshes 0, so 1 is least recently used
+    _fetch(cache, frames[2], 2)
+    assert cache.stats()["entries"] == 2
+    assert _fetch(cache, frames[0], None) == (0, False)
+    assert _fetch(cache, frames[1], "new") == ("new", True)
+
+
+def test_compute_errors_are_not_cached():
+    cache = ResultCache("detector")
+    frame = PreparedFrame.from_bytes(_jpeg(_photo()))
+
+    def fail():
+        raise RuntimeError("model error")
+
+    try:
+        cache.fetch(frame, fail)
+    except RuntimeError:
+        pass
+    assert _fetch(cache, frame, ["car"]) == (["car"], True)
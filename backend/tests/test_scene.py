@@ -0,0 +1,35 @@
+import numpy as np
+from PIL import Image
+
+from models.frame import PreparedFrame
+from models.scene import SceneChangeDetector
+
+
+def _frame(pixels: np.ndarray) -> PreparedFrame:
+    return PreparedFrame(Image.fromarray(pixels), (pixels.shape[1], pixels.shape[0]))
+
+
+def _gradient(shift: int = 0) -> np.ndarray:
+    y, x = np.mgrid[0:120, 0:160]
+    return np.stack([(x + shift) % 160, y, (x * y) % 255], axis=-1).astype(np.uint8)
+
+
+def test_first_frame_is_a_scene_change_but_not_a_hard_cut():
+    scene = SceneChangeDetector()
+    assert scene.changed(_frame(_gradient()))
+    assert not scene.hard_cut
+
+
+def test_same_frame_is_not_a_change():
+    scene = SceneChangeDetector()
+    scene.changed(_frame(_gradient()))
+    assert not scene.changed(_frame(_gradient()))
+    assert scene.jump == 0
+
+
+def test_unrelated_frame_is_a_hard_cut():
+    scene = SceneChangeDetector(threshold=12, hard_cut=20)
+    scene.changed(_frame(_gradient()))
+    noise = np.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    assert scene.changed(_frame(noise))
+    assert scene.hard_cut
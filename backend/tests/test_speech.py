@@ -0,0 +1,63 @@
+import struct
+
+import numpy as np
+
+from models.speech import MAX_SEGMENT_CHARS, WaveformCache, pcm16, speech_segments, wav_stream_header
+
+
+def _wave(n: int, value: float = 0.5) -> np.ndarray:
+    return np.full(n, value, dtype=np.float32)
+
+
+def test_cached_sentence_is_a_hit():
+    cache = WaveformCache(max_bytes=1024 * 1024)
+    assert cache.get("It appears safe to walk forward.") is None
+    cache.put("It appears safe to walk forward.", _wave(100))
+    assert np.array_equal(cache.get("It appears safe to walk forward."), _wave(100))
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+
+
+def test_least_recently_used_waveform_is_evicted_by_size():
+    cache = WaveformCache(max_bytes=3 * 400)            # Three 100-sample waveforms
+    for text in ("a", "b", "c"):
+        cache.put(text, _wave(100))
+    cache.get("a")                                      # "b" is now the oldest
+    cache.put("d", _wave(100))
+    assert cache.get("b") is None
+    assert all(cache.get(t) is not None for t in ("a", "c", "d"))
+    assert cache.stats()["bytes"] == 1200
+
+
+def test_waveform_larger_than_the_cache_is_not_kept():
+    cache = WaveformCache(max_bytes=100)
+    cache.put("long", _wave(100))
+    assert cache.get("long") is None and cache.stats()["entries"] == 0
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    WaveformCache(1024 * 1024, str(tmp_path)).put("Stop.", _wave(50, 0.25))
+    cache = WaveformCache(1024 * 1024, str(tmp_path))
+    assert np.array_equal(cache.get("Stop."), _wave(50, 0.25))
+    assert cache.stats()["disk_hits"] == 1
+    cache.get("Stop.")
+    assert cache.stats()["hits"] == 1                   # Promoted to memory
+
+
+def test_long_sentences_are_split_on_words():
+    sentence = " ".join(["obstacle"] * 200) + "."
+    segments = speech_segments("Stop. " + sentence)
+    assert segments[0] == "Stop."
+    assert all(len(s) <= MAX_SEGMENT_CHARS for s in segments)
+    assert " ".join(segments[1:]) == sentence
+
+
+def test_pcm16_clips_and_scales():
+    assert np.frombuffer(pcm16(np.array([0.0, 1.0, -2.0], dtype=np.float32)), "<i2").tolist() == [0, 32767, -32767]
+
+
+def test_stream_header_is_16_bit_mono():
+    header = wav_stream_header(16000)
+    assert header[:4] == b"RIFF" and header[8:12] == b"WAVE" and len(header) == 44
+    channels, rate, _, _, bits = struct.unpack("<HIIHH", header[22:36])
+    assert (channels, rate, bits) == (1, 16000, 16)
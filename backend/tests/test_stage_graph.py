@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from stage_graph import StageGraph
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def test_stages_run_after_their_dependencies(pool):
+    order = []
+    lock = threading.Lock()
+
+    def stage(name, value):
+        def run(**deps):
+            with lock:
+                order.append(name)
+            return value + sum(deps.values())
+        return run
+
+    graph = (StageGraph(pool)
+             .add("decode", stage("decode", 1))
+             .add("detect", stage("detect", 10), deps=["decode"])
+             .add("depth", stage("depth", 100), deps=["decode"])
+             .add("compose", stage("compose", 0), deps=["detect", "depth"]))
+    results = graph.run()
+    assert results == {"decode": 1, "detect": 11, "depth": 101, "compose": 112}
+    assert order[0] == "decode" and order[-1] == "compose"
+    assert set(graph.timings) == set(results)
+
+
+def test_independent_stages_run_concurrently(pool):
+    barrier = threading.Barrier(2, timeout=5)
+    graph = StageGraph(pool).add("caption", barrier.wait).add("detect", barrier.wait)
+    assert set(graph.run()) == {"caption", "detect"}     # Would time out if run one at a time
+
+
+def test_only_needed_stages_run(pool):
+    ran = []
+    graph = (StageGraph(pool)
+             .add("decode", lambda: ran.append("decode"))
+             .add("caption", lambda decode: ran.append("caption"), deps=["decode"])
+             .add("depth", lambda decode: ran.append("depth"), deps=["decode"]))
+    graph.run(targets=["depth"])
+    assert sorted(ran) == ["decode", "depth"]
+
+
+def test_on_stage_sees_each_result_once(pool):
+    seen = []
+    graph = StageGraph(pool).add("a", lambda: 1).add("b", lambda a: a + 1, deps=["a"])
+    graph.run(on_stage=lambda name, result: seen.append((name, result)))
+    assert seen == [("a", 1), ("b", 2)]
+
+
+def test_unknown_dependency_is_rejected(pool):
+    with pytest.raises(ValueError):
+        StageGraph(pool).add("compose", lambda depth: depth, deps=["depth"])
+
+
+def test_stage_errors_propagate(pool):
+    def fail():
+        raise RuntimeError("stage failed")
+
+    with pytest.raises(RuntimeError, match="stage failed"):
+        StageGraph(pool).add("detect", fail).run()
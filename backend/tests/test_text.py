@@ -0,0 +1,15 @@
+from models.text import split_sentences
+
+
+def test_split_sentences_on_final_punctuation():
+    assert split_sentences("Path is clear.  A car ahead! Safe?") == ["Path is clear.", "A car ahead!", "Safe?"]
+
+
+def test_split_sentences_handles_cjk_and_empty_text():
+    assert split_sentences("前方有车。 请小心！") == ["前方有车。", "请小心！"]
+    assert split_sentences("   ") == []
+    assert split_sentences("No final stop") == ["No final stop"]
+
+
+def test_split_sentences_does_not_split_decimals():
+    assert split_sentences("Obstacle at 1.5 metres. Stop.") == ["Obstacle at 1.5 metres.", "Stop."]
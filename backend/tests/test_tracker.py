@@ -0,0 +1,49 @@
+from models.tracker import APPROACH_MIN_HITS, BoxTracker
+
+
+def _det(box, label="car", confidence=0.9):
+    return {"label": label, "confidence": confidence, "box": box}
+
+
+def test_moving_box_keeps_its_track_id():
+    tracker = BoxTracker()
+    first = tracker.update([_det([100, 100, 200, 200])], 0.0)
+    second = tracker.update([_det([110, 100, 210, 200])], 0.1)
+    assert first[0]["track_id"] == second[0]["track_id"]
+
+
+def test_labels_never_match_each_other():
+    tracker = BoxTracker()
+    first = tracker.update([_det([100, 100, 200, 200], "car")], 0.0)
+    second = tracker.update([_det([100, 100, 200, 200], "person")], 0.1)
+    assert first[0]["track_id"] != second[0]["track_id"]
+
+
+def test_growing_box_is_approaching():
+    tracker = BoxTracker()
+    out = []
+    for i in range(APPROACH_MIN_HITS + 2):
+        grow = 15 * i
+        out = tracker.update([_det([100 - grow, 100 - grow, 200 + grow, 200 + grow])], 0.2 * i)
+    assert out[0]["approaching"]
+    steady = BoxTracker()
+    for i in range(APPROACH_MIN_HITS + 2):
+        out = steady.update([_det([100, 100, 200, 200])], 0.2 * i)
+    assert not out[0]["approaching"]
+
+
+def test_unmatched_tracks_age_out():
+    tracker = BoxTracker(max_age=1.0)
+    tracker.update([_det([100, 100, 200, 200])], 0.0)
+    tracker.update([_det([400, 300, 500, 400], "person")], 0.5)
+    assert len(tracker.tracks) == 2          # The car coasts
+    tracker.update([_det([400, 300, 500, 400], "person")], 1.6)
+    assert [t.label for t in tracker.tracks] == ["person"]
+
+
+def test_propagate_extrapolates_between_keyframes():
+    tracker = BoxTracker()
+    for i in range(3):
+        tracker.update([_det([100 + 20 * i, 100, 200 + 20 * i, 200])], 0.1 * i)
+    ahead = tracker.propagate(0.3)
+    assert ahead[0]["box"][0] > 140
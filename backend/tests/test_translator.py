@@ -0,0 +1,60 @@
+import pytest
+
+from models import metrics
+from models.translator import TranslatorModel
+
+
+@pytest.fixture
+def translator():
+    """A translator whose MarianMT batches are recorded and upper-cased."""
+    model = TranslatorModel(cache_size=3)
+    model.batches = []
+
+    def generate(sentences, lang):
+        model.batches.append((lang, list(sentences)))
+        return [f"{lang}:{s.upper()}" for s in sentences]
+
+    model._generate = generate
+    return model
+
+
+def test_repeated_sentences_are_translated_once(translator):
+    assert translator.translate("Path is clear. Car ahead. Path is clear.", "es") == (
+        "es:PATH IS CLEAR. es:CAR AHEAD. es:PATH IS CLEAR."
+    )
+    assert translator.batches == [("es", ["Path is clear.", "Car ahead."])]
+
+    translator.translate("Car ahead. Stop.", "es")
+    assert translator.batches[-1] == ("es", ["Stop."])
+    stats = translator.cache_stats()
+    assert stats["entries"] == 3 and stats["hits"] == 1 and stats["misses"] == 4
+
+
+def test_cache_is_keyed_by_language(translator):
+    translator.translate("Stop.", "es")
+    translator.translate("Stop.", "fr")
+    assert [lang for lang, _ in translator.batches] == ["es", "fr"]
+
+
+def test_least_recently_used_sentence_is_evicted(translator):
+    translator.translate_many(["a", "b", "c"], "de")
+    translator.translate_many(["a"], "de")              # "b" is now the oldest
+    translator.translate_many(["d"], "de")
+    translator.batches.clear()
+    translator.translate_many(["a", "b", "c", "d"], "de")
+    assert translator.batches == [("de", ["b"])]
+
+
+def test_chinese_sentences_join_without_spaces(translator):
+    assert translator.translate("Stop. Go.", "zh") == "zh:STOP.zh:GO."
+
+
+def test_model_error_falls_back_to_english(translator):
+    def broken(sentences, lang):
+        raise RuntimeError("MarianMT failed")
+
+    translator._generate = broken
+    before = metrics.FALLBACKS_TOTAL.value(kind="translation_english")
+    assert translator.translate("Stop.", "hi") == "Stop."
+    assert translator.translate("Stop.", "xx") is None
+    assert metrics.FALLBACKS_TOTAL.value(kind="translation_english") == before + 2
@@ -1,6 +1,6 @@
 "use client";
 import { useState, useCallback } from "react";
-import { analyzeImage, AnalyzeResult } from "@/lib/api";
+import { analyzeImage, AnalyzeResult, audioUrl } from "@/lib/api";
 import CameraCapture from "@/components/CameraCapture";
 import VoiceInput from "@/components/VoiceInput";
 import LanguageSelector from "@/components/LanguageSelector";
@@ -161,9 +161,13 @@ export default function HomePage() {
 
           {!loading && result && (
             <div className={styles.results} aria-live="polite">
-              {result.audio_b64 && (
+              {(result.audio_url || result.audio_b64) && (
                 <div className="card">
-                  <AudioPlayer audioB64={result.audio_b64} autoPlay={true} />
+                  <AudioPlayer
+                    src={result.audio_url ? audioUrl(result.audio_url) : undefined}
+                    audioB64={result.audio_b64}
+                    autoPlay={true}
+                  />
                 </div>
               )}
               <ResultPanel result={result} language={language} />
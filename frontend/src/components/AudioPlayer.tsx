@@ -3,24 +3,33 @@ import { useEffect, useRef, useState } from "react";
 import styles from "./AudioPlayer.module.css";
 
 interface AudioPlayerProps {
-  audioB64: string;        // base64-encoded WAV
+  src?: string;            // URL of the WAV (preferred)
+  audioB64?: string;       // base64-encoded WAV (legacy inline audio)
   autoPlay?: boolean;
 }
 
-export default function AudioPlayer({ audioB64, autoPlay = true }: AudioPlayerProps) {
+export default function AudioPlayer({ src, audioB64, autoPlay = true }: AudioPlayerProps) {
   const audioRef  = useRef<HTMLAudioElement | null>(null);
   const [playing, setPlaying] = useState(false);
   const [duration, setDuration] = useState(0);
   const [current,  setCurrent]  = useState(0);
 
-  // Decode base64 → blob URL whenever audioB64 changes
+  // Play from the audio URL, or decode base64 → blob URL for inline audio
   useEffect(() => {
-    if (!audioB64) return;
-    const binary = atob(audioB64);
-    const bytes  = new Uint8Array(binary.length);
-    for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
-    const blob   = new Blob([bytes], { type: "audio/wav" });
-    const url    = URL.createObjectURL(blob);
+    let url: string;
+    let revoke = false;
+    if (src) {
+      url = src;
+    } else if (audioB64) {
+      const binary = atob(audioB64);
+      const bytes  = new Uint8Array(binary.length);
+      for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+      const blob   = new Blob([bytes], { type: "audio/wav" });
+      url    = URL.createObjectURL(blob);
+      revoke = true;
+    } else {
+      return;
+    }
 
     const audio  = new Audio(url);
     audioRef.current = audio;
@@ -35,9 +44,9 @@ export default function AudioPlayer({ audioB64, autoPlay = true }: AudioPlayerPr
 
     return () => {
       audio.pause();
-      URL.revokeObjectURL(url);
+      if (revoke) URL.revokeObjectURL(url);
     };
-  }, [audioB64, autoPlay]);
+  }, [src, audioB64, autoPlay]);
 
   const toggle = () => {
     if (!audioRef.current) return;
@@ -26,7 +26,8 @@ export interface AnalyzeResult {
   hazards: string[];
   depth: DepthResult;
   translated_text: string;
-  audio_b64: string;
+  audio_b64: string;          // Only filled when requested with audio=inline
+  audio_url: string | null;   // Path of the WAV on the API (GET /audio/{id})
   language: string;
   safe_to_walk: boolean;
 }
@@ -34,12 +35,14 @@ export interface AnalyzeResult {
 export async function analyzeImage(
   imageFile: File,
   language: string,
-  query: string
+  query: string,
+  include: string[] = []
 ): Promise<AnalyzeResult> {
   const form = new FormData();
   form.append("image", imageFile);
   form.append("language", language);
   form.append("query", query);
+  if (include.length) form.append("include", include.join(","));
 
   const res = await fetch(`${API_BASE}/analyze`, {
     method: "POST",
@@ -53,6 +56,10 @@ export async function analyzeImage(
   return res.json();
 }
 
+export function audioUrl(path: string): string {
+  return `${API_BASE}${path}`;
+}
+
 export async function transcribeVoice(audioBlob: Blob): Promise<string> {
   const form = new FormData();
   form.append("audio", audioBlob, "recording.wav");